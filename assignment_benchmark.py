@@ -0,0 +1,64 @@
+# assignment_benchmark.py
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+
+def make_gated_costs(rng, num_tracks, gate_radius, density):
+    """
+    A scene of 'num_tracks' tracks and 20% more detections spread over an area
+    that keeps 'density' tracks per square metre, with one noisy detection per
+    track. Costs are squared distances, np.inf beyond the gate.
+    """
+    side = np.sqrt(num_tracks / density)
+    tracks = rng.uniform(0.0, side, (num_tracks, 2))
+    detections = np.vstack((tracks + rng.normal(0.0, 0.5, tracks.shape),
+                            rng.uniform(0.0, side, (num_tracks // 5, 2))))
+    cost_matrix = ((detections[:, np.newaxis, :] - tracks[np.newaxis, :, :])**2).sum(axis=2)
+    cost_matrix[cost_matrix > gate_radius**2] = np.inf
+    return cost_matrix
+
+
+def run_benchmark(track_counts, repeats, gate_radius, density, seed):
+    """
+    Times solve_assignment's 'greedy' and 'optimal' methods on the same gated
+    cost matrices and reports the pairs assigned and their total cost.
+    """
+    from radar_tracker.tracking.track_management.assignment_solver import solve_assignment
+
+    rng = np.random.default_rng(seed)
+    lines = ["--- Assignment Benchmark Summary ---",
+             f"{'tracks':>6} {'method':>8} {'median ms':>10} {'pairs':>7} {'total cost':>11}"]
+    for num_tracks in track_counts:
+        scenes = [make_gated_costs(rng, num_tracks, gate_radius, density) for _ in range(repeats)]
+        for method in ('greedy', 'optimal'):
+            times, pairs, costs = [], [], []
+            for cost_matrix in scenes:
+                start = time.perf_counter()
+                assignment = solve_assignment(cost_matrix, method)
+                times.append(time.perf_counter() - start)
+                pairs.append(len(assignment[0]))
+                costs.append(cost_matrix[assignment].sum())
+            lines.append(f"{num_tracks:>6} {method:>8} {1e3 * np.median(times):>10.3f} "
+                         f"{np.mean(pairs):>7.1f} {np.mean(costs):>11.2f}")
+    print("\n".join(lines))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Compare the greedy and optimal track assignment methods on synthetic gated cost matrices.")
+    parser.add_argument("--tracks", type=int, nargs="+", default=[10, 50, 200], help="Track counts to benchmark.")
+    parser.add_argument("--repeats", type=int, default=50, help="Scenes per track count.")
+    parser.add_argument("--gate-radius", type=float, default=3.0, help="Gate radius in metres.")
+    parser.add_argument("--density", type=float, default=0.02, help="Tracks per square metre.")
+    parser.add_argument("--seed", type=int, default=0, help="Scene generator seed.")
+    args = parser.parse_args()
+
+    run_benchmark(args.tracks, args.repeats, args.gate_radius, args.density, args.seed)
@@ -25,6 +25,7 @@ if __name__ == '__main__':
     from can_logger_app.main import main as can_logger_main
     from radar_tracker.main_live import main as main_live
     from radar_tracker.main_playback import run_playback
+    from radar_tracker.multi_radar import run_multi_radar
     multiprocessing.freeze_support()
     
     # --- Create the Manager and shared data structures FIRST ---
@@ -57,7 +58,8 @@ if __name__ == '__main__':
             normalized_path = record.pathname.replace(os.sep, '/')
             return (
                 'radar_tracker/main_live.py' in normalized_path or 
-                'radar_tracker/main_playback.py' in normalized_path
+                'radar_tracker/main_playback.py' in normalized_path or
+                'radar_tracker/multi_radar.py' in normalized_path
             )
 
     class TrackingFilter(logging.Filter):
@@ -93,16 +95,16 @@ if __name__ == '__main__':
     # --- Ask for mode ---
     logger.info("--- Welcome to the Unified Radar Tracker ---")
     while True:
-        mode = input("Select mode: (1) Live Tracking or (2) Playback from File\nEnter choice (1 or 2): ")
-        if mode in ['1', '2']:
+        mode = input("Select mode: (1) Live Tracking, (2) Playback from File or (3) Multi-Radar Live Tracking\nEnter choice (1, 2 or 3): ")
+        if mode in ['1', '2', '3']:
             break
         else:
-            logger.info("Invalid choice. Please enter 1 or 2.")
+            logger.info("Invalid choice. Please enter 1, 2 or 3.")
 
     can_interface = None # Initialize can_interface
     effective_can_logger_ready = can_logger_ready # Assume CAN is used by default
 
-    if mode == '1':
+    if mode in ['1', '3']:
         # --- Ask for CAN interface ---
         logger.info("\n--- CAN Interface Selection ---")
         while True:
@@ -132,7 +134,7 @@ if __name__ == '__main__':
             # turn_on_led()
 
             # Start the CAN logger in a separate process for live mode
-            if mode == '1' and can_interface is not None:
+            if mode in ['1', '3'] and can_interface is not None:
                 # MODIFIED: Pass the shared dict and can_interface to the logger
                 can_logger_process = multiprocessing.Process(
                     target=can_logger_main, 
@@ -152,6 +154,9 @@ if __name__ == '__main__':
             elif mode == '2':
                 logger.info("\nStarting in PLAYBACK mode...")
                 run_playback(output_dir)
+            elif mode == '3':
+                logger.info("\nStarting in MULTI-RADAR LIVE mode...")
+                run_multi_radar(output_dir, shutdown_flag, shared_live_can_data, effective_can_logger_ready)
 
         finally:
             shutdown_flag.set() # Signal all processes to shutdown
@@ -178,7 +183,7 @@ if __name__ == '__main__':
         can_logger_process = None
         live_thread = None
         try:
-            if mode == '1':
+            if mode in ['1', '3']:
                 logger.info("\nStarting in LIVE mode...")
                 # Start the CAN logger process only if an interface is selected
                 if can_interface is not None:
@@ -189,9 +194,13 @@ if __name__ == '__main__':
                     )
                     can_logger_process.start()
                 
-                # Call the main_live function directly in the main process
-                # MODIFIED: Pass the shared dict and ready event to the live radar main
-                main_live(output_dir, shutdown_flag, shared_live_can_data, effective_can_logger_ready)
+                if mode == '3':
+                    # One ingest-and-track process per radar, merged in this process
+                    run_multi_radar(output_dir, shutdown_flag, shared_live_can_data, effective_can_logger_ready)
+                else:
+                    # Call the main_live function directly in the main process
+                    # MODIFIED: Pass the shared dict and ready event to the live radar main
+                    main_live(output_dir, shutdown_flag, shared_live_can_data, effective_can_logger_ready)
 
             elif mode == '2':
                 logger.info("\nStarting in PLAYBACK mode...")
@@ -0,0 +1,103 @@
+# replay_benchmark.py
+
+import os
+import sys
+import time
+import argparse
+import threading
+from datetime import datetime
+
+# Add the 'src' directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), 'src')))
+
+
+def run_benchmark(capture_path, config_file, speedup, ingest_mode, log_format):
+    """
+    Replays a raw radar capture through a pseudo-terminal into the real
+    RadarWorker (serial read, parse, adapt, track, log) and reports the
+    sustained frame rate, serial backlog and dropped frames.
+    """
+    from PyQt5.QtCore import QCoreApplication
+    from radar_tracker import main_live
+    from radar_tracker.console_logger import logger
+    from radar_tracker.hardware import parsing_utils
+    from radar_tracker.hardware.pty_replayer import PtyRadarReplayer
+
+    params_radar = parsing_utils.parse_cfg(parsing_utils.read_cfg(config_file))
+    frame_period_s = (params_radar.frameCfg.framePeriodicity or 50.0) / 1000.0
+
+    output_dir = os.path.join("output", f"replay_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    main_live.RADAR_LOG_FORMAT = log_format
+    replayer = PtyRadarReplayer(capture_path, frame_period_s, speedup=speedup).start()
+    shutdown_flag = threading.Event()
+    worker = main_live.RadarWorker(replayer.port_path, config_file, output_dir, shutdown_flag,
+                                   ingest_mode=ingest_mode)
+
+    frame_numbers = []
+    backlog_samples = []
+    last_frame_time = [None]
+
+    def on_frame(frame_data):
+        last_frame_time[0] = time.perf_counter()
+        frame_numbers.append(frame_data.header['frameNumber'])
+        if worker.frame_ring is not None:
+            backlog_samples.append(worker.frame_ring.depth)
+        elif worker.frame_reader is not None:
+            backlog_samples.append(worker.h_data_port.in_waiting + worker.frame_reader.buffered_bytes)
+
+    # The worker runs on this thread, so the signal is delivered directly.
+    worker.frame_ready.connect(on_frame)
+
+    def stop_when_drained():
+        replayer.finished.wait()
+        processed = -1
+        while processed != len(frame_numbers):
+            processed = len(frame_numbers)
+            time.sleep(1.0)
+        shutdown_flag.set()
+
+    threading.Thread(target=stop_when_drained, daemon=True).start()
+    worker.run()
+    replayer.stop()
+
+    elapsed = last_frame_time[0] - replayer.stream_start_time if last_frame_time[0] else 0.0
+    gaps = sum(max(int(b) - int(a) - 1, 0) for a, b in zip(frame_numbers, frame_numbers[1:]))
+    backlog_unit = 'frames' if ingest_mode == 'process' else 'bytes'
+    summary = [
+        "--- Replay Benchmark Summary ---",
+        f"Capture:              {capture_path} ({len(replayer.frames)} frames, x{speedup or 'max'} speed)",
+        f"Ingest mode:          {ingest_mode}",
+        f"Frames sent:          {replayer.frames_sent} (dropped at port: {replayer.frames_dropped}, late: {replayer.late_frames})",
+        f"Frames tracked:       {len(frame_numbers)} (frame number gaps: {gaps})",
+        f"Sustained rate:       {len(frame_numbers) / elapsed if elapsed else 0.0:.1f} fps over {elapsed:.1f} s",
+        f"Serial backlog:       max {max(backlog_samples, default=0)} {backlog_unit}, "
+        f"mean {sum(backlog_samples) / len(backlog_samples) if backlog_samples else 0.0:.1f} {backlog_unit}",
+        f"Sequence monitor:     {worker.frame_monitor.summary() if worker.frame_monitor else 'n/a'}",
+        f"Catch-up policy:      {worker.catch_up.summary() if worker.catch_up else 'n/a'}",
+        f"Clustering:           {worker.tracker.clustering_summary()}",
+        f"Ego-motion RANSAC:    {worker.tracker.ransac_summary()}",
+        f"Track gating:         {worker.tracker.gating_summary()}",
+        f"JPDA:                 {worker.tracker.jpda_summary()}",
+        f"Output directory:     {output_dir}",
+    ]
+    logger.info("\n".join(summary))
+    del app
+
+
+if __name__ == '__main__':
+    import multiprocessing
+    multiprocessing.freeze_support()
+
+    parser = argparse.ArgumentParser(description="Benchmark the live radar path by replaying a raw capture over a pseudo-terminal (Linux only).")
+    parser.add_argument("capture", help="Raw capture file written by RawFrameRecorder (radar_raw.bin).")
+    parser.add_argument("--config", default="configs/profile_80_m_40mpsec_bsdevm_16tracks_dyClutter.cfg", help="Radar .cfg file sent during configuration.")
+    parser.add_argument("--speedup", type=float, default=1.0, help="Replay rate as a multiple of the frame period (0 = as fast as possible).")
+    parser.add_argument("--ingest-mode", choices=["thread", "process"], default="thread", help="RadarWorker ingest mode.")
+    parser.add_argument("--log-format", choices=["json", "raw", "both"], default="json", help="Radar data log format.")
+    args = parser.parse_args()
+
+    run_benchmark(args.capture, args.config, args.speedup, args.ingest_mode, args.log_format)
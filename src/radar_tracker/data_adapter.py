@@ -14,12 +14,17 @@ class FHistFrame:
         # --- Initialize other fields used by the tracker with default values ---
         self.motionState = 0
         self.isOutlier = np.array([], dtype=bool)
+        self.isPrefiltered = np.array([], dtype=bool) # Points the pre-filter dropped; never classified or clustered
         self.egoVx = 0.0
         self.egoVy = 0.0
         self.correctedEgoSpeed_mps = 0.0
         self.estimatedAcceleration_mps2 = np.nan
         self.iirFilteredVx_ransac = 0.0
         self.iirFilteredVy_ransac = 0.0
+        self.ransacIterations = 0 # RANSAC hypotheses scored in this frame
+        self.gatingCandidatePairs = 0 # (detection, track) pairs left by the spatial pre-gate
+        self.jpdaHypotheses = 0 # JPDA joint hypotheses scored in this frame
+        self.jpdaApproximatedClusters = 0 # JPDA clusters that used the beam approximation
         self.grid_map = []
         self.dbscanClusters = np.array([])
         self.detectedClusterInfo = np.array([])
@@ -35,7 +40,7 @@ class FHistFrame:
         self.EstimatedGrade_Est_Deg = np.nan
         self.imu_stuck = False
 
-def adapt_frame_data_to_fhist(frame_data, current_timestamp_ms, can_signals=None):
+def adapt_frame_data_to_fhist(frame_data, current_timestamp_ms, can_signals=None, dtype=np.float64):
     """
     Converts a real-time FrameData object into an FHistFrame object
     that the tracking algorithms can process.
@@ -43,18 +48,21 @@ def adapt_frame_data_to_fhist(frame_data, current_timestamp_ms, can_signals=None
     MODIFIED: Now accepts a dictionary of interpolated CAN signals to populate
     vehicle motion fields.
     MODIFIED: Now accepts a pre-calculated timestamp for the current frame.
+    MODIFIED: 'dtype' selects the float type of pointCloud/posLocal. The points
+    are scaled from the raw sensor values directly into it.
     """
     fhist_frame = FHistFrame()
     fhist_frame.timestamp = current_timestamp_ms
 
-    if frame_data.point_cloud is not None and frame_data.point_cloud.size > 0:
-        fhist_frame.pointCloud = frame_data.point_cloud
-        fhist_frame.posLocal = frame_data.point_cloud[1:3, :]
+    if frame_data.points is not None and len(frame_data.points) > 0:
+        fhist_frame.pointCloud = frame_data.points.as_array(dtype)
+        fhist_frame.posLocal = fhist_frame.pointCloud[1:3, :]
     else:
-        fhist_frame.pointCloud = np.empty((5, 0))
-        fhist_frame.posLocal = np.empty((2, 0))
+        fhist_frame.pointCloud = np.empty((5, 0), dtype=dtype)
+        fhist_frame.posLocal = np.empty((2, 0), dtype=dtype)
 
     fhist_frame.isOutlier = np.zeros(frame_data.num_points, dtype=bool)
+    fhist_frame.isPrefiltered = np.zeros(frame_data.num_points, dtype=bool)
 
     # --- NEW: Populate fhist_frame with live CAN data ---
     if config.DEBUG_FLAGS.get('log_can_data_adapter'):
@@ -119,5 +127,6 @@ def adapt_matlab_frame_to_fhist(matlab_frame):
     # Initialize the 'isOutlier' array with the correct size, which the tracker will populate
     num_points = fhist_frame.posLocal.shape[1]
     fhist_frame.isOutlier = np.zeros(num_points, dtype=bool)
+    fhist_frame.isPrefiltered = np.zeros(num_points, dtype=bool)
     
     return fhist_frame
\ No newline at end of file
@@ -0,0 +1,122 @@
+# src/radar_tracker/frame_pacing.py
+
+import time
+from .console_logger import logger
+
+CATCH_UP_POLICIES = ('all', 'latest', 'every_k')
+
+
+class FrameSequenceMonitor:
+    """
+    Follows the sensor's frame counter to timestamp frames and detect loss.
+
+    Timestamps are derived from 'frameNumber' and the configured frame period,
+    so frames dropped on the UART (or skipped by the catch-up policy) produce
+    the correct time step instead of a fixed 50 ms. The header overflow flags
+    and the host receive time are used to count overflowing and stale frames.
+    """
+    def __init__(self, frame_period_ms, stale_after_ms=None):
+        self.frame_period_ms = frame_period_ms
+        self.stale_after_ms = stale_after_ms if stale_after_ms is not None else 2 * frame_period_ms
+        self._first_frame_number = None
+        self._last_frame_number = None
+        self._base_timestamp_ms = frame_period_ms
+        self.last_timestamp_ms = 0.0
+        self.last_latency_ms = 0.0
+
+        # --- Counters ---
+        self.frames_received = 0
+        self.frames_dropped = 0         # Gaps in the frame counter
+        self.sequence_resets = 0        # Frame counter went backwards (sensor restart)
+        self.uart_overflow_frames = 0   # Frames flagged with 'uartOverflow'
+        self.proc_overflow_frames = 0   # Frames flagged with 'procOverflow'
+        self.stale_frames = 0           # Frames older than 'stale_after_ms' when they reached the tracker
+
+    def update(self, frame_data, now=None):
+        """
+        Registers a received frame.
+
+        Returns:
+            float: The frame's timestamp in ms on the sensor's time base.
+        """
+        header = frame_data.header
+        frame_number = int(header.get('frameNumber', 0))
+        self.frames_received += 1
+
+        if self._last_frame_number is None:
+            self._first_frame_number = frame_number
+        elif frame_number <= self._last_frame_number:
+            logger.warning(f"Frame counter went from {self._last_frame_number} to {frame_number}. Restarting the frame time base.")
+            self.sequence_resets += 1
+            self._first_frame_number = frame_number
+            self._base_timestamp_ms = self.last_timestamp_ms + self.frame_period_ms
+        elif frame_number > self._last_frame_number + 1:
+            gap = frame_number - self._last_frame_number - 1
+            self.frames_dropped += gap
+            logger.warning(f"{gap} radar frame(s) lost before frame {frame_number}.")
+        self._last_frame_number = frame_number
+
+        if header.get('uartOverflow'):
+            self.uart_overflow_frames += 1
+        if header.get('procOverflow'):
+            self.proc_overflow_frames += 1
+
+        if frame_data.host_timestamp is not None:
+            now = time.time() if now is None else now
+            self.last_latency_ms = (now - frame_data.host_timestamp) * 1000.0
+            if self.last_latency_ms > self.stale_after_ms:
+                self.stale_frames += 1
+
+        self.last_timestamp_ms = self._base_timestamp_ms + (frame_number - self._first_frame_number) * self.frame_period_ms
+        return self.last_timestamp_ms
+
+    def summary(self):
+        return (f"Frames Lost: {self.frames_dropped} | UART Overflow: {self.uart_overflow_frames} | "
+                f"Proc Overflow: {self.proc_overflow_frames} | Stale: {self.stale_frames} | "
+                f"Latency: {self.last_latency_ms:.0f} ms")
+
+
+class CatchUpPolicy:
+    """
+    Decides which frames the tracker processes while it is behind the sensor.
+
+    'all':     process every frame (latency grows while overloaded).
+    'latest':  while newer frames are waiting, skip straight to the newest one.
+    'every_k': while newer frames are waiting, process only every k-th frame.
+
+    Skipped frames are still logged; only tracking is skipped.
+    """
+    def __init__(self, policy='all', every_k=2):
+        if policy not in CATCH_UP_POLICIES:
+            raise ValueError(f"Unknown catch-up policy '{policy}'. Expected one of {CATCH_UP_POLICIES}.")
+        self.policy = policy
+        self.every_k = max(int(every_k), 1)
+        self._behind_count = 0
+
+        # --- Counters ---
+        self.frames_processed = 0
+        self.frames_processed_behind = 0    # Frames tracked while newer frames were already waiting
+        self.frames_skipped = 0
+
+    def should_process(self, frames_waiting):
+        """Returns True if the current frame should be tracked, given how many newer frames are waiting."""
+        if frames_waiting <= 0 or self.policy == 'all':
+            self._behind_count = 0
+            process = True
+        elif self.policy == 'latest':
+            process = False
+        else:
+            process = self._behind_count % self.every_k == 0
+            self._behind_count += 1
+
+        if not process:
+            self.frames_skipped += 1
+        else:
+            self.frames_processed += 1
+            if frames_waiting > 0:
+                self.frames_processed_behind += 1
+        return process
+
+    def summary(self):
+        return (f"Catch-up ({self.policy}): processed {self.frames_processed}, "
+                f"behind {self.frames_processed_behind}, skipped {self.frames_skipped}")
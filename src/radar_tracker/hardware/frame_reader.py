@@ -0,0 +1,149 @@
+# src/radar_tracker/hardware/frame_reader.py
+
+import struct
+import serial
+from .hw_comms_utils import SYNC_PATTERN
+from ..console_logger import logger
+
+# The 'packetLength' field follows the 8-byte sync word and the 4-byte version.
+PACKET_LENGTH_OFFSET = 12
+_PACKET_LENGTH_STRUCT = struct.Struct('<I')
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class FrameReader:
+    """
+    Buffered reader that extracts complete radar frames from the UART stream.
+
+    Instead of hunting for the sync pattern one byte at a time, the reader
+    drains everything waiting in the serial driver into a reusable bytearray,
+    locates the magic word with bytes.find() and hands out each complete frame
+    (header + TLVs) as a zero-copy memoryview into that buffer.
+
+    NOTE: A returned memoryview is only valid until the next call to
+    read_frame(), because the buffer is compacted and refilled in place.
+    """
+    def __init__(self, h_data_port, frame_header_length, buffer_size=DEFAULT_BUFFER_SIZE):
+        self.port = h_data_port
+        self.header_length = frame_header_length
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+
+        # --- Statistics ---
+        self.frames_read = 0
+        self.bytes_skipped = 0      # Total bytes discarded while resyncing
+        self.last_skipped = 0       # Bytes discarded before the most recent frame
+        self._skipped_since_frame = 0
+
+    @property
+    def buffered_bytes(self):
+        """Number of bytes read from the port but not yet consumed."""
+        return self._end - self._start
+
+    def has_buffered_frame(self):
+        """
+        Returns True if the next frame's header, up to its packet length, is
+        already in the buffer and the buffer plus the serial driver hold the
+        whole packet, i.e. the next read_frame() will not block. Returns False
+        whenever that cannot be confirmed without reading from the port.
+        """
+        try:
+            waiting = self.port.in_waiting
+        except (serial.SerialException, OSError, AttributeError):
+            waiting = 0
+        pos = self._buffer.find(SYNC_PATTERN, self._start, self._end)
+        if pos < 0:
+            return False
+        if self._end - pos < PACKET_LENGTH_OFFSET + 4:
+            # The length field is still in the driver, so the frame size is unknown.
+            return False
+        available = self._end - pos + waiting
+        packet_length = _PACKET_LENGTH_STRUCT.unpack_from(self._buffer, pos + PACKET_LENGTH_OFFSET)[0]
+        return available >= packet_length
+
+    def read_frame(self):
+        """
+        Reads the next complete frame from the port.
+
+        Returns:
+            memoryview or None: The raw frame bytes (header + TLVs), or None if
+            the port timed out or failed before a full frame was received.
+        """
+        sync_length = len(SYNC_PATTERN)
+        while True:
+            pos = self._buffer.find(SYNC_PATTERN, self._start, self._end)
+            if pos < 0:
+                # Discard everything except a possible partial sync word at the tail.
+                keep = min(sync_length - 1, self._end - self._start)
+                self._skip(self._end - keep - self._start)
+                if not self._ensure(self.buffered_bytes + 1):
+                    return None
+                continue
+
+            self._skip(pos - self._start)
+            if not self._ensure(self.header_length):
+                return None
+
+            packet_length = _PACKET_LENGTH_STRUCT.unpack_from(
+                self._buffer, self._start + PACKET_LENGTH_OFFSET
+            )[0]
+            if packet_length < self.header_length or packet_length > len(self._buffer):
+                # Corrupt header (or a sync pattern inside payload data); resync past it.
+                logger.warning(f"Invalid packet length {packet_length} in frame header. Resyncing.")
+                self._skip(1)
+                continue
+
+            if not self._ensure(packet_length):
+                return None
+
+            frame = self._view[self._start:self._start + packet_length]
+            self._start += packet_length
+
+            self.frames_read += 1
+            self.last_skipped = self._skipped_since_frame
+            self._skipped_since_frame = 0
+            return frame
+
+    def _skip(self, num_bytes):
+        """Drops bytes from the front of the buffer and counts them as skipped."""
+        if num_bytes <= 0:
+            return
+        self._start += num_bytes
+        self._skipped_since_frame += num_bytes
+        self.bytes_skipped += num_bytes
+
+    def _ensure(self, num_bytes):
+        """
+        Makes sure at least 'num_bytes' unconsumed bytes are buffered.
+        Reads in bulk (everything in 'in_waiting') to keep syscalls to a minimum.
+        """
+        if self.buffered_bytes >= num_bytes:
+            return True
+
+        # Compact the unconsumed bytes to the front if the tail has no room left.
+        if self._start + num_bytes > len(self._buffer) or self._start == self._end:
+            remaining = self._end - self._start
+            if remaining:
+                self._view[0:remaining] = self._view[self._start:self._end]
+            self._start, self._end = 0, remaining
+
+        while self.buffered_bytes < num_bytes:
+            try:
+                waiting = self.port.in_waiting
+            except (serial.SerialException, OSError):
+                waiting = 0
+            wanted = max(num_bytes - self.buffered_bytes, waiting)
+            wanted = min(wanted, len(self._buffer) - self._end)
+            try:
+                received = self.port.readinto(self._view[self._end:self._end + wanted])
+            except serial.SerialException as e:
+                logger.error(f"Serial port read failed: {e}")
+                return False
+            if not received:
+                logger.warning("Timeout occurred while reading from serial port.")
+                return False
+            self._end += received
+        return True
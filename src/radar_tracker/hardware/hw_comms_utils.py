@@ -1,5 +1,11 @@
+import os
+import re
+import json
+import time
+import hashlib
 import serial
 import serial.tools.list_ports
+from . import parsing_utils
 from ..console_logger import logger
 
 # Define the 8-byte sync pattern for frame synchronization
@@ -27,8 +33,10 @@ def configure_control_port(com_port_num, baud_rate):
 
     try:
         # List available ports and check if the desired port exists
+        # Device paths that exist but are not enumerated (e.g. a pseudo-terminal
+        # from the radar replayer) are accepted as well.
         available_ports = [p.device for p in serial.tools.list_ports.comports()]
-        if com_port_string not in available_ports:
+        if com_port_string not in available_ports and not os.path.exists(com_port_string):
             logger.error(f'\nERROR: CONTROL port {com_port_string} is NOT in the list of available ports.')
             logger.info(f'Available ports are: {available_ports}')
             return None
@@ -57,6 +65,156 @@ def reconfigure_port_for_data(sphandle):
         logger.info('--- Port configured for data mode (binary streaming). ---')
     return sphandle
 
+# --- CLI Acknowledgement ---
+CLI_ACK = b'Done'
+CLI_ERROR = b'Error'
+CLI_COMMAND_TIMEOUT_S = 1.0
+
+def send_cli_command(h_port, command, timeout=CLI_COMMAND_TIMEOUT_S):
+    """
+    Sends one CLI command and waits for the sensor's 'Done' or 'Error' response.
+
+    Returns:
+        tuple: (status, response) where status is 'done', 'error' or 'timeout'
+               and response is the text received so far.
+    """
+    h_port.write((command + '\n').encode())
+    response = b''
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        chunk = h_port.read(max(1, h_port.in_waiting))
+        if chunk:
+            response += chunk
+            if CLI_ERROR in response:
+                # Let the rest of the error message arrive before returning it.
+                response += h_port.read(h_port.in_waiting)
+                return 'error', response.decode(errors='replace').strip()
+            if CLI_ACK in response:
+                return 'done', response.decode(errors='replace').strip()
+    return 'timeout', response.decode(errors='replace').strip()
+
+def config_state_path(config_file, cli_com_port):
+    """
+    Path of the file recording which configuration was last applied to the
+    sensor on 'cli_com_port'. Sensors sharing one .cfg get one file each.
+    """
+    port_tag = re.sub(r'[^A-Za-z0-9]+', '_', str(cli_com_port)).strip('_')
+    return f"{config_file}.{port_tag}.applied"
+
+def _write_config_state(config_file, cli_com_port, cfg_hash):
+    """Records the applied configuration, replacing the state file atomically."""
+    state_path = config_state_path(config_file, cli_com_port)
+    temp_path = f"{state_path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump({'cfg_hash': cfg_hash, 'port': str(cli_com_port)}, f)
+    os.replace(temp_path, state_path)
+
+def hash_cfg(cli_cfg):
+    """Returns a stable hash of the configuration commands."""
+    return hashlib.sha256('\n'.join(cli_cfg).encode()).hexdigest()
+
+def is_streaming(h_port, timeout):
+    """Returns True if radar frames (the sync pattern) arrive on the port within 'timeout' seconds."""
+    h_port.reset_input_buffer()
+    received = b''
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        received += h_port.read(max(1, h_port.in_waiting))
+        if SYNC_PATTERN in received:
+            return True
+    return False
+
+def _try_skip_configuration(cli_com_port, config_file, cfg_hash, params, baud_rate):
+    """
+    Returns an open data port if the sensor is already streaming with the
+    configuration in 'config_file', otherwise None.
+    """
+    try:
+        with open(config_state_path(config_file, cli_com_port), 'r') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if state.get('cfg_hash') != cfg_hash or state.get('port') != str(cli_com_port):
+        return None
+
+    h_port = configure_control_port(cli_com_port, baud_rate)
+    if not h_port:
+        return None
+    # Wait for a few frame periods before deciding the sensor is not streaming.
+    frame_period_s = (params.frameCfg.framePeriodicity or 100.0) / 1000.0
+    if is_streaming(h_port, timeout=max(3 * frame_period_s, 0.3)):
+        return h_port
+    h_port.close()
+    return None
+
+def configure_sensor(cli_com_port, config_file, initial_baud_rate, skip_if_configured=False):
+    """
+    Reads the .cfg file and sends its commands to the radar over the CLI port.
+
+    Each command waits for the sensor's acknowledgement (up to
+    CLI_COMMAND_TIMEOUT_S) instead of a fixed delay. With 'skip_if_configured',
+    configuration is skipped when the same .cfg was last applied to this port
+    and the sensor is still streaming.
+
+    Args:
+        cli_com_port (int or str): The COM port number or device path of the radar.
+        config_file (str): Path to the radar .cfg file.
+        initial_baud_rate (int): The CLI baud rate used before the 'baudRate' command.
+        skip_if_configured (bool): Enables the already-configured fast path.
+
+    Returns:
+        tuple: (RadarParams, serial.Serial) ready for data streaming, or (None, None) on failure.
+    """
+    cli_cfg = parsing_utils.read_cfg(config_file)
+    if not cli_cfg: return None, None
+    params = parsing_utils.parse_cfg(cli_cfg)
+    target_baud_rate = initial_baud_rate
+    for command in cli_cfg:
+        if command.startswith("baudRate"):
+            try: target_baud_rate = int(command.split()[1])
+            except (ValueError, IndexError): pass
+            break
+
+    cfg_hash = hash_cfg(cli_cfg)
+    if skip_if_configured:
+        h_port = _try_skip_configuration(cli_com_port, config_file, cfg_hash, params, target_baud_rate)
+        if h_port:
+            logger.info("--- Sensor already streaming with this configuration. Skipping configuration. ---")
+            return params, h_port
+
+    # Forget the previously applied configuration until this one completes.
+    try:
+        os.remove(config_state_path(config_file, cli_com_port))
+    except OSError:
+        pass
+
+    logger.info("\n--- Starting Sensor Configuration ---")
+    h_port = configure_control_port(cli_com_port, initial_baud_rate)
+    if not h_port: return None, None
+    for command in cli_cfg:
+        logger.info(f"> {command}")
+        status, response = send_cli_command(h_port, command)
+        if status == 'error':
+            logger.warning(f"  Sensor reported an error for '{command}': {response}")
+        elif status == 'timeout':
+            logger.warning(f"  No acknowledgement for '{command}' within {CLI_COMMAND_TIMEOUT_S} s.")
+        if "baudRate" in command:
+            try:
+                h_port.baudrate = target_baud_rate
+                logger.info(f"  Baud rate changed to {target_baud_rate}")
+            except Exception as e:
+                logger.error(f"ERROR: Failed to change baud rate: {e}")
+                h_port.close()
+                return None, None
+    logger.info("--- Configuration complete ---\n")
+    reconfigure_port_for_data(h_port)
+
+    try:
+        _write_config_state(config_file, cli_com_port, cfg_hash)
+    except OSError as e:
+        logger.warning(f"Could not record the applied configuration: {e}")
+    return params, h_port
+
 def read_frame_header(h_data_serial_port, frame_header_length_bytes):
     """
     Reads from the serial port until a complete frame header is found.
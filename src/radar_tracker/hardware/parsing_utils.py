@@ -1,5 +1,6 @@
 import math
 import struct
+import numpy as np
 from dataclasses import dataclass, field, fields
 from ..console_logger import logger, log_debug
 
@@ -72,6 +73,7 @@ def parse_cfg(cli_cfg):
         elif command == 'frameCfg':
             params.frameCfg.numOfChirpsInBurst = int(parts[1])
             params.frameCfg.numOfBurstsInFrame = int(parts[4])
+            params.frameCfg.framePeriodicity = float(parts[5])  # ms
 
     # --- Step 2: Perform all derived calculations with EXTREME type safety ---
     try:
@@ -123,18 +125,47 @@ def parse_cfg(cli_cfg):
         raise
     return params
 
-# (Helper functions can remain as they are)
+# --- Structure Helpers ---
+# Structure definitions are plain dicts of { 'field_name': ('struct_format_char', num_bytes) }.
+# They are compiled once into struct.Struct objects / NumPy dtypes and cached, keyed by
+# the identity of the definition dict (the dict itself is kept alive by the cache entry).
+_COMPILED_STRUCTS = {}
+_COMPILED_DTYPES = {}
+
+_NUMPY_TYPE_CODES = {
+    'b': 'i1', 'B': 'u1', 'h': 'i2', 'H': 'u2', 'i': 'i4', 'I': 'u4',
+    'q': 'i8', 'Q': 'u8', 'f': 'f4', 'd': 'f8',
+}
+
+def compile_struct(struct_def):
+    """
+    Returns the cached little-endian struct.Struct for a structure definition
+    together with its tuple of field names.
+    """
+    entry = _COMPILED_STRUCTS.get(id(struct_def))
+    if entry is None or entry[0] is not struct_def:
+        compiled = struct.Struct('<' + ''.join(item[0] for item in struct_def.values()))
+        entry = (struct_def, compiled, tuple(struct_def.keys()))
+        _COMPILED_STRUCTS[id(struct_def)] = entry
+    return entry[1], entry[2]
+
+def struct_to_dtype(struct_def):
+    """Returns the cached little-endian NumPy structured dtype for a structure definition."""
+    entry = _COMPILED_DTYPES.get(id(struct_def))
+    if entry is None or entry[0] is not struct_def:
+        dtype = np.dtype([(name, '<' + _NUMPY_TYPE_CODES[item[0]]) for name, item in struct_def.items()])
+        entry = (struct_def, dtype)
+        _COMPILED_DTYPES[id(struct_def)] = entry
+    return entry[1]
+
 def get_byte_length_from_struct(struct_def):
-    return sum(item[1] for item in struct_def.values())
+    return compile_struct(struct_def)[0].size
 
 def read_to_struct(byte_array, struct_def):
-    result = {}
-    format_string = '<' + ''.join(item[0] for item in struct_def.values())
+    compiled, field_names = compile_struct(struct_def)
     try:
-        unpacked_data = struct.unpack(format_string, byte_array)
-        for i, field_name in enumerate(struct_def.keys()):
-            result[field_name] = unpacked_data[i]
+        unpacked_data = compiled.unpack(byte_array)
     except struct.error as e:
         logger.error(f"ERROR: Failed to unpack byte array. {e}")
         return None
-    return result
\ No newline at end of file
+    return dict(zip(field_names, unpacked_data))
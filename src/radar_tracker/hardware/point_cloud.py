@@ -0,0 +1,109 @@
+# src/radar_tracker/hardware/point_cloud.py
+
+import numpy as np
+
+# Row order of the (5, N) point-cloud array used throughout the tracker.
+POINT_CLOUD_ROWS = ('range', 'x', 'y', 'doppler', 'snr')
+_ROW_INDEX = {name: row for row, name in enumerate(POINT_CLOUD_ROWS)}
+
+
+class PointCloud:
+    """
+    The detected points of one frame, kept in the sensor's fixed-point format.
+
+    The parser stores the raw structured records (int16 x/y/z/doppler, uint8
+    snr) and the unit scales from the point-unit TLV. Scaled columns are only
+    computed when asked for, directly in the requested dtype, and 'range' is
+    only derived when it is used. as_array() builds the (5, N) array
+    [range, x, y, doppler, snr] once per dtype and caches it.
+
+    A PointCloud can also wrap an already scaled (5, N) array (from_array),
+    e.g. one taken out of the ingest ring or built by a test.
+    """
+    def __init__(self, raw=None, xyz_unit=1.0, doppler_unit=1.0, snr_unit=1.0):
+        self.raw = raw
+        self.xyz_unit = xyz_unit
+        self.doppler_unit = doppler_unit
+        self.snr_unit = snr_unit
+        self._columns = {}  # (name, dtype) -> scaled 1-D array
+        self._arrays = {}   # dtype -> (5, N) array
+
+    @classmethod
+    def from_array(cls, array):
+        """Wraps an already scaled (5, N) point-cloud array."""
+        point_cloud = cls()
+        array = np.asarray(array)
+        point_cloud._arrays[array.dtype] = array
+        return point_cloud
+
+    def __len__(self):
+        if self.raw is not None:
+            return len(self.raw)
+        array = next(iter(self._arrays.values()), None)
+        return array.shape[1] if array is not None and array.ndim == 2 else 0
+
+    def column(self, name, dtype=np.float64):
+        """Returns one scaled column ('range', 'x', 'y', 'z', 'doppler' or 'snr') in 'dtype'."""
+        dtype = np.dtype(dtype)
+        key = (name, dtype)
+        if key in self._columns:
+            return self._columns[key]
+        if dtype in self._arrays and name in _ROW_INDEX:
+            return self._arrays[dtype][_ROW_INDEX[name]]
+
+        if self.raw is None:
+            source = next(iter(self._arrays.values()))
+            values = source[_ROW_INDEX[name]].astype(dtype)
+        else:
+            values = self._scale(name, dtype)
+        self._columns[key] = values
+        return values
+
+    def as_array(self, dtype=np.float64):
+        """Returns the (5, N) array [range, x, y, doppler, snr] in 'dtype'."""
+        dtype = np.dtype(dtype)
+        array = self._arrays.get(dtype)
+        if array is not None:
+            return array
+
+        if self.raw is None:
+            if not self._arrays:
+                return np.empty((len(POINT_CLOUD_ROWS), 0), dtype=dtype)
+            array = next(iter(self._arrays.values())).astype(dtype)
+        else:
+            # Scale straight into the rows of the array instead of stacking temporaries.
+            array = np.empty((len(POINT_CLOUD_ROWS), len(self.raw)), dtype=dtype)
+            for name in ('x', 'y', 'doppler', 'snr'):
+                cached = self._columns.pop((name, dtype), None)
+                if cached is not None:
+                    array[_ROW_INDEX[name]] = cached
+                else:
+                    self._scale(name, dtype, out=array[_ROW_INDEX[name]])
+            self._columns.pop(('range', dtype), None)
+            z = self._columns.pop(('z', dtype), None)
+            if z is None:
+                z = self._scale('z', dtype)
+            _range(array[1], array[2], z, out=array[0])
+        self._arrays[dtype] = array
+        return array
+
+    def _scale(self, name, dtype, out=None):
+        if name == 'range':
+            return _range(self.column('x', dtype), self.column('y', dtype), self.column('z', dtype), out=out)
+        unit = self.doppler_unit if name == 'doppler' else self.snr_unit if name == 'snr' else self.xyz_unit
+        return np.multiply(self.raw[name], unit, out=out, dtype=dtype)
+
+    @property
+    def nbytes(self):
+        """Bytes currently held by the raw records, scaled columns and arrays."""
+        total = self.raw.nbytes if self.raw is not None else 0
+        total += sum(column.nbytes for column in self._columns.values())
+        total += sum(array.nbytes for array in self._arrays.values())
+        return total
+
+
+def _range(x, y, z, out=None):
+    squared = x * x
+    squared += y * y
+    squared += z * z
+    return np.sqrt(squared, out=out)
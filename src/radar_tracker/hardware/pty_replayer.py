@@ -0,0 +1,156 @@
+# src/radar_tracker/hardware/pty_replayer.py
+
+import os
+import pty
+import select
+import threading
+import time
+import tty
+from ..console_logger import logger
+from ..raw_logger import RawCaptureReader
+
+# What the sensor CLI answers to every command it accepts.
+CLI_RESPONSE = b'Done\r\nmmwDemo:/>'
+
+
+class PtyRadarReplayer:
+    """
+    Stands in for the radar on a Linux pseudo-terminal.
+
+    The slave side ('port_path') can be passed to the live path as the radar's
+    COM port. The replayer answers every CLI command sent while configuring the
+    sensor and, once 'sensorStart' arrives, streams the frames of a raw capture
+    (see raw_logger.RawFrameRecorder) to the port at the frame period divided
+    by 'speedup'. A 'speedup' of 0 streams as fast as the port accepts data.
+
+    Like a real UART, the replayer does not wait for a slow reader: if the
+    pty buffer is full when a frame is due, the frame is dropped and counted.
+    """
+    def __init__(self, capture_path, frame_period_s, speedup=1.0, loop=False):
+        self.frames = RawCaptureReader(capture_path)
+        self.frame_period_s = frame_period_s
+        self.speedup = speedup
+        self.loop = loop
+
+        self._master_fd, self._slave_fd = pty.openpty()
+        tty.setraw(self._slave_fd)
+        self.port_path = os.ttyname(self._slave_fd)
+        os.set_blocking(self._master_fd, False)
+
+        self._stop_event = threading.Event()
+        self.streaming = threading.Event()
+        self.finished = threading.Event()
+        self._thread = None
+
+        # --- Statistics ---
+        self.commands = []
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.late_frames = 0    # Frames sent more than one period after their due time
+        self.stream_start_time = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="PtyRadarReplayer", daemon=True)
+        self._thread.start()
+        logger.info(f"--- Radar replayer listening on {self.port_path} ({len(self.frames)} frames) ---")
+        return self
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+        self.frames.close()
+        for fd in (self._master_fd, self._slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    # --- Worker thread ---
+    def _run(self):
+        try:
+            self._serve_cli()
+            if not self._stop_event.is_set():
+                self._stream_frames()
+        except OSError as e:
+            if not self._stop_event.is_set():
+                logger.error(f"Radar replayer stopped: {e}")
+        finally:
+            self.finished.set()
+
+    def _serve_cli(self):
+        """Answers CLI commands until 'sensorStart' is received."""
+        pending = b''
+        while not self._stop_event.is_set():
+            readable, _, _ = select.select([self._master_fd], [], [], 0.1)
+            if not readable:
+                continue
+            pending += os.read(self._master_fd, 4096)
+            while b'\n' in pending:
+                line, pending = pending.split(b'\n', 1)
+                command = line.strip().decode(errors='replace')
+                if not command:
+                    continue
+                self.commands.append(command)
+                self._write_all(command.encode() + b'\r\n' + CLI_RESPONSE)
+                if command.startswith('sensorStart'):
+                    return
+
+    def _stream_frames(self):
+        """Writes recorded frames to the port on the replay schedule."""
+        # Give the host time to switch baud rate and flush its input buffer.
+        time.sleep(0.5)
+        self._drain_input()
+        self.streaming.set()
+        interval = self.frame_period_s / self.speedup if self.speedup else 0.0
+        self.stream_start_time = next_due = time.perf_counter()
+
+        while not self._stop_event.is_set():
+            for i in range(len(self.frames)):
+                if self._stop_event.is_set():
+                    return
+                if interval:
+                    delay = next_due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    elif -delay > interval:
+                        self.late_frames += 1
+                    next_due += interval
+                self._send_frame(self.frames.read_frame_bytes(i))
+                self._drain_input()
+            if not self.loop:
+                return
+
+    def _send_frame(self, frame_bytes):
+        """Writes one frame, dropping it if the port cannot take any data right now."""
+        try:
+            written = os.write(self._master_fd, frame_bytes)
+        except BlockingIOError:
+            if not self.speedup:
+                # Flat-out replay: wait for the reader instead of dropping.
+                self._write_all(frame_bytes)
+                self.frames_sent += 1
+                return
+            self.frames_dropped += 1
+            return
+        if written < len(frame_bytes):
+            self._write_all(frame_bytes[written:])
+        self.frames_sent += 1
+
+    def _write_all(self, data):
+        view = memoryview(data)
+        while view and not self._stop_event.is_set():
+            _, writable, _ = select.select([], [self._master_fd], [], 0.1)
+            if not writable:
+                continue
+            try:
+                written = os.write(self._master_fd, view)
+            except BlockingIOError:
+                continue
+            view = view[written:]
+
+    def _drain_input(self):
+        """Discards anything the host writes after configuration (e.g. stray CLI input)."""
+        while select.select([self._master_fd], [], [], 0)[0]:
+            if not os.read(self._master_fd, 4096):
+                break
@@ -1,9 +1,10 @@
-import struct
+import time
 import numpy as np
 
 # MODIFICATION: Changed local imports to be relative
 from . import hw_comms_utils
 from . import parsing_utils
+from .point_cloud import PointCloud
 from ..console_logger import logger, log_debug
 
 # --- TLV Type Constants ---
@@ -66,30 +67,80 @@ STATS_TEMP_STRUCT = {
     'pm': ('h', 2), 'dig': ('h', 2)
 }
 
+# Target list TLV record (72 bytes per target, as specified in read_and_parse_frame.m)
+TARGET_DTYPE = np.dtype([
+    ('TID', '<u4'),             # uint32
+    ('S', '<f4', (6,)),         # single[6]: posX, posY, velX, velY, accX, accY
+    ('EC', '<f4', (9,)),        # single[9]: error covariance
+    ('G', '<f4'),               # single
+    ('Conf', '<f4'),            # single
+])
+
+# --- Compiled Structures ---
+# Compiled once at import so the per-frame path never rebuilds format strings.
+_FRAME_HEADER, _FRAME_HEADER_FIELDS = parsing_utils.compile_struct(FRAME_HEADER_STRUCT)
+_TLV_HEADER, _ = parsing_utils.compile_struct(TLV_HEADER_STRUCT)
+FRAME_HEADER_LENGTH = _FRAME_HEADER.size
+TLV_HEADER_LENGTH = _TLV_HEADER.size
+POINT_UNIT_LENGTH = parsing_utils.get_byte_length_from_struct(POINT_UNIT_STRUCT)
+POINT_DTYPE = parsing_utils.struct_to_dtype(POINT_STRUCT_CARTESIAN)
+
 
 class FrameData:
     """A class to hold the parsed data for a single frame."""
     def __init__(self):
         self.header = {}
-        self.point_cloud = np.array([])
+        self.points = None # PointCloud; 'point_cloud' is its (5, N) float64 array
         self.num_points = 0
         self.target_list = {}
         self.num_targets = 0
         self.stats_info = {}
+        self.host_timestamp = None # Host wall-clock time (s) at which the frame was received
+
+    @property
+    def point_cloud(self):
+        """The (5, N) float64 array [range, x, y, doppler, snr], built on first access."""
+        if self.points is None:
+            return np.array([])
+        return self.points.as_array(np.float64)
+
+    @point_cloud.setter
+    def point_cloud(self, array):
+        array = np.asarray(array)
+        self.points = PointCloud.from_array(array) if array.size > 0 else None
 
-def read_and_parse_frame(h_data_port, params):
+def read_and_parse_frame(h_data_port, params, frame_reader=None, recorder=None):
     """
     Reads and parses one complete data frame from the UART stream.
 
     Args:
         h_data_port (serial.Serial): The open serial port for data.
         params (RadarParams): The parsed radar configuration parameters.
+        frame_reader (FrameReader, optional): A buffered reader wrapping
+            'h_data_port'. When given, the frame is read in bulk from its
+            buffer instead of byte-by-byte from the port.
+        recorder (RawFrameRecorder, optional): If given, the raw bytes of every
+            complete frame are appended to its capture before parsing.
 
     Returns:
         FrameData or None: A FrameData object with parsed info, or None on failure.
     """
-    frame_header_length = parsing_utils.get_byte_length_from_struct(FRAME_HEADER_STRUCT)
-    tlv_header_length = parsing_utils.get_byte_length_from_struct(TLV_HEADER_STRUCT)
+    if frame_reader is not None:
+        frame_bytes = frame_reader.read_frame()
+        if frame_bytes is None:
+            logger.warning("Incomplete frame received.")
+            return None
+        if frame_reader.last_skipped:
+            logger.warning(f"Resynced to frame header after skipping {frame_reader.last_skipped} bytes.")
+        host_timestamp = time.time()
+        if recorder is not None:
+            recorder.record(frame_bytes, host_timestamp)
+        frame_data = parse_frame(frame_bytes, params)
+        if frame_data is not None:
+            frame_data.host_timestamp = host_timestamp
+        return frame_data
+
+    frame_header_length = FRAME_HEADER_LENGTH
 
     # --- Read Frame Header and Payload ---
     rx_header_bytes, byte_count, _ = hw_comms_utils.read_frame_header(h_data_port, frame_header_length)
@@ -113,6 +164,46 @@ def read_and_parse_frame(h_data_port, params):
     else:
         payload_bytes = b''
 
+    host_timestamp = time.time()
+    if recorder is not None:
+        recorder.record(rx_header_bytes + payload_bytes, host_timestamp)
+
+    frame_data = _parse_payload(frame_header, payload_bytes, params)
+    frame_data.host_timestamp = host_timestamp
+    return frame_data
+
+
+def parse_frame(frame_bytes, params):
+    """
+    Parses one complete frame (header + TLVs) that is already in memory.
+
+    Args:
+        frame_bytes (bytes-like): The raw frame, e.g. a memoryview from FrameReader.
+        params (RadarParams): The parsed radar configuration parameters.
+
+    Returns:
+        FrameData or None: A FrameData object with parsed info, or None on failure.
+    """
+    frame_header_length = FRAME_HEADER_LENGTH
+    if len(frame_bytes) < frame_header_length:
+        logger.warning("Incomplete header received.")
+        return None
+
+    frame_header = dict(zip(_FRAME_HEADER_FIELDS, _FRAME_HEADER.unpack_from(frame_bytes)))
+
+    payload_bytes = frame_bytes[frame_header_length:frame_header['packetLength']]
+    if len(payload_bytes) != frame_header['packetLength'] - frame_header_length:
+        logger.warning("Incomplete payload received.")
+        return None
+
+    return _parse_payload(frame_header, payload_bytes, params)
+
+
+def _parse_payload(frame_header, payload_bytes, params):
+    """Parses the TLVs in a frame payload into a FrameData object."""
+    tlv_header_length = TLV_HEADER_LENGTH
+    data_length = len(payload_bytes)
+
     frame_data = FrameData()
     frame_data.header = frame_header
     
@@ -125,11 +216,7 @@ def read_and_parse_frame(h_data_port, params):
             break
         
         # Read TLV header
-        tlv_header = parsing_utils.read_to_struct(
-            payload_bytes[offset : offset + tlv_header_length], TLV_HEADER_STRUCT
-        )
-        value_length = tlv_header['length']
-        tlv_type = tlv_header['type']
+        tlv_type, value_length = _TLV_HEADER.unpack_from(payload_bytes, offset)
 
         # --- NEW: Added debug message for TLV header ---
         log_debug(f"[DEBUG] Found TLV #{i+1} of {frame_header['numTLVs']}: Type={tlv_type}, Length={value_length} bytes, at offset={offset}", 'log_can_interpolation')
@@ -146,14 +233,9 @@ def read_and_parse_frame(h_data_port, params):
         value_bytes = payload_bytes[value_offset : value_offset + value_length]
 
         # --- Handle TLVs based on type ---
-        if tlv_type == MMWDEMO_OUTPUT_EXT_MSG_DETECTED_POINTS:
-            parse_point_cloud_tlv(frame_data, value_bytes, params)
-
-        elif tlv_type == MMWDEMO_OUTPUT_EXT_MSG_STATS:
-            parse_stats_tlv(frame_data, value_bytes)
-
-        elif tlv_type == MMWDEMO_OUTPUT_EXT_MSG_TARGET_LIST_2D_BSD:
-            parse_target_list_tlv(frame_data, value_bytes)
+        tlv_parser = TLV_PARSERS.get(tlv_type)
+        if tlv_parser is not None:
+            tlv_parser(frame_data, value_bytes, params)
 
         # Advance to the next TLV
         offset += total_tlv_length
@@ -163,8 +245,8 @@ def read_and_parse_frame(h_data_port, params):
 
 def parse_point_cloud_tlv(frame_data, value_bytes, params):
     """Parses the point cloud TLV."""
-    point_unit_len = parsing_utils.get_byte_length_from_struct(POINT_UNIT_STRUCT)
-    point_len = parsing_utils.get_byte_length_from_struct(POINT_STRUCT_CARTESIAN)
+    point_unit_len = POINT_UNIT_LENGTH
+    point_len = POINT_DTYPE.itemsize
 
     point_unit = parsing_utils.read_to_struct(value_bytes[:point_unit_len], POINT_UNIT_STRUCT)
     num_input_points = (len(value_bytes) - point_unit_len) // point_len
@@ -175,30 +257,20 @@ def parse_point_cloud_tlv(frame_data, value_bytes, params):
 
     if num_input_points > 0:
         points_offset = point_unit_len
-        # Create a numpy structured array for efficiency
-        dt = np.dtype([('x', 'i2'), ('y', 'i2'), ('z', 'i2'), 
-                       ('doppler', 'i2'), ('snr', 'u1'), ('noise', 'u1')])
-        
-        point_cloud_data = np.frombuffer(
-            value_bytes, dtype=dt, count=num_input_points, offset=points_offset
-        )
-        
-        # Scale the raw data to get metric units
-        x = point_unit['xyzUnit'] * point_cloud_data['x']
-        y = point_unit['xyzUnit'] * point_cloud_data['y']
-        z = point_unit['xyzUnit'] * point_cloud_data['z']
-        doppler = point_unit['dopplerUnit'] * point_cloud_data['doppler']
-        snr = point_unit['snrUnit'] * point_cloud_data['snr']
-        
-        range_val = np.sqrt(x**2 + y**2 + z**2)
-        
-        # Store as a (5, N) numpy array: [range, azimuth, elevation, doppler, snr]
+        # Copy the raw records out: 'value_bytes' may be a view into a reused read buffer.
+        raw_points = np.frombuffer(
+            value_bytes, dtype=POINT_DTYPE, count=num_input_points, offset=points_offset
+        ).copy()
+
+        # Scaling to metric units (and the range column) is deferred until a
+        # consumer asks for the points in the dtype it works in.
         # Note: Azimuth/Elevation calculation is simplified here. The original MATLAB
         # code contains a more complex calculation that can be ported if needed.
-        frame_data.point_cloud = np.vstack((range_val, x, y, doppler, snr))
+        frame_data.points = PointCloud(raw_points, point_unit['xyzUnit'],
+                                       point_unit['dopplerUnit'], point_unit['snrUnit'])
 
 
-def parse_stats_tlv(frame_data, value_bytes):
+def parse_stats_tlv(frame_data, value_bytes, params=None):
     """Parses the statistics TLV."""
     timing_len = parsing_utils.get_byte_length_from_struct(STATS_TIMING_STRUCT)
     power_len = parsing_utils.get_byte_length_from_struct(STATS_POWER_STRUCT)
@@ -223,39 +295,34 @@ def parse_stats_tlv(frame_data, value_bytes):
     log_debug(f"[DEBUG] Stats TLV: Parsed timing, power, and temperature info.", 'log_can_interpolation')
 
 
-def parse_target_list_tlv(frame_data, value_bytes):
+def parse_target_list_tlv(frame_data, value_bytes, params=None):
     """Parses the target list (tracker) TLV."""
-    target_length_in_bytes = 72  # As specified in read_and_parse_frame.m
-    num_targets = len(value_bytes) // target_length_in_bytes
+    num_targets = len(value_bytes) // TARGET_DTYPE.itemsize
     frame_data.num_targets = num_targets
     
     # --- NEW: Added debug message for target list data ---
     log_debug(f"[DEBUG] Target List TLV: Found {num_targets} targets.", 'log_can_interpolation')
 
     if num_targets > 0:
-        targets = {
-            'TID': np.zeros(num_targets, dtype='u4'),
-            'S': np.zeros((6, num_targets), dtype='f4'),
-            'EC': np.zeros((9, num_targets), dtype='f4'),
-            'G': np.zeros(num_targets, dtype='f4'),
-            'Conf': np.zeros(num_targets, dtype='f4'),
-            'tPos': np.zeros((2, num_targets), dtype='f4')
+        # Decode all records at once. The arrays are copied out of the record view
+        # because the frame buffer may be reused once parsing returns.
+        records = np.frombuffer(value_bytes, dtype=TARGET_DTYPE, count=num_targets)
+        state = np.ascontiguousarray(records['S'].T)
+        frame_data.target_list = {
+            'TID': records['TID'].copy(),
+            'S': state,
+            'EC': np.ascontiguousarray(records['EC'].T),
+            'G': records['G'].copy(),
+            'Conf': records['Conf'].copy(),
+            'tPos': state[0:2].copy()   # 2D position
         }
-        offset = 0
-        for i in range(num_targets):
-            # Unpack each field for the current target
-            targets['TID'][i] = struct.unpack('<I', value_bytes[offset : offset+4])[0]
-            offset += 4
-            targets['S'][:, i] = struct.unpack('<6f', value_bytes[offset : offset+24])
-            offset += 24
-            targets['EC'][:, i] = struct.unpack('<9f', value_bytes[offset : offset+36])
-            offset += 36
-            targets['G'][i] = struct.unpack('<f', value_bytes[offset : offset+4])[0]
-            offset += 4
-            targets['Conf'][i] = struct.unpack('<f', value_bytes[offset : offset+4])[0]
-            offset += 4
-            
-            # Extract 2D position
-            targets['tPos'][:, i] = targets['S'][0:2, i]
-
-        frame_data.target_list = targets
\ No newline at end of file
+
+
+# --- TLV Dispatch Table ---
+# Maps a TLV type to its parser; every parser takes (frame_data, value_bytes, params).
+# Unknown TLV types are skipped.
+TLV_PARSERS = {
+    MMWDEMO_OUTPUT_EXT_MSG_DETECTED_POINTS: parse_point_cloud_tlv,
+    MMWDEMO_OUTPUT_EXT_MSG_STATS: parse_stats_tlv,
+    MMWDEMO_OUTPUT_EXT_MSG_TARGET_LIST_2D_BSD: parse_target_list_tlv,
+}
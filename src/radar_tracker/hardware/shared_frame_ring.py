@@ -0,0 +1,177 @@
+# src/radar_tracker/hardware/shared_frame_ring.py
+
+import sys
+import numpy as np
+from multiprocessing import shared_memory, resource_tracker
+from ..console_logger import logger
+
+# Header fields carried alongside each point cloud. The tracker only needs
+# these; the full stats and target-list TLVs stay in the ingest process.
+SLOT_META_DTYPE = np.dtype([
+    ('frameNumber', '<u4'),
+    ('packetLength', '<u4'),
+    ('uartOverflow', '<u4'),
+    ('procOverflow', '<u4'),
+    ('numDetectObject', '<u4'),
+    ('numTLVs', '<u4'),
+    ('num_points', '<i4'),
+    ('truncated', '<u4'),
+    ('host_timestamp', '<f8'),
+])
+
+# Control block: [frames written, frames read, frames dropped because the ring was full]
+_WRITE_COUNT, _READ_COUNT, _DROPPED_COUNT = 0, 1, 2
+_CONTROL_FIELDS = 3
+_POINT_ROWS = 5 # [range, x, y, doppler, snr]
+
+
+class SharedFrameRing:
+    """
+    A single-producer / single-consumer ring of fixed-size frame slots living in
+    multiprocessing.shared_memory.
+
+    The ingest process publishes parsed point clouds with put(); the tracker
+    process consumes them with get(). A semaphore counts filled slots, so the
+    consumer can block with a timeout and the producer never waits: if the
+    ring is full the new frame is dropped and counted instead.
+    """
+    def __init__(self, num_slots, max_points, items_semaphore, name=None, create=True):
+        self.num_slots = num_slots
+        self.max_points = max_points
+        self.items = items_semaphore
+
+        control_bytes = _CONTROL_FIELDS * 8
+        meta_bytes = num_slots * SLOT_META_DTYPE.itemsize
+        points_bytes = num_slots * _POINT_ROWS * max_points * 8
+        self._owner = create
+
+        if create:
+            self.shm = shared_memory.SharedMemory(create=True, size=control_bytes + meta_bytes + points_bytes)
+        else:
+            self.shm = _attach_shared_memory(name)
+
+        buf = self.shm.buf
+        self._control = np.ndarray((_CONTROL_FIELDS,), dtype=np.int64, buffer=buf, offset=0)
+        self._meta = np.ndarray((num_slots,), dtype=SLOT_META_DTYPE, buffer=buf, offset=control_bytes)
+        self._points = np.ndarray(
+            (num_slots, _POINT_ROWS, max_points), dtype=np.float64, buffer=buf,
+            offset=control_bytes + meta_bytes
+        )
+        if create:
+            self._control[:] = 0
+
+    @classmethod
+    def create(cls, num_slots, max_points, ctx=None):
+        """Creates a new ring. 'ctx' is an optional multiprocessing context."""
+        import multiprocessing
+        ctx = ctx or multiprocessing
+        return cls(num_slots, max_points, ctx.Semaphore(0), create=True)
+
+    def spec(self):
+        """Returns the picklable description needed to attach from another process."""
+        return (self.shm.name, self.num_slots, self.max_points, self.items)
+
+    @classmethod
+    def attach(cls, spec):
+        """Attaches to an existing ring from the spec() of its creator."""
+        name, num_slots, max_points, items = spec
+        return cls(num_slots, max_points, items, name=name, create=False)
+
+    # --- Metrics ---
+    @property
+    def depth(self):
+        """Number of frames published but not yet consumed (the tracker's backlog)."""
+        return int(self._control[_WRITE_COUNT] - self._control[_READ_COUNT])
+
+    @property
+    def dropped(self):
+        """Number of frames the producer had to drop because the ring was full."""
+        return int(self._control[_DROPPED_COUNT])
+
+    @property
+    def written(self):
+        return int(self._control[_WRITE_COUNT])
+
+    # --- Producer side ---
+    def put(self, frame_data, host_timestamp):
+        """
+        Publishes the point cloud and header fields of a parsed FrameData.
+
+        Returns:
+            bool: True if published, False if the ring was full and the frame was dropped.
+        """
+        write_count = int(self._control[_WRITE_COUNT])
+        if write_count - int(self._control[_READ_COUNT]) >= self.num_slots:
+            self._control[_DROPPED_COUNT] += 1
+            return False
+
+        slot = write_count % self.num_slots
+        meta = self._meta[slot]
+        header = frame_data.header
+        for field in ('frameNumber', 'packetLength', 'uartOverflow', 'procOverflow', 'numDetectObject', 'numTLVs'):
+            meta[field] = header.get(field, 0)
+
+        point_cloud = frame_data.point_cloud
+        num_points = point_cloud.shape[1] if point_cloud.ndim == 2 else 0
+        meta['truncated'] = max(num_points - self.max_points, 0)
+        num_points = min(num_points, self.max_points)
+        meta['num_points'] = num_points
+        meta['host_timestamp'] = host_timestamp
+        if num_points:
+            self._points[slot, :, :num_points] = point_cloud[:, :num_points]
+
+        # Publish only after the slot is fully written.
+        self._control[_WRITE_COUNT] = write_count + 1
+        self.items.release()
+        return True
+
+    # --- Consumer side ---
+    def get(self, timeout=None):
+        """
+        Takes the oldest frame out of the ring.
+
+        Returns:
+            tuple or None: (header dict, point_cloud (5, N) array, host_timestamp),
+            or None if no frame arrived within 'timeout' seconds.
+        """
+        if not self.items.acquire(timeout=timeout):
+            return None
+
+        read_count = int(self._control[_READ_COUNT])
+        slot = read_count % self.num_slots
+        meta = self._meta[slot]
+        header = {field: int(meta[field]) for field in
+                  ('frameNumber', 'packetLength', 'uartOverflow', 'procOverflow', 'numDetectObject', 'numTLVs')}
+        num_points = int(meta['num_points'])
+        if meta['truncated']:
+            logger.warning(f"Frame {header['frameNumber']} had {int(meta['truncated'])} points beyond the ingest ring capacity.")
+        point_cloud = self._points[slot, :, :num_points].copy()
+        host_timestamp = float(meta['host_timestamp'])
+
+        # Release the slot back to the producer.
+        self._control[_READ_COUNT] = read_count + 1
+        return header, point_cloud, host_timestamp
+
+    def close(self):
+        """Detaches from the shared memory, unlinking it if this side created it."""
+        # Drop the numpy views first so the buffer can be released.
+        self._control = self._meta = self._points = None
+        self.shm.close()
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _attach_shared_memory(name):
+    """
+    Attaches to an existing segment without registering it with this process's
+    resource tracker, since only the creating side may unlink it.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=False, track=False)
+    shm = shared_memory.SharedMemory(name=name, create=False)
+    if sys.platform != 'win32':
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
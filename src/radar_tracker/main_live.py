@@ -10,19 +10,25 @@ import os
 import serial.tools.list_ports
 import platform
 import copy
+import multiprocessing
 
 from PyQt5.QtWidgets import QApplication
 from PyQt5.QtCore import QThread, pyqtSignal, QObject
 
 # --- Import project modules ---
 from .hardware import hw_comms_utils, parsing_utils
-from .hardware.read_and_parse_frame import read_and_parse_frame
+from .hardware.read_and_parse_frame import read_and_parse_frame, FRAME_HEADER_STRUCT
+from .hardware.frame_reader import FrameReader
+from .hardware.shared_frame_ring import SharedFrameRing
+from .radar_ingest import radar_ingest_process, frame_data_from_ring
 from .data_adapter import adapt_frame_data_to_fhist
+from .frame_pacing import FrameSequenceMonitor, CatchUpPolicy
 from .tracking.tracker import RadarTracker
 from .tracking.parameters import define_parameters
 from .tracking.update_and_save_history import update_and_save_history
 from .live_visualizer import LiveVisualizer
 from .json_logger import DataLogger
+from .raw_logger import RawFrameRecorder
 from .console_logger import logger
 # --- REMOVED LiveCANManager ---
 import config as root_config
@@ -34,6 +40,34 @@ import serial.tools.list_ports
 # --- Configuration ---
 CONFIG_FILE_PATH = 'configs/profile_80_m_40mpsec_bsdevm_16tracks_dyClutter.cfg'
 INITIAL_BAUD_RATE = 115200
+# Skip sensor configuration when this .cfg was last applied and the sensor is still streaming
+SKIP_CONFIG_IF_STREAMING = False # Opt-in: the sensor may have been reconfigured by another tool
+
+# --- Ingest Mode ---
+# 'thread':  the worker thread reads the serial port itself.
+# 'process': a dedicated process owns the serial port and hands parsed point
+#            clouds to the tracker through a shared-memory ring, so a slow
+#            tracking frame cannot back up the UART buffer.
+INGEST_MODE = 'thread'
+INGEST_RING_SLOTS = 32          # Frames the tracker may fall behind before frames are dropped
+INGEST_MAX_POINTS = 1024        # Points per ring slot; larger point clouds are truncated
+INGEST_READY_TIMEOUT_S = 30.0   # Time allowed for the ingest process to configure the sensor
+
+# --- Catch-up Policy ---
+# What the tracker does with frames that arrive while it is behind:
+# 'all':     track every frame (latency grows while overloaded).
+# 'latest':  skip to the newest waiting frame.
+# 'every_k': track only every CATCH_UP_EVERY_K-th frame until caught up.
+# Skipped frames are still written to the radar log but are left out of track_history.json.
+CATCH_UP_POLICY = 'all' # Opt in to 'latest' or 'every_k' to bound latency
+CATCH_UP_EVERY_K = 2
+
+# --- Radar Data Log Format ---
+# 'json': parsed frames are re-serialized to radar_log.json by the DataLogger thread.
+# 'raw':  the exact UART frame bytes are appended to radar_raw.bin with a
+#         sidecar index (radar_raw.idx); re-parse them with raw_logger.RawCaptureReader.
+# 'both': write both logs.
+RADAR_LOG_FORMAT = 'json'
 
 def select_com_port():
     """
@@ -82,7 +116,7 @@ class RadarWorker(QObject):
     close_visualizer = pyqtSignal()
 
     # MODIFIED: Accepts shared_live_can_data dict
-    def __init__(self, cli_com_port, config_file, output_dir, shutdown_flag=None, shared_live_can_data=None, can_logger_ready=None):
+    def __init__(self, cli_com_port, config_file, output_dir, shutdown_flag=None, shared_live_can_data=None, can_logger_ready=None, ingest_mode=INGEST_MODE):
         super().__init__()
         self.cli_com_port = cli_com_port
         self.config_file = config_file
@@ -90,10 +124,18 @@ class RadarWorker(QObject):
         self.is_running = True
         self.params_radar = None
         self.h_data_port = None
+        self.frame_reader = None
+        self.ingest_mode = ingest_mode
+        self.frame_ring = None
+        self.ingest_process = None
+        self.ingest_stop_event = None
         self.tracker = None
+        self.frame_monitor = None
+        self.catch_up = None
         self.fhist_history = []
         self.logger_thread = None
         self.data_logger = None
+        self.raw_recorder = None
         self.shutdown_flag = shutdown_flag
         self.can_logger_ready = can_logger_ready
         
@@ -106,12 +148,13 @@ class RadarWorker(QObject):
         """The main processing loop."""
         process = psutil.Process(os.getpid())
 
-        log_filename = os.path.join(self.output_dir, f"radar_log.json")
-        self.logger_thread = QThread()
-        self.data_logger = DataLogger(log_filename)
-        self.data_logger.moveToThread(self.logger_thread)
-        self.logger_thread.started.connect(self.data_logger.run)
-        self.logger_thread.start()
+        if RADAR_LOG_FORMAT in ('json', 'both'):
+            log_filename = os.path.join(self.output_dir, f"radar_log.json")
+            self.logger_thread = QThread()
+            self.data_logger = DataLogger(log_filename)
+            self.data_logger.moveToThread(self.logger_thread)
+            self.logger_thread.started.connect(self.data_logger.run)
+            self.logger_thread.start()
 
         # MODIFIED: Removed can_manager.start()
         # The CAN logger process is already running, started by main.py
@@ -125,16 +168,32 @@ class RadarWorker(QObject):
                 logger.warning("Could not import gpio_handler to blink LED.")
 
 
-        self.params_radar, self.h_data_port = self._configure_sensor()
-        if not self.params_radar or not self.h_data_port:
+        if self.ingest_mode == 'process':
+            sensor_ready = self._start_ingest_process()
+        else:
+            self.params_radar, self.h_data_port = self._configure_sensor()
+            sensor_ready = bool(self.params_radar and self.h_data_port)
+        if not sensor_ready:
             logger.error("Failed to configure sensor. Exiting worker thread.")
             self.stop()
+            self._shutdown_ingest_process()
             self.finished.emit()
             self.close_visualizer.emit()
             return
 
+        if self.h_data_port:
+            # Wrap the data port in a buffered reader so frames are pulled in bulk
+            self.frame_reader = FrameReader(
+                self.h_data_port, parsing_utils.get_byte_length_from_struct(FRAME_HEADER_STRUCT)
+            )
+            raw_capture_path = self._raw_capture_path()
+            if raw_capture_path:
+                self.raw_recorder = RawFrameRecorder(raw_capture_path)
+
         params_tracker = define_parameters()
         self.tracker = RadarTracker(params_tracker)
+        self.frame_monitor = FrameSequenceMonitor(self.params_radar.frameCfg.framePeriodicity or 50.0)
+        self.catch_up = CatchUpPolicy(CATCH_UP_POLICY, CATCH_UP_EVERY_K)
 
         # Wait for the CAN logger to be ready
         if self.can_logger_ready:
@@ -151,36 +210,48 @@ class RadarWorker(QObject):
                 self.is_running = False
                 continue
 
-            frame_data = read_and_parse_frame(self.h_data_port, self.params_radar)
+            frame_data = self._read_next_frame()
             if not frame_data or not frame_data.header:
                 continue
             
-            self.data_logger.add_data(frame_data)
+            if self.data_logger:
+                self.data_logger.add_data(frame_data)
+
+            # Timestamp from the sensor's frame counter, so lost or skipped frames
+            # still give the tracker the right time step.
+            current_timestamp_ms = self.frame_monitor.update(frame_data)
+            if not self.catch_up.should_process(self._frames_waiting()):
+                continue
 
             # --- MODIFIED: Get CAN data *before* adapting the frame ---
             # This allows us to inject the vehicle's speed into the frame history
             # object that the tracker uses for ego motion compensation.
-            current_timestamp_ms = self.tracker.last_timestamp_ms + 50.0
-            can_data_for_frame = self._interpolate_can_data(current_timestamp_ms)
-            fhist_frame = adapt_frame_data_to_fhist(frame_data, current_timestamp_ms, can_signals=can_data_for_frame)
+            # CAN samples carry host wall-clock timestamps, so interpolate at the host receive time.
+            can_timestamp_ms = frame_data.host_timestamp * 1000.0 if frame_data.host_timestamp else current_timestamp_ms
+            can_data_for_frame = self._interpolate_can_data(can_timestamp_ms)
+            fhist_frame = adapt_frame_data_to_fhist(frame_data, current_timestamp_ms, can_signals=can_data_for_frame,
+                                                    dtype=self.tracker.point_dtype)
             
             # --- MODIFIED: The can_signals are now inside fhist_frame ---
             updated_tracks, processed_frame = self.tracker.process_frame(fhist_frame)
             self.fhist_history.append(processed_frame)
 
-            num_confirmed_tracks = sum(1 for t in updated_tracks if t.get('isConfirmed') and not t.get('isLost'))
+            num_confirmed_tracks = updated_tracks.num_confirmed
             
             if self.tracker.frame_idx > 0 and self.tracker.frame_idx % 100 == 0:
                 mem_info = process.memory_info()
                 ram_mb = mem_info.rss / (1024 * 1024) 
                 cpu_percent = process.cpu_percent(interval=0.1)
-                logger.info(f"[PERFORMANCE] Frame: {self.tracker.frame_idx} | CPU: {cpu_percent:.2f}% | RAM: {ram_mb:.2f} MB")
+                logger.info(f"[PERFORMANCE] Frame: {self.tracker.frame_idx} | CPU: {cpu_percent:.2f}% | RAM: {ram_mb:.2f} MB | {self._ingest_metrics()} | {self.frame_monitor.summary()} | {self.catch_up.summary()} | {self.tracker.clustering_summary()} | {self.tracker.ransac_summary()} | {self.tracker.gating_summary()} | {self.tracker.jpda_summary()}")
 
             logger.info(f"Frame: {self.tracker.frame_idx} | Detections: {frame_data.num_points} | Confirmed Tracks: {num_confirmed_tracks}")
 
             self.frame_ready.emit(frame_data)
 
         self._save_tracking_history()
+        self._shutdown_ingest_process()
+        if self.raw_recorder:
+            self.raw_recorder.close()
         self.finished.emit()
 
     def _interpolate_can_data(self, radar_timestamp_ms):
@@ -254,34 +325,82 @@ class RadarWorker(QObject):
 
     def _configure_sensor(self):
         """Reads the config file and sends commands to the radar."""
-        cli_cfg = parsing_utils.read_cfg(self.config_file)
-        if not cli_cfg: return None, None
-        params = parsing_utils.parse_cfg(cli_cfg)
-        target_baud_rate = INITIAL_BAUD_RATE
-        for command in cli_cfg:
-            if command.startswith("baudRate"):
-                try: target_baud_rate = int(command.split()[1])
-                except (ValueError, IndexError): pass
-                break
-        logger.info("\n--- Starting Sensor Configuration ---")
-        h_port = hw_comms_utils.configure_control_port(self.cli_com_port, INITIAL_BAUD_RATE)
-        if not h_port: return None, None
-        for command in cli_cfg:
-            logger.info(f"> {command}")
-            h_port.write((command + '\n').encode())
-            time.sleep(0.1)
-            if "baudRate" in command:
-                time.sleep(0.2)
-                try:
-                    h_port.baudrate = target_baud_rate
-                    logger.info(f"  Baud rate changed to {target_baud_rate}")
-                except Exception as e:
-                    logger.error(f"ERROR: Failed to change baud rate: {e}")
-                    h_port.close()
-                    return None, None
-        logger.info("--- Configuration complete ---\n")
-        hw_comms_utils.reconfigure_port_for_data(h_port)
-        return params, h_port
+        return hw_comms_utils.configure_sensor(
+            self.cli_com_port, self.config_file, INITIAL_BAUD_RATE, skip_if_configured=SKIP_CONFIG_IF_STREAMING
+        )
+
+    def _start_ingest_process(self):
+        """
+        Starts the radar ingest process, which configures the sensor and then
+        publishes parsed frames into a shared-memory ring. Returns True once
+        the ingest process reports that the sensor is streaming.
+        """
+        self.frame_ring = SharedFrameRing.create(INGEST_RING_SLOTS, INGEST_MAX_POINTS)
+        self.ingest_stop_event = multiprocessing.Event()
+        ready_event = multiprocessing.Event()
+        self.ingest_process = multiprocessing.Process(
+            target=radar_ingest_process,
+            args=(self.cli_com_port, self.config_file, INITIAL_BAUD_RATE,
+                  self.frame_ring.spec(), self.ingest_stop_event, ready_event,
+                  self._raw_capture_path(), SKIP_CONFIG_IF_STREAMING),
+            daemon=True
+        )
+        self.ingest_process.start()
+        logger.info(f"--- Radar ingest process started (PID: {self.ingest_process.pid}) ---")
+
+        deadline = time.time() + INGEST_READY_TIMEOUT_S
+        while not ready_event.wait(timeout=0.5):
+            if not self.ingest_process.is_alive() or time.time() > deadline:
+                return False
+            if self.shutdown_flag and self.shutdown_flag.is_set():
+                return False
+
+        # The tracker side needs the radar parameters too; parse them locally.
+        self.params_radar = parsing_utils.parse_cfg(parsing_utils.read_cfg(self.config_file))
+        return True
+
+    def _raw_capture_path(self):
+        """Returns the raw capture file path, or None if raw recording is disabled."""
+        if RADAR_LOG_FORMAT in ('raw', 'both'):
+            return os.path.join(self.output_dir, "radar_raw.bin")
+        return None
+
+    def _read_next_frame(self):
+        """Returns the next parsed frame, either from the serial port or from the ingest ring."""
+        if self.frame_ring is None:
+            return read_and_parse_frame(self.h_data_port, self.params_radar, self.frame_reader, self.raw_recorder)
+
+        frame_data = frame_data_from_ring(self.frame_ring, timeout=1.0)
+        if frame_data is None and not self.ingest_process.is_alive():
+            logger.error("Radar ingest process exited unexpectedly. Stopping tracking.")
+            self.is_running = False
+        return frame_data
+
+    def _frames_waiting(self):
+        """Number of complete frames already waiting behind the current one."""
+        if self.frame_ring is not None:
+            return self.frame_ring.depth
+        return 1 if self.frame_reader.has_buffered_frame() else 0
+
+    def _ingest_metrics(self):
+        """Formats the ingest health counters for the periodic performance log."""
+        if self.frame_ring is not None:
+            return f"Ingest Backlog: {self.frame_ring.depth} | Ingest Dropped: {self.frame_ring.dropped}"
+        return f"Resync Bytes Skipped: {self.frame_reader.bytes_skipped}"
+
+    def _shutdown_ingest_process(self):
+        """Stops the ingest process and releases the shared-memory ring."""
+        if self.ingest_process is not None:
+            self.ingest_stop_event.set()
+            self.ingest_process.join(timeout=5.0)
+            if self.ingest_process.is_alive():
+                logger.warning("Radar ingest process did not exit in time. Terminating it.")
+                self.ingest_process.terminate()
+                self.ingest_process.join()
+            self.ingest_process = None
+        if self.frame_ring is not None:
+            self.frame_ring.close()
+            self.frame_ring = None
 
     def _save_tracking_history(self):
         """Saves the final processed tracking history."""
@@ -304,6 +423,9 @@ class RadarWorker(QObject):
 
         if self.shutdown_flag:
             self.shutdown_flag.set()
+        if self.ingest_stop_event:
+            # The ring itself is released by run() once the loop has exited.
+            self.ingest_stop_event.set()
         
         if self.data_logger:
             self.data_logger.stop()
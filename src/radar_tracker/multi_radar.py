@@ -0,0 +1,237 @@
+# src/radar_tracker/multi_radar.py
+
+import os
+import sys
+import json
+import math
+import time
+import queue
+import multiprocessing
+from collections import deque
+from .console_logger import logger
+
+# --- Sensor Configuration ---
+# One entry per radar: a unique name, its CLI/data port, its .cfg file and its
+# mounting pose in the vehicle frame (x/y in metres, yaw in degrees, counter-clockwise
+# from the vehicle's forward axis). Each sensor gets its own ingest-and-track process.
+MULTI_RADAR_SENSORS = [
+    {'name': 'front', 'port': '/dev/ttyACM0', 'config': 'configs/profile_80_m_40mpsec_bsdevm_16tracks_dyClutter.cfg',
+     'mount': {'x': 3.8, 'y': 0.0, 'yaw_deg': 0.0}},
+    {'name': 'front_left', 'port': '/dev/ttyACM2', 'config': 'configs/profile_80_m_40mpsec_bsdevm_16tracks_dyClutter.cfg',
+     'mount': {'x': 3.6, 'y': 0.8, 'yaw_deg': 45.0}},
+    {'name': 'front_right', 'port': '/dev/ttyACM4', 'config': 'configs/profile_80_m_40mpsec_bsdevm_16tracks_dyClutter.cfg',
+     'mount': {'x': 3.6, 'y': -0.8, 'yaw_deg': -45.0}},
+]
+
+MERGE_PERIOD_S = 0.05       # Period of the common time base the sensor outputs are merged onto
+MERGE_MAX_LATENCY_S = 0.2   # A tick is written once this much time has passed, even if a sensor is late
+MERGE_STALE_S = 0.2         # Sensor outputs older than this at a tick are left out of that tick
+
+
+def radar_pipeline_process(sensor, output_dir, stop_event, shared_live_can_data, can_logger_ready, result_queue):
+    """
+    Runs one sensor's full live pipeline (configure, ingest, track, log) headless
+    and publishes the confirmed tracks of every frame to 'result_queue'.
+
+    'stop_event' belongs to this sensor alone: the worker sets it when it
+    stops, so a sensor that fails or exits does not stop the other pipelines
+    or the CAN logger.
+    """
+    from PyQt5.QtCore import QCoreApplication
+    from .main_live import RadarWorker
+
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv)
+    sensor_output_dir = os.path.join(output_dir, sensor['name'])
+    os.makedirs(sensor_output_dir, exist_ok=True)
+
+    worker = RadarWorker(sensor['port'], sensor['config'], sensor_output_dir, stop_event,
+                         shared_live_can_data, can_logger_ready)
+
+    def publish(frame_data):
+        result_queue.put(make_sensor_output(sensor, frame_data, worker.tracker.all_tracks))
+
+    # The worker runs on this thread, so the signal is delivered directly.
+    worker.frame_ready.connect(publish)
+    logger.info(f"--- [{sensor['name']}] Radar pipeline started on {sensor['port']} (PID: {os.getpid()}) ---")
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+        result_queue.put({'sensor': sensor['name'], 'finished': True})
+    del app
+
+
+def make_sensor_output(sensor, frame_data, all_tracks):
+    """
+    Builds the per-frame output of one sensor: its confirmed tracks transformed
+    into the vehicle frame, stamped with the host receive time of the frame.
+    """
+    mount = sensor.get('mount', {})
+    yaw = math.radians(mount.get('yaw_deg', 0.0))
+    cos_yaw, sin_yaw = math.cos(yaw), math.sin(yaw)
+
+    tracks = []
+    for track in all_tracks:
+        if not track.get('isConfirmed') or track.get('isLost'):
+            continue
+        # The tracker state is [x, y, vx, vy, ...] in the sensor frame, with x to the
+        # right of the boresight and y along it. The vehicle frame has y to the left.
+        x_state = track['immState']['x']
+        right, longitudinal, v_right, v_longitudinal = (float(v) for v in x_state[0:4, 0])
+        lateral, v_lateral = -right, -v_right
+        ttc = float(track.get('ttc', math.inf))
+        tracks.append({
+            'id': int(track['id']),
+            'x': mount.get('x', 0.0) + cos_yaw * longitudinal - sin_yaw * lateral,
+            'y': mount.get('y', 0.0) + sin_yaw * longitudinal + cos_yaw * lateral,
+            'vx': cos_yaw * v_longitudinal - sin_yaw * v_lateral,
+            'vy': sin_yaw * v_longitudinal + cos_yaw * v_lateral,
+            'ttc': ttc if math.isfinite(ttc) else None,
+        })
+
+    return {
+        'sensor': sensor['name'],
+        'frameNumber': int(frame_data.header.get('frameNumber', -1)),
+        'timestamp': frame_data.host_timestamp,
+        'tracks': tracks,
+    }
+
+
+class TrackOutputMerger:
+    """
+    Aligns the per-frame outputs of several sensors onto a common time base.
+
+    Ticks are spaced 'period_s' apart. A tick is complete once every sensor
+    has reported a frame at or after it, or once 'max_latency_s' has passed.
+    For each sensor the latest frame at or before the tick is used, with the
+    tracks extrapolated to the tick time at constant velocity.
+    """
+    def __init__(self, sensor_names, period_s=MERGE_PERIOD_S, max_latency_s=MERGE_MAX_LATENCY_S,
+                 stale_s=MERGE_STALE_S):
+        self.sensor_names = list(sensor_names)
+        self.period_s = period_s
+        self.max_latency_s = max_latency_s
+        self.stale_s = stale_s
+        self.outputs = {name: deque() for name in self.sensor_names}
+        self.finished = set()
+        self.next_tick = None
+
+    def add(self, output):
+        name = output['sensor']
+        if output.get('finished'):
+            self.finished.add(name)
+            return
+        if output.get('timestamp') is None:
+            return
+        if self.next_tick is None:
+            self.next_tick = math.ceil(output['timestamp'] / self.period_s) * self.period_s
+        self.outputs[name].append(output)
+
+    def pop_ready(self, now):
+        """Returns the merged records of all ticks that are complete at host time 'now'."""
+        merged = []
+        while self.next_tick is not None and self._tick_complete(self.next_tick, now):
+            merged.append(self._merge_tick(self.next_tick))
+            self.next_tick += self.period_s
+        return merged
+
+    def flush(self):
+        """Returns the merged records of all remaining ticks the newest sensor outputs still contribute to."""
+        newest = max((outputs[-1]['timestamp'] for outputs in self.outputs.values() if outputs), default=None)
+        if newest is None:
+            return []
+        return self.pop_ready(newest + self.stale_s + self.max_latency_s)
+
+    def _tick_complete(self, tick, now):
+        if now - tick >= self.max_latency_s:
+            return True
+        reporting = [name for name in self.sensor_names if name not in self.finished]
+        if not reporting:
+            return False # Nothing left to wait for; flush() writes the remaining ticks.
+        return all(self.outputs[name] and self.outputs[name][-1]['timestamp'] >= tick for name in reporting)
+
+    def _merge_tick(self, tick):
+        sensors = {}
+        for name, outputs in self.outputs.items():
+            # Drop frames superseded by a newer frame that is still at or before the tick.
+            while len(outputs) > 1 and outputs[1]['timestamp'] <= tick:
+                outputs.popleft()
+            if not outputs or outputs[0]['timestamp'] > tick:
+                continue
+            output = outputs[0]
+            age = tick - output['timestamp']
+            if age > self.stale_s:
+                continue
+            sensors[name] = {
+                'frameNumber': output['frameNumber'],
+                'age_ms': round(age * 1000.0, 1),
+                'tracks': [dict(track, x=track['x'] + track['vx'] * age, y=track['y'] + track['vy'] * age)
+                           for track in output['tracks']],
+            }
+        return {'timestamp': round(tick, 6), 'sensors': sensors}
+
+
+def run_multi_radar(output_dir, shutdown_flag, shared_live_can_data=None, can_logger_ready=None,
+                    sensors=MULTI_RADAR_SENSORS, pipeline_target=radar_pipeline_process):
+    """
+    Starts one radar pipeline process per sensor and merges their track outputs
+    onto a common time base in 'merged_tracks.jsonl'. Returns when all sensor
+    processes have exited.
+
+    Each sensor process gets its own stop event, which is set for every sensor
+    once 'shutdown_flag' is set or on Ctrl+C. The pipelines never set
+    'shutdown_flag' themselves.
+    """
+    names = [sensor['name'] for sensor in sensors]
+    if len(set(names)) != len(names):
+        logger.error(f"Sensor names must be unique: {names}")
+        return
+
+    result_queue = multiprocessing.Queue()
+    stop_events = [multiprocessing.Event() for _ in sensors]
+    processes = []
+    for sensor, stop_event in zip(sensors, stop_events):
+        # Not a daemon: the pipeline may start its own ingest process.
+        process = multiprocessing.Process(
+            target=pipeline_target,
+            args=(sensor, output_dir, stop_event, shared_live_can_data, can_logger_ready, result_queue),
+            name=f"radar_{sensor['name']}"
+        )
+        process.start()
+        processes.append(process)
+
+    merger = TrackOutputMerger(names)
+    merged_path = os.path.join(output_dir, "merged_tracks.jsonl")
+    logger.info(f"--- Merging tracks from {len(sensors)} radars into {merged_path} ---")
+    try:
+        with open(merged_path, 'w') as merged_file:
+            while len(merger.finished) < len(names):
+                if shutdown_flag.is_set():
+                    for stop_event in stop_events:
+                        stop_event.set()
+                try:
+                    merger.add(result_queue.get(timeout=merger.period_s))
+                except queue.Empty:
+                    pass
+                if not any(p.is_alive() for p in processes) and result_queue.empty():
+                    if len(merger.finished) < len(names):
+                        logger.error("Radar pipeline processes exited without finishing.")
+                    break
+                for record in merger.pop_ready(time.time()):
+                    merged_file.write(json.dumps(record) + '\n')
+            for record in merger.flush():
+                merged_file.write(json.dumps(record) + '\n')
+    except KeyboardInterrupt:
+        logger.info("\nCtrl+C detected. Shutting down radar pipelines...")
+    finally:
+        for stop_event in stop_events:
+            stop_event.set()
+        for process in processes:
+            process.join(timeout=10)
+            if process.is_alive():
+                logger.warning(f"{process.name} did not shut down, terminating...")
+                process.terminate()
+                process.join()
+        logger.info("--- Multi-radar tracking stopped ---")
@@ -0,0 +1,74 @@
+# src/radar_tracker/radar_ingest.py
+
+from .console_logger import logger
+from .hardware import hw_comms_utils, parsing_utils
+from .hardware.read_and_parse_frame import read_and_parse_frame, FrameData, FRAME_HEADER_STRUCT
+from .hardware.frame_reader import FrameReader
+from .hardware.shared_frame_ring import SharedFrameRing
+from .raw_logger import RawFrameRecorder
+
+
+def radar_ingest_process(cli_com_port, config_file, initial_baud_rate, ring_spec, stop_event, ready_event,
+                         raw_capture_path=None, skip_if_configured=False):
+    """
+    Entry point of the dedicated radar ingest process.
+
+    This process owns the serial port: it configures the sensor, reads and
+    parses frames as fast as they arrive and publishes the point clouds into
+    the shared-memory ring. The tracker consumes from the ring at its own pace,
+    so a slow tracking frame can no longer back up the UART buffer.
+
+    If 'raw_capture_path' is given, the raw frame bytes are recorded here,
+    where they are read, rather than in the tracker process.
+    """
+    ring = SharedFrameRing.attach(ring_spec)
+    h_port = None
+    recorder = None
+    try:
+        params_radar, h_port = hw_comms_utils.configure_sensor(
+            cli_com_port, config_file, initial_baud_rate, skip_if_configured=skip_if_configured
+        )
+        if not params_radar or not h_port:
+            logger.error("[INGEST] Failed to configure sensor. Exiting ingest process.")
+            return
+
+        frame_reader = FrameReader(h_port, parsing_utils.get_byte_length_from_struct(FRAME_HEADER_STRUCT))
+        if raw_capture_path:
+            recorder = RawFrameRecorder(raw_capture_path)
+        ready_event.set()
+        logger.info("--- [INGEST] Radar ingest process streaming ---")
+
+        while not stop_event.is_set():
+            frame_data = read_and_parse_frame(h_port, params_radar, frame_reader, recorder)
+            if not frame_data or not frame_data.header:
+                continue
+            if not ring.put(frame_data, frame_data.host_timestamp):
+                logger.warning(f"[INGEST] Frame ring full, dropped frame {frame_data.header.get('frameNumber')}.")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if recorder:
+            recorder.close()
+        if h_port and h_port.is_open:
+            h_port.close()
+            logger.info("--- [INGEST] Serial port closed ---")
+        ring.close()
+
+
+def frame_data_from_ring(ring, timeout):
+    """
+    Takes the next frame out of the ring and rebuilds a FrameData object from it.
+
+    Returns:
+        FrameData or None: None if no frame arrived within 'timeout' seconds.
+    """
+    item = ring.get(timeout=timeout)
+    if item is None:
+        return None
+    header, point_cloud, host_timestamp = item
+    frame_data = FrameData()
+    frame_data.header = header
+    frame_data.point_cloud = point_cloud
+    frame_data.num_points = point_cloud.shape[1]
+    frame_data.host_timestamp = host_timestamp
+    return frame_data
@@ -0,0 +1,120 @@
+# src/raw_logger.py
+
+import os
+import struct
+import numpy as np
+from .console_logger import logger
+from .hardware.read_and_parse_frame import parse_frame
+
+# Sidecar index record, one per frame: frameNumber, host receive time (s), byte offset, byte length
+INDEX_RECORD_STRUCT = struct.Struct('<IdQI')
+INDEX_DTYPE = np.dtype([
+    ('frameNumber', '<u4'),
+    ('host_timestamp', '<f8'),
+    ('offset', '<u8'),
+    ('length', '<u4'),
+])
+
+# 'frameNumber' sits after sync (8), version, packetLength and platform (4 bytes each).
+_FRAME_NUMBER_OFFSET = 20
+_FRAME_NUMBER_STRUCT = struct.Struct('<I')
+
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def index_path_for(capture_path):
+    """Returns the sidecar index path that belongs to a raw capture file."""
+    return os.path.splitext(capture_path)[0] + '.idx'
+
+
+class RawFrameRecorder:
+    """
+    Appends the exact bytes of every radar frame (header + TLVs) to a binary
+    capture file and writes one fixed-size record per frame to a sidecar index.
+
+    Recording is a plain buffered write of bytes that are already in memory,
+    which keeps it cheap enough to run alongside the reader on the Raspberry Pi.
+    Use RawCaptureReader to re-parse a capture later.
+    """
+    def __init__(self, capture_path):
+        self.capture_path = capture_path
+        self.index_path = index_path_for(capture_path)
+        self._data_file = open(capture_path, 'ab', buffering=WRITE_BUFFER_SIZE)
+        self._index_file = open(self.index_path, 'ab', buffering=WRITE_BUFFER_SIZE)
+        self._offset = self._data_file.tell()
+        self.frames_recorded = 0
+        logger.info(f"--- Recording raw radar frames to {capture_path} ---")
+
+    def record(self, frame_bytes, host_timestamp):
+        """Appends one raw frame and its index record."""
+        length = len(frame_bytes)
+        frame_number = _FRAME_NUMBER_STRUCT.unpack_from(frame_bytes, _FRAME_NUMBER_OFFSET)[0] \
+            if length >= _FRAME_NUMBER_OFFSET + 4 else 0
+        self._data_file.write(frame_bytes)
+        self._index_file.write(INDEX_RECORD_STRUCT.pack(frame_number, host_timestamp, self._offset, length))
+        self._offset += length
+        self.frames_recorded += 1
+
+    def flush(self):
+        self._data_file.flush()
+        self._index_file.flush()
+
+    def close(self):
+        """Flushes and closes both files."""
+        if self._data_file.closed:
+            return
+        self._data_file.close()
+        self._index_file.close()
+        logger.info(f"--- Raw capture {self.capture_path} finalized ({self.frames_recorded} frames). ---")
+
+
+class RawCaptureReader:
+    """
+    Random access to a raw capture written by RawFrameRecorder.
+
+    Index records pointing past the end of the capture file (e.g. after a
+    power loss mid-write) are ignored. The capture file stays open until
+    close() is called (or the 'with' block exits).
+    """
+    def __init__(self, capture_path):
+        self.capture_path = capture_path
+        index = np.fromfile(index_path_for(capture_path), dtype=INDEX_DTYPE)
+        capture_size = os.path.getsize(capture_path)
+        self.index = index[index['offset'] + index['length'] <= capture_size]
+        if len(self.index) < len(index):
+            logger.warning(f"Ignoring {len(index) - len(self.index)} truncated frame(s) at the end of {capture_path}.")
+        self._data_file = open(capture_path, 'rb')
+
+    def __len__(self):
+        return len(self.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Closes the capture file."""
+        self._data_file.close()
+
+    def read_frame_bytes(self, i):
+        """Returns the raw bytes of the i-th recorded frame."""
+        record = self.index[i]
+        self._data_file.seek(int(record['offset']))
+        return self._data_file.read(int(record['length']))
+
+    def iter_frames(self, params):
+        """
+        Re-parses every recorded frame with the current parser.
+
+        Yields:
+            FrameData: The parsed frame, with 'host_timestamp' set from the index.
+        """
+        for i, record in enumerate(self.index):
+            frame_data = parse_frame(self.read_frame_bytes(i), params)
+            if frame_data is None:
+                logger.warning(f"Could not re-parse recorded frame {int(record['frameNumber'])}.")
+                continue
+            frame_data.host_timestamp = float(record['host_timestamp'])
+            yield frame_data
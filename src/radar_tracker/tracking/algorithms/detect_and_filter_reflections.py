@@ -2,56 +2,49 @@
 
 import numpy as np
 
-def detect_and_filter_reflections(grid_map, detected_cluster_info, dbscan_clusters_full, point_cloud, speed_similarity_threshold):
+def detect_and_filter_reflections(spatial_grid, cluster_table, dbscan_clusters, speed_similarity_threshold):
     """
-    Identifies and filters clusters that are likely radar reflections.
-    This version uses standard nested loops for pairing clusters.
+    Identifies clusters that are likely radar reflections.
+
+    Two clusters that share a grid row and whose mean radial speeds differ by
+    less than the threshold are taken as an object and its reflection; the one
+    with the lower mean SNR is removed (on equal SNR, the higher cluster ID).
+
+    The (row x cluster) membership matrix is built once from the grid; the
+    cluster pairs that share a row and the speed/SNR comparisons are evaluated
+    for all pairs at once instead of per row.
+
+    Args:
+        spatial_grid (SpatialGrid): The grid built from the clustered points.
+        cluster_table (dict): The compute_cluster_features table ('clusterID',
+            'radialSpeed' and 'meanSnr' are used).
+        dbscan_clusters (np.ndarray): N cluster labels; labels <= 0 are noise.
+        speed_similarity_threshold (float): Maximum mean radial speed difference in m/s.
+
+    Returns:
+        np.ndarray: The IDs of the clusters to remove, in ascending order.
     """
-    # ... (function docstring remains the same) ...
-
-    cluster_ids_to_remove = set()
-    num_rows = len(grid_map)
-
-    cluster_id_to_info_idx = {info['originalClusterID']: i for i, info in enumerate(detected_cluster_info)}
-
-    for row in range(num_rows):
-        point_indices_in_row = [idx for cell in grid_map[row] for idx in cell]
-        if not point_indices_in_row:
-            continue
-        
-        cluster_ids_in_row = np.unique(dbscan_clusters_full[point_indices_in_row])
-        cluster_ids_in_row = [cid for cid in cluster_ids_in_row if cid > 0]
-
-        if len(cluster_ids_in_row) < 2:
-            continue
-
-        # --- MODIFICATION: Use nested for loops to create pairs ---
-        # This logic now directly mirrors the MATLAB implementation.
-        for i in range(len(cluster_ids_in_row)):
-            for j in range(i + 1, len(cluster_ids_in_row)):
-                cid1 = cluster_ids_in_row[i]
-                cid2 = cluster_ids_in_row[j]
-
-                info_idx1 = cluster_id_to_info_idx.get(cid1)
-                info_idx2 = cluster_id_to_info_idx.get(cid2)
-
-                if info_idx1 is None or info_idx2 is None:
-                    continue
-
-                speed1 = detected_cluster_info[info_idx1]['radialSpeed']
-                speed2 = detected_cluster_info[info_idx2]['radialSpeed']
-                
-                if abs(speed1 - speed2) < speed_similarity_threshold:
-                    points_mask1 = (dbscan_clusters_full == cid1)
-                    points_mask2 = (dbscan_clusters_full == cid2)
-                    
-                    snr1 = np.mean(point_cloud[4, points_mask1])
-                    snr2 = np.mean(point_cloud[4, points_mask2])
-                    
-                    if snr1 < snr2:
-                        cluster_ids_to_remove.add(cid1)
-                    else:
-                        cluster_ids_to_remove.add(cid2)
-        # --- END OF MODIFICATION ---
-
-    return list(cluster_ids_to_remove)
\ No newline at end of file
+    cluster_ids = cluster_table['clusterID']
+    if cluster_ids.size < 2:
+        return cluster_ids[:0]
+
+    # --- Membership: which clusters have points in which grid rows ---
+    point_indices = spatial_grid.point_indices
+    labels = dbscan_clusters[point_indices]
+    clustered = labels > 0
+    rows = spatial_grid.point_cells[point_indices[clustered]] // spatial_grid.num_cols
+    membership = np.zeros((spatial_grid.num_rows, cluster_ids.size), dtype=bool)
+    membership[rows, np.searchsorted(cluster_ids, labels[clustered])] = True
+    shares_row = membership.T @ membership
+
+    # --- Similar-speed pairs (i, j) with i < j ---
+    speeds, snrs = cluster_table['radialSpeed'], cluster_table['meanSnr']
+    is_pair = np.triu(shares_row, k=1) & (np.abs(speeds[:, np.newaxis] - speeds[np.newaxis, :]) < speed_similarity_threshold)
+    first, second = np.nonzero(is_pair)
+
+    # The lower-ID cluster is removed only if it is strictly weaker.
+    first_is_weaker = snrs[first] < snrs[second]
+    remove = np.zeros(cluster_ids.size, dtype=bool)
+    remove[first[first_is_weaker]] = True
+    remove[second[~first_is_weaker]] = True
+    return cluster_ids[remove]
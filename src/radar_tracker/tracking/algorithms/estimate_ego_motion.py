@@ -15,11 +15,13 @@ def estimate_ego_motion(
     engaged_gear, can_road_grade_deg, imu_ax_mps2, imu_ay_mps2, 
     imu_omega_radps, grade_rad, roll_rad, ego_kf_state, 
     filtered_vx_ego_iir, filtered_vy_ego_iir, delta_t, 
-    vehicle_params, ego_motion_params, original_ego_kf_r
+    vehicle_params, ego_motion_params, original_ego_kf_r, rng=None, ransac_stats=None
 ):
     """
     Estimates the ego vehicle's state using a 5D Extended Kalman Filter.
     It fuses information from radar (RANSAC), CAN bus, a dynamics model, and an IMU.
+    'rng' (np.random.Generator) is passed on to the RANSAC sampling; 'ransac_stats'
+    (dict) receives its per-frame counters.
     """
     # --- MODIFICATION START: Add a robust function to sanitize inputs ---
     def get_numeric(value, default):
@@ -59,14 +61,26 @@ def estimate_ego_motion(
     if is_vehicle_moving and spatial_points.shape[0] >= 4:
         if config.COMPONENT_DEBUG_FLAGS.get('ransac'):
             logging.debug(f"[RANSAC_EST] Calling RANSAC with {spatial_points.shape[0]} points, inlier_thresh: {ego_motion_params['ransacInlierThreshold']}")
+        adaptive_kwargs = {}
+        if ego_motion_params.get('ransacAdaptive', False):
+            # The stationary world seen from a car driving straight at the CAN speed;
+            # the lateral component comes from the filtered RANSAC estimate.
+            max_time_ms = ego_motion_params.get('ransacMaxTimeMs')
+            adaptive_kwargs = {
+                'seed_models': [[filtered_vx_ego_iir, can_veh_speed_kmph / 3.6]],
+                'confidence': ego_motion_params['ransacConfidence'],
+                'batch_size': ego_motion_params['ransacBatchSize'],
+                'max_time_s': max_time_ms / 1000.0 if max_time_ms is not None else None
+            }
         ransac_vx, ransac_vy, ego_inlier_ratio, outlier_indices = estimate_ego_motion_ransac(
             spatial_points, raw_radial_speeds,
             ego_motion_params['ransacInlierThreshold'],
             ego_motion_params['ransacMinInlierRatio'],
-            ego_motion_params['ransacMaxIterations']
+            ego_motion_params['ransacMaxIterations'],
+            rng=rng, stats=ransac_stats, **adaptive_kwargs
         )
         if config.COMPONENT_DEBUG_FLAGS.get('ransac'):
-            logging.debug(f"[RANSAC_EST] RANSAC output: vx={ransac_vx:.2f}, vy={ransac_vy:.2f}, inlier_ratio={ego_inlier_ratio:.2f}, outliers={outlier_indices.size}")
+            logging.debug(f"[RANSAC_EST] RANSAC output: vx={ransac_vx:.2f}, vy={ransac_vy:.2f}, inlier_ratio={ego_inlier_ratio:.2f}, outliers={outlier_indices.size}, stats={ransac_stats}")
         if ego_inlier_ratio >= ego_motion_params['ransacMinInlierRatio']:
             ransac_successful = True
             if config.COMPONENT_DEBUG_FLAGS.get('ransac'):
@@ -1,6 +1,7 @@
 # src/algorithms/estimate_ego_motion_ransac.py
 
 import numpy as np
+import time
 import warnings
 
 def _solve_least_squares(A, b):
@@ -25,31 +26,53 @@ def _solve_least_squares(A, b):
         # This occurs if (A^T A) is a singular matrix (not invertible)
         return None
 
-def estimate_ego_motion_ransac(points, radial_speeds, inlier_threshold, min_inlier_ratio, max_iterations):
+def estimate_ego_motion_ransac(points, radial_speeds, inlier_threshold, min_inlier_ratio, max_iterations, rng=None,
+                               seed_models=None, confidence=None, batch_size=10, max_time_s=None, stats=None):
     """
     Estimates 2D ego-motion (Vx, Vy) from radar points and their radial
-    speeds using a vectorized RANSAC algorithm.
+    speeds using a batched RANSAC algorithm.
+
+    Minimal samples (4 distinct points each) are drawn in batches, every
+    2-parameter model is solved from its 2x2 normal equations in closed form,
+    and all hypotheses of a batch are scored against all points in one
+    (hypotheses x points) operation. The first hypothesis with the most
+    inliers wins and is refined by least squares over its inliers.
+
+    Without 'seed_models' and 'confidence', all 'max_iterations' samples are
+    drawn in one batch. The adaptive mode adds:
+      - 'seed_models' (e.g. from the CAN speed) are scored first; if one of
+        them reaches 'min_inlier_ratio', no samples are drawn.
+      - With 'confidence', sampling stops once the standard bound
+        log(1 - confidence) / log(1 - w**4) for the best inlier ratio w is met,
+        and the refined model is re-scored and kept if it has no fewer inliers.
+      - 'max_time_s' caps the sampling time per call.
 
     Args:
         points (np.ndarray): Nx2 array of (x, y) coordinates for radar points.
         radial_speeds (np.ndarray): N-element array of radial speeds.
         inlier_threshold (float): The maximum error for a point to be considered an inlier.
         min_inlier_ratio (float): The minimum ratio of inliers required for a valid model.
-        max_iterations (int): The number of RANSAC iterations to perform.
+        max_iterations (int): The maximum number of random hypotheses to evaluate.
+        rng (np.random.Generator, optional): Source of the samples. Pass a
+            seeded generator for reproducible runs; a fresh one is used if None.
+        seed_models (array-like, optional): Kx2 (Vx, Vy) hypotheses scored before sampling.
+        confidence (float, optional): Required probability of having drawn an all-inlier sample.
+        batch_size (int): Hypotheses drawn per batch in the adaptive mode.
+        max_time_s (float, optional): Sampling time budget in seconds.
+        stats (dict, optional): Filled with 'evaluations' (hypotheses scored),
+            'randomSamples', 'seedAccepted' and 'timedOut'.
 
     Returns:
         tuple: A tuple containing (estimated_vx, estimated_vy, inlier_ratio, outlier_indices).
     """
+    start_time = time.perf_counter()
+    if stats is not None:
+        stats.update({'evaluations': 0, 'randomSamples': 0, 'seedAccepted': False, 'timedOut': False})
     num_points = points.shape[0]
 
     if num_points < 4:
         return 0.0, 0.0, 0.0, np.arange(num_points)
 
-    best_inlier_count = 0
-    best_vx = 0.0
-    best_vy = 0.0
-    best_inlier_indices = np.array([], dtype=int)
-
     r_all = np.sqrt(points[:, 0]**2 + points[:, 1]**2)
     valid_indices_mask = r_all > 1e-6
     valid_indices = np.where(valid_indices_mask)[0]
@@ -57,54 +80,128 @@ def estimate_ego_motion_ransac(points, radial_speeds, inlier_threshold, min_inli
     if len(valid_indices) < 4:
         return 0.0, 0.0, 0.0, np.arange(num_points)
 
+    if rng is None:
+        rng = np.random.default_rng()
+
     points_valid = points[valid_indices_mask, :]
     r_valid = r_all[valid_indices_mask]
-    
+    b_valid = radial_speeds[valid_indices_mask]
     a_full = np.vstack([-points_valid[:, 0] / r_valid, -points_valid[:, 1] / r_valid]).T
-
-    for _ in range(max_iterations):
-        sample_indices = np.random.choice(num_points, 4, replace=False)
-        p_sample = points[sample_indices, :]
-        r_sample = r_all[sample_indices]
-
-        if np.any(r_sample < 1e-6):
-            continue
-
-        a_sample = np.vstack([-p_sample[:, 0] / r_sample, -p_sample[:, 1] / r_sample]).T
-        b_sample = radial_speeds[sample_indices]
-        
-        # --- MODIFICATION: Use custom solver ---
-        current_ego_vel = _solve_least_squares(a_sample, b_sample)
-        if current_ego_vel is None:
-            continue
-        # --- END OF MODIFICATION ---
-
-        predicted_radial_speeds = a_full @ current_ego_vel
-        errors = np.abs(radial_speeds[valid_indices_mask] - predicted_radial_speeds)
-        
-        current_inlier_mask = errors < inlier_threshold
-        current_inlier_count = np.sum(current_inlier_mask)
-
-        if current_inlier_count > best_inlier_count:
-            best_inlier_count = current_inlier_count
-            best_vx, best_vy = current_ego_vel
-            best_inlier_indices = valid_indices[current_inlier_mask]
-
+    num_valid = len(valid_indices)
+
+    best = {'count': 0, 'model': (0.0, 0.0), 'mask': np.zeros(num_valid, dtype=bool)}
+    evaluations = 0
+    def score(models, is_solvable=None):
+        """Scores a batch of models and keeps the first one with the most inliers."""
+        is_inlier = np.abs(b_valid[np.newaxis, :] - models @ a_full.T) < inlier_threshold
+        inlier_counts = np.count_nonzero(is_inlier, axis=1)
+        if is_solvable is not None:
+            inlier_counts[~is_solvable] = 0
+        k = int(np.argmax(inlier_counts))
+        if inlier_counts[k] > best['count']:
+            best.update({'count': int(inlier_counts[k]), 'model': tuple(models[k]), 'mask': is_inlier[k]})
+        return len(models)
+
+    # --- 1. Seeded hypotheses ---
+    seed_accepted = False
+    if seed_models is not None and len(seed_models) > 0:
+        evaluations += score(np.asarray(seed_models, dtype=float).reshape(-1, 2))
+        seed_accepted = best['count'] / num_points >= min_inlier_ratio
+
+    # --- 2. Random minimal samples, solved in closed form ---
+    random_samples, timed_out = 0, False
+    if not seed_accepted:
+        num_per_batch = max_iterations if confidence is None else max(int(batch_size), 1)
+        while random_samples < max_iterations:
+            num_samples = min(num_per_batch, max_iterations - random_samples)
+            samples = _draw_minimal_samples(rng, num_valid, num_samples, 4)
+            models, is_solvable = _solve_minimal_models(a_full[samples], b_valid[samples])
+            evaluations += score(models, is_solvable)
+            random_samples += num_samples
+            if confidence is not None and random_samples >= _required_samples(best['count'] / num_valid, confidence, 4):
+                break
+            if max_time_s is not None and time.perf_counter() - start_time >= max_time_s:
+                timed_out = random_samples < max_iterations
+                break
+
+    best_inlier_count = best['count']
+    best_vx, best_vy = best['model']
+    best_inlier_mask = best['mask']
+    best_inlier_indices = valid_indices[best_inlier_mask]
+
+    # --- 3. Refine on the inliers of the best hypothesis ---
     estimated_vx, estimated_vy = best_vx, best_vy
     if len(best_inlier_indices) >= 4:
-        a_inliers = a_full[np.isin(valid_indices, best_inlier_indices)]
-        b_inliers = radial_speeds[best_inlier_indices]
-
-        # --- MODIFICATION: Use custom solver ---
-        refined_ego_vel = _solve_least_squares(a_inliers, b_inliers)
+        refined_ego_vel = _solve_least_squares(a_full[best_inlier_mask], b_valid[best_inlier_mask])
         if refined_ego_vel is not None:
             estimated_vx, estimated_vy = refined_ego_vel
+            if seed_models is not None or confidence is not None:
+                # Local optimisation: the refined model's inliers replace the sample's if no fewer.
+                refined_mask = np.abs(b_valid - a_full @ refined_ego_vel) < inlier_threshold
+                evaluations += 1
+                if np.count_nonzero(refined_mask) >= best_inlier_count:
+                    best_inlier_mask = refined_mask
+                    best_inlier_count = int(np.count_nonzero(refined_mask))
+                    best_inlier_indices = valid_indices[best_inlier_mask]
         else:
             warnings.warn("RANSAC-LSQ refinement failed, falling back to best RANSAC estimate.")
-        # --- END OF MODIFICATION ---
+
+    if stats is not None:
+        stats.update({'evaluations': evaluations, 'randomSamples': random_samples,
+                      'seedAccepted': seed_accepted, 'timedOut': timed_out})
 
     inlier_ratio = best_inlier_count / num_points
-    all_indices = np.arange(num_points)
-    outlier_indices = np.setdiff1d(all_indices, best_inlier_indices, assume_unique=True)
+    is_outlier = np.ones(num_points, dtype=bool)
+    is_outlier[best_inlier_indices] = False
+    outlier_indices = np.flatnonzero(is_outlier)
+
+    return estimated_vx, estimated_vy, inlier_ratio, outlier_indices
+
 
-    return estimated_vx, estimated_vy, inlier_ratio, outlier_indices
\ No newline at end of file
+def _solve_minimal_models(a, b):
+    """
+    Solves the 2-parameter least-squares model of every sample from its 2x2
+    normal equations in closed form.
+
+    Args:
+        a (np.ndarray): SxMx2 rows of the design matrix of S samples.
+        b (np.ndarray): SxM radial speeds.
+
+    Returns:
+        tuple: (Sx2 models, S booleans marking the solvable samples).
+    """
+    a_x, a_y = a[..., 0], a[..., 1]
+    s_xx, s_xy, s_yy = np.sum(a_x * a_x, axis=1), np.sum(a_x * a_y, axis=1), np.sum(a_y * a_y, axis=1)
+    t_x, t_y = np.sum(a_x * b, axis=1), np.sum(a_y * b, axis=1)
+    det = s_xx * s_yy - s_xy**2
+    # Samples whose normal equations are (numerically) singular yield no model.
+    is_solvable = np.abs(det) > 1e-9 * np.maximum(s_xx * s_yy, 1e-12)
+    det = np.where(is_solvable, det, 1.0)
+    models = np.column_stack(((s_yy * t_x - s_xy * t_y) / det, (s_xx * t_y - s_xy * t_x) / det))
+    return models, is_solvable
+
+
+def _required_samples(inlier_ratio, confidence, sample_size):
+    """The number of samples after which an all-inlier sample was drawn with the given confidence."""
+    all_inlier_probability = inlier_ratio ** sample_size
+    if all_inlier_probability >= 1.0:
+        return 0
+    if all_inlier_probability <= 0.0:
+        return np.inf
+    return int(np.ceil(np.log(1.0 - confidence) / np.log(1.0 - all_inlier_probability)))
+
+
+def _draw_minimal_samples(rng, num_points, num_samples, sample_size):
+    """
+    Draws 'num_samples' rows of 'sample_size' distinct indices below
+    'num_points'. Rows with a repeated index are redrawn, which is rare
+    unless num_points is close to sample_size.
+    """
+    samples = rng.integers(0, num_points, size=(num_samples, sample_size))
+    while True:
+        sorted_samples = np.sort(samples, axis=1)
+        has_repeat = np.any(sorted_samples[:, 1:] == sorted_samples[:, :-1], axis=1)
+        num_repeats = int(np.count_nonzero(has_repeat))
+        if num_repeats == 0:
+            return samples
+        samples[has_repeat] = rng.integers(0, num_points, size=(num_repeats, sample_size))
@@ -2,53 +2,139 @@
 
 import numpy as np
 import logging
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 
-def find_jpda_hypotheses(validation_matrix, params):
+def find_jpda_hypotheses(validation_matrix, params, max_hypotheses=None):
     """
     Recursively generates all valid joint association hypotheses from a
     given validation matrix.
+
+    Each hypothesis lists, per track, 0 (miss) or the 1-based index of its
+    measurement. The hypothesis being built and the used-measurement mask are
+    shared across the recursion and undone on the way back.
+
+    Returns:
+        np.ndarray: (H, num_tracks) hypotheses, or None if there are more
+            than 'max_hypotheses'.
     """
     debug_mode = params.get('debug_mode', False)
     debug_mode1 = params.get('debug_mode1', False)
 
     num_measurements, num_tracks = validation_matrix.shape
     hypotheses = []
+    # The validated measurements of each track, in ascending order.
+    candidates = [np.flatnonzero(validation_matrix[:, track_idx]).tolist() for track_idx in range(num_tracks)]
 
     if debug_mode:
         logging.info(f'[HYP-GEN-DEBUG] Starting hypothesis generation for {num_tracks} tracks and {num_measurements} measurements.')
 
-    def _generate(track_idx, current_hypothesis, used_measurements_mask):
+    current_hypothesis = [0] * num_tracks
+    used_measurements = [False] * num_measurements
+
+    def _generate(track_idx):
         """
-        Nested recursive function to generate hypotheses.
+        Nested recursive function to generate hypotheses. Returns False once
+        the hypothesis limit is exceeded.
         """
         if track_idx >= num_tracks:
             hypotheses.append(list(current_hypothesis))
             if debug_mode:
                 logging.info(f'[HYP-GEN-DEBUG] -> Found complete hypothesis #{len(hypotheses)}: {str(current_hypothesis)}')
-            return
+            return max_hypotheses is None or len(hypotheses) <= max_hypotheses
 
         if debug_mode1:
             logging.info(f'[HYP-GEN-DEBUG]   Processing T{track_idx}. Current assignment: {str(current_hypothesis[:track_idx])}')
-
-        if debug_mode1:
             logging.info(f'[HYP-GEN-DEBUG]     Trying T{track_idx} -> M0 (Miss)')
-        _generate(track_idx + 1, current_hypothesis, used_measurements_mask)
+        if not _generate(track_idx + 1):
+            return False
 
-        for meas_idx in range(num_measurements):
-            if validation_matrix[meas_idx, track_idx] and not used_measurements_mask[meas_idx]:
+        for meas_idx in candidates[track_idx]:
+            if not used_measurements[meas_idx]:
                 if debug_mode1:
                     logging.info(f'[HYP-GEN-DEBUG]     Trying T{track_idx} -> M{meas_idx + 1}')
-                
-                new_hypothesis = list(current_hypothesis)
-                new_hypothesis[track_idx] = meas_idx + 1 
-                
-                new_used_mask = list(used_measurements_mask)
-                new_used_mask[meas_idx] = True
-                
-                _generate(track_idx + 1, new_hypothesis, new_used_mask)
-
-    initial_hypothesis = [0] * num_tracks
-    initial_used_mask = [False] * num_measurements
-    _generate(0, initial_hypothesis, initial_used_mask)
-
-    return hypotheses
\ No newline at end of file
+                current_hypothesis[track_idx] = meas_idx + 1
+                used_measurements[meas_idx] = True
+                completed = _generate(track_idx + 1)
+                used_measurements[meas_idx] = False
+                current_hypothesis[track_idx] = 0
+                if not completed:
+                    return False
+        return True
+
+    if not _generate(0):
+        return None
+    return np.array(hypotheses, dtype=int).reshape(len(hypotheses), num_tracks)
+
+
+def find_jpda_clusters(validation_matrix):
+    """
+    Splits a validation matrix into independent track/measurement clusters:
+    the connected components of the bipartite graph of validated pairs.
+    Tracks without a validated measurement belong to no cluster.
+
+    Returns:
+        list: (measurement_indices, track_indices) array pairs, ascending
+            within each cluster, ordered by their first track.
+    """
+    num_measurements, num_tracks = validation_matrix.shape
+    meas_idx, track_idx = np.nonzero(validation_matrix)
+    if meas_idx.size == 0:
+        return []
+
+    # Nodes 0..T-1 are tracks, T..T+M-1 measurements.
+    num_nodes = num_tracks + num_measurements
+    graph = csr_matrix((np.ones(meas_idx.size, dtype=np.int8), (track_idx, num_tracks + meas_idx)),
+                       shape=(num_nodes, num_nodes))
+    _, labels = connected_components(graph, directed=False)
+
+    track_labels = labels[:num_tracks]
+    meas_labels = labels[num_tracks:]
+    gated_tracks = np.unique(track_idx)
+    clusters = []
+    for label in dict.fromkeys(track_labels[gated_tracks].tolist()):
+        clusters.append((np.flatnonzero(meas_labels == label), np.flatnonzero(track_labels == label)))
+    return clusters
+
+
+def find_beam_jpda_hypotheses(validation_matrix, likelihoods, PD, lambda_c, beam_width):
+    """
+    Approximates the joint association hypotheses of a cluster that has too
+    many to enumerate: tracks are assigned one at a time, and after each
+    track only the 'beam_width' best partial hypotheses are kept.
+
+    A hypothesis scores the product over its tracks of PD * likelihood /
+    lambda_c for an assigned measurement and 1 - PD for a miss, which is
+    proportional to the exact JPDA hypothesis probability.
+
+    Returns:
+        np.ndarray: (H, num_tracks) hypotheses (0 = miss, else the 1-based
+            measurement index), H <= beam_width.
+    """
+    num_measurements, num_tracks = validation_matrix.shape
+    with np.errstate(divide='ignore'):
+        assign_scores = np.log(PD * likelihoods / lambda_c)
+    miss_score = np.log(1 - PD)
+
+    hypotheses = np.zeros((1, 0), dtype=int)
+    used = np.zeros((1, num_measurements), dtype=bool)
+    scores = np.zeros(1)
+    for track_idx in range(num_tracks):
+        # Option 0 is a miss, option m the m-th measurement.
+        allowed = np.concatenate((np.ones((len(scores), 1), dtype=bool),
+                                  validation_matrix[:, track_idx][np.newaxis, :] & ~used), axis=1)
+        option_scores = np.concatenate(([miss_score], assign_scores[:, track_idx]))
+        expanded = np.where(allowed, scores[:, np.newaxis] + option_scores[np.newaxis, :], -np.inf)
+
+        flat = np.flatnonzero(allowed.ravel())
+        if flat.size > beam_width:
+            flat = flat[np.argpartition(-expanded.ravel()[flat], beam_width - 1)[:beam_width]]
+        parents, options = np.divmod(flat, num_measurements + 1)
+
+        hypotheses = np.column_stack((hypotheses[parents], options))
+        used = used[parents]
+        assigned = options > 0
+        used[np.flatnonzero(assigned), options[assigned] - 1] = True
+        scores = expanded[parents, options]
+
+    return hypotheses
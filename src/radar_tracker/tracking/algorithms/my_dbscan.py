@@ -2,106 +2,132 @@
 
 import numpy as np
 import logging
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import connected_components
 import config
 
-def my_dbscan(spatial_points, velocities, epsilon_pos, epsilon_vel, min_pts, grid_map, point_to_grid_idx):
+def my_dbscan(spatial_points, velocities, epsilon_pos, epsilon_vel, min_pts, spatial_grid):
     """
-    Performs DBSCAN clustering using a pre-computed spatial grid and a custom
-    distance metric that includes both position and velocity.
-    """
-    # ... (function docstring remains the same) ...
+    Performs DBSCAN clustering using a pre-computed spatial grid (SpatialGrid)
+    and a custom distance metric that includes both position and velocity.
+
+    The neighbourhoods of all points are computed once, in a vectorized pass
+    over adjacent grid cells (find_grid_neighbors). Clusters are the connected
+    components of the core points, numbered and given their border points as a
+    point-by-point expansion seeded in index order would.
+
+    Args:
+        spatial_points (np.ndarray): An Nx2 array of Cartesian points.
+        velocities (np.ndarray): N radial velocities.
+        epsilon_pos (float): Neighbourhood radius in metres.
+        epsilon_vel (float): Maximum radial velocity difference in m/s.
+        min_pts (int): Minimum neighbourhood size (the point included) of a core point.
+        spatial_grid (SpatialGrid): The grid built from 'spatial_points'.
 
+    Returns:
+        np.ndarray: N cluster ids (1-based); 0 marks noise and points outside the grid.
+    """
     if spatial_points is None or len(spatial_points) < min_pts:
         if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
             logging.debug(f"[DBSCAN] Not enough points ({len(spatial_points) if spatial_points is not None else 0}) for min_pts ({min_pts}). Returning empty clusters.")
         return np.array([], dtype=int)
 
     num_points = spatial_points.shape[0]
-    clusters = np.zeros(num_points, dtype=int)
-    cluster_id = 0
-
     if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
         logging.debug(f"[DBSCAN] Starting with epsilon_pos={epsilon_pos}, epsilon_vel={epsilon_vel}, min_pts={min_pts}, num_points={num_points}")
 
-    for i in range(num_points):
-        if clusters[i] != 0:
-            continue
-
-        neighbors = _find_neighbors_from_grid(i, spatial_points, velocities, epsilon_pos, epsilon_vel, grid_map, point_to_grid_idx)
-
-        if len(neighbors) < min_pts:
-            clusters[i] = -1 # Mark as Noise
-            if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
-                logging.debug(f"[DBSCAN] Point {i} marked as noise (neighbors: {len(neighbors)} < {min_pts})")
-        else:
-            cluster_id += 1
-            clusters[i] = cluster_id
-            if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
-                logging.debug(f"[DBSCAN] New cluster {cluster_id} found with core point {i} (initial neighbors: {len(neighbors)})")
-            
-            # --- MODIFICATION: Use a list and a head index for the queue ---
-            queue = list(neighbors)
-            head = 0
-            
-            while head < len(queue):
-                current_point_idx = queue[head]
-                head += 1
-                
-                # If point was marked as noise, it's now a border point.
-                # If it's already in a cluster, do nothing.
-                if clusters[current_point_idx] in [-1, 0]:
-                    if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
-                        logging.debug(f"[DBSCAN] Adding point {current_point_idx} to cluster {cluster_id}")
-                    clusters[current_point_idx] = cluster_id
-                    
-                    current_neighbors = _find_neighbors_from_grid(current_point_idx, spatial_points, velocities, epsilon_pos, epsilon_vel, grid_map, point_to_grid_idx)
-                    
-                    if len(current_neighbors) >= min_pts:
-                        # Add new neighbors to the end of the list
-                        for n in current_neighbors:
-                            if clusters[n] in [-1, 0]:
-                                queue.append(n)
-            # --- END OF MODIFICATION ---
-                        
-    clusters[clusters == -1] = 0
+    indptr, indices = find_grid_neighbors(spatial_points, velocities, epsilon_pos, epsilon_vel, spatial_grid)
+    is_core = np.diff(indptr) >= min_pts
+    core_points = np.flatnonzero(is_core)
+    clusters = np.zeros(num_points, dtype=int)
+    if core_points.size == 0:
+        return clusters
+
+    # Expanding seeds in index order makes each cluster the connected component
+    # of core points around its lowest-index core point, numbered in that order.
+    point_of = np.repeat(np.arange(num_points), np.diff(indptr))
+    is_core_pair = is_core[point_of] & is_core[indices]
+    core_indptr = np.zeros(num_points + 1, dtype=np.intp)
+    np.cumsum(np.bincount(point_of[is_core_pair], minlength=num_points), out=core_indptr[1:])
+    core_graph = csr_matrix((np.ones(core_indptr[-1], dtype=np.int8), indices[is_core_pair], core_indptr),
+                            shape=(num_points, num_points))
+    # The neighbour relation is symmetric, so strong components are the connected
+    # components (and avoid the symmetrization done for undirected graphs).
+    _, components = connected_components(core_graph, directed=True, connection='strong')
+    core_components = components[core_points]
+    first_core = np.full(components.max() + 1, num_points)
+    np.minimum.at(first_core, core_components, core_points)
+    cluster_of_component = np.zeros(first_core.size, dtype=int)
+    used = first_core < num_points
+    cluster_of_component[used] = np.argsort(np.argsort(first_core[used])) + 1
+    clusters[core_points] = cluster_of_component[core_components]
+    cluster_id = int(clusters.max())
+
+    # A border point joins the first cluster that reaches it: the lowest-numbered
+    # cluster among its core neighbours.
+    is_border_pair = ~is_core[point_of] & is_core[indices]
+    border_labels = np.full(num_points, cluster_id + 1)
+    np.minimum.at(border_labels, point_of[is_border_pair], clusters[indices[is_border_pair]])
+    is_border = border_labels <= cluster_id
+    clusters[is_border] = border_labels[is_border]
+
     if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
-        logging.debug(f"[DBSCAN] Finished. Total clusters found: {cluster_id}. Cluster assignments: {clusters}")
+        logging.debug(f"[DBSCAN] Finished. Total clusters found: {cluster_id}, core points: {core_points.size}, clustered points: {np.count_nonzero(clusters)}.")
     return clusters
 
 
-def _find_neighbors_from_grid(idx, spatial_points, velocities, epsilon_pos, epsilon_vel, grid_map, point_to_grid_idx):
-    """Helper function to find neighbors using the pre-computed grid."""
-    # ... (this function is unchanged) ...
-    candidate_indices = []
-    
-    grid_location = point_to_grid_idx[idx, :]
-    current_row = grid_location[0]
-    current_col = grid_location[1]
-    
-    if current_row == 0 or current_col == 0:
-        return []
-
-    num_rows = len(grid_map)
-    num_cols = len(grid_map[0])
-    
-    for row_offset in range(-1, 2):
-        for col_offset in range(-1, 2):
-            search_row = current_row + row_offset - 1
-            search_col = current_col + col_offset - 1
-            
-            if 0 <= search_row < num_rows and 0 <= search_col < num_cols:
-                candidate_indices.extend(grid_map[search_row][search_col])
-    
-    if not candidate_indices:
-        return []
-    candidate_indices = np.unique(candidate_indices)
-
-    candidate_points = spatial_points[candidate_indices, :]
-    candidate_velocities = velocities[candidate_indices]
-    
-    spatial_distances = np.sqrt(np.sum((candidate_points - spatial_points[idx, :])**2, axis=1))
-    velocity_diffs = np.abs(candidate_velocities - velocities[idx])
-    
-    is_neighbor_mask = (spatial_distances <= epsilon_pos) & (velocity_diffs <= epsilon_vel)
-    
-    return candidate_indices[is_neighbor_mask]
\ No newline at end of file
+def find_grid_neighbors(spatial_points, velocities, epsilon_pos, epsilon_vel, spatial_grid):
+    """
+    Finds the position-and-velocity neighbours of every point among the points
+    in its own and the eight adjacent grid cells. A point is its own neighbour;
+    points outside the grid have no neighbours.
+
+    Returns:
+        tuple: (indptr, indices) in CSR form. The neighbours of point i are
+            indices[indptr[i]:indptr[i + 1]], in ascending order.
+    """
+    num_points = spatial_points.shape[0]
+    x, y = spatial_points[:, 0], spatial_points[:, 1]
+    point_cells = spatial_grid.point_cells
+    inside = np.flatnonzero(point_cells >= 0)
+    rows = point_cells[inside] // spatial_grid.num_cols
+    cols = point_cells[inside] % spatial_grid.num_cols
+    first_col = np.maximum(cols - 1, 0)
+    last_col = np.minimum(cols + 1, spatial_grid.num_cols - 1)
+
+    pair_points, pair_neighbors = [], []
+    for row_offset in (-1, 0, 1):
+        search_rows = rows + row_offset
+        valid = (search_rows >= 0) & (search_rows < spatial_grid.num_rows)
+        # The three cells of a row are contiguous in the CSR grid: one slice per point.
+        base = search_rows[valid] * spatial_grid.num_cols
+        starts = spatial_grid.offsets[base + first_col[valid]]
+        ends = spatial_grid.offsets[base + last_col[valid] + 1]
+        points = np.repeat(inside[valid], ends - starts)
+        candidates = spatial_grid.point_indices[_ragged_ranges(starts, ends)]
+
+        # Same distance evaluation as a per-point search: sqrt(dx**2 + dy**2).
+        dx = x[candidates] - x[points]
+        dy = y[candidates] - y[points]
+        spatial_distances = np.sqrt(dx**2 + dy**2)
+        velocity_diffs = np.abs(velocities[candidates] - velocities[points])
+        is_neighbor = (spatial_distances <= epsilon_pos) & (velocity_diffs <= epsilon_vel)
+        pair_points.append(points[is_neighbor])
+        pair_neighbors.append(candidates[is_neighbor])
+
+    pair_points = np.concatenate(pair_points)
+    pair_neighbors = np.concatenate(pair_neighbors)
+    order = np.lexsort((pair_neighbors, pair_points))
+    indptr = np.zeros(num_points + 1, dtype=np.intp)
+    np.cumsum(np.bincount(pair_points, minlength=num_points), out=indptr[1:])
+    return indptr, pair_neighbors[order]
+
+
+def _ragged_ranges(starts, ends):
+    """Concatenation of arange(starts[k], ends[k]) for all k, without a Python loop."""
+    lengths = ends - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.intp)
+    run_starts = np.cumsum(lengths) - lengths
+    return np.arange(total, dtype=np.intp) - np.repeat(run_starts - starts, lengths)
@@ -0,0 +1,59 @@
+# src/algorithms/prefilter_point_cloud.py
+
+import numpy as np
+
+def prefilter_point_cloud(point_cloud, prefilter_params, grid_config):
+    """
+    Selects the points of a frame that are passed on to ego-motion estimation
+    and clustering.
+
+    Args:
+        point_cloud (np.ndarray): A 5xN array of [range, x, y, doppler, snr].
+        prefilter_params (dict): 'cropToGrid', 'minSnr', 'maxAbsDoppler',
+            'voxelSize' (0 disables voxel downsampling) and 'maxPoints'
+            (0 disables the cap).
+        grid_config (dict): The clustering grid; its extents are the ROI.
+
+    Returns:
+        np.ndarray: The ascending indices of the kept points into 'point_cloud'.
+            Use it to map results on the filtered points back to the frame.
+    """
+    num_points = point_cloud.shape[1] if point_cloud.ndim == 2 else 0
+    if num_points == 0:
+        return np.empty(0, dtype=np.intp)
+
+    x, y, doppler, snr = point_cloud[1], point_cloud[2], point_cloud[3], point_cloud[4]
+    keep = np.isfinite(x) & np.isfinite(y)
+
+    # --- ROI: the same half-open extents slot_points_to_grid uses ---
+    if prefilter_params.get('cropToGrid', True):
+        keep &= (x >= grid_config['X_RANGE'][0]) & (x < grid_config['X_RANGE'][1])
+        keep &= (y >= grid_config['Y_RANGE'][0]) & (y < grid_config['Y_RANGE'][1])
+
+    # --- SNR / Doppler thresholds ---
+    min_snr = prefilter_params.get('minSnr')
+    if min_snr is not None:
+        keep &= snr >= min_snr
+    max_abs_doppler = prefilter_params.get('maxAbsDoppler')
+    if max_abs_doppler is not None:
+        keep &= np.abs(doppler) <= max_abs_doppler
+
+    kept_indices = np.flatnonzero(keep)
+
+    # --- Voxel downsampling: keep the strongest point of each occupied voxel ---
+    voxel_size = prefilter_params.get('voxelSize', 0.0)
+    if voxel_size and kept_indices.size > 1:
+        voxel_x = np.floor(x[kept_indices] / voxel_size).astype(np.int64)
+        voxel_y = np.floor(y[kept_indices] / voxel_size).astype(np.int64)
+        order = np.lexsort((-snr[kept_indices], voxel_y, voxel_x))
+        first_in_voxel = np.ones(order.size, dtype=bool)
+        first_in_voxel[1:] = (np.diff(voxel_x[order]) != 0) | (np.diff(voxel_y[order]) != 0)
+        kept_indices = np.sort(kept_indices[order[first_in_voxel]])
+
+    # --- Cap the point count, keeping the highest SNR points ---
+    max_points = prefilter_params.get('maxPoints', 0)
+    if max_points and kept_indices.size > max_points:
+        strongest = np.argpartition(-snr[kept_indices], max_points - 1)[:max_points]
+        kept_indices = np.sort(kept_indices[strongest])
+
+    return kept_indices
@@ -0,0 +1,105 @@
+# src/algorithms/track_guided_clustering.py
+
+import numpy as np
+import logging
+import config
+from .my_dbscan import my_dbscan
+
+def predict_track_gates(all_tracks, delta_t, gate_params):
+    """
+    Predicts the gate of every confirmed, active track for the coming frame.
+
+    The position is extrapolated from the fused IMM state with the constant
+    acceleration kinematics of ca_predict; the gate radius scales with the
+    position uncertainty and is clipped to [minGateRadius, maxGateRadius].
+
+    Args:
+        all_tracks (TrackTable): The tracker's tracks.
+        delta_t (float): Time since the last frame in seconds.
+        gate_params (dict): 'gateSigmas', 'minGateRadius', 'maxGateRadius'.
+
+    Returns:
+        tuple: (centres, radii, radial_speeds) with one row/entry per gate.
+    """
+    confirmed = all_tracks.confirmed_indices
+    if not confirmed:
+        return np.empty((0, 2)), np.empty(0), np.empty(0)
+
+    states = all_tracks.states[confirmed, :6]
+    variances = np.diagonal(all_tracks.covariances[confirmed], axis1=1, axis2=2)[:, :2]
+    position = states[:, 0:2] + states[:, 2:4] * delta_t + 0.5 * states[:, 4:6] * delta_t**2
+    velocity = states[:, 2:4] + states[:, 4:6] * delta_t
+    sigma = np.sqrt(np.max(variances, axis=1))
+    radii = np.clip(gate_params['gateSigmas'] * sigma, gate_params['minGateRadius'], gate_params['maxGateRadius'])
+
+    # Same radial speed as the measurement model of imm_correct.
+    r = np.hypot(position[:, 0], position[:, 1])
+    radial_speeds = np.divide(np.sum(position * velocity, axis=1), r, out=np.zeros_like(r), where=r > 1e-6)
+    return position, radii, radial_speeds
+
+
+def track_guided_dbscan(spatial_points, velocities, gate_centres, gate_radii, gate_radial_speeds,
+                        gate_velocity, epsilon_pos, epsilon_vel, min_pts, spatial_grid, residual_grid):
+    """
+    Clusters a frame by seeding clusters from predicted track gates.
+
+    Every point inside a gate (within its radius of the predicted position and
+    within 'gate_velocity' of the predicted radial speed) joins the nearest such
+    gate; points outside the grid are never gated. A gate that collects at
+    least 'min_pts' points becomes a cluster directly (the fast path); all
+    other points are clustered by my_dbscan.
+
+    Args:
+        spatial_points (np.ndarray): An Nx2 array of Cartesian points.
+        velocities (np.ndarray): N radial velocities.
+        gate_centres, gate_radii, gate_radial_speeds: From predict_track_gates.
+        gate_velocity (float): Maximum radial speed difference to a gate in m/s.
+        epsilon_pos, epsilon_vel, min_pts: The my_dbscan parameters.
+        spatial_grid (SpatialGrid): The grid built from 'spatial_points'.
+        residual_grid (SpatialGrid): A grid rebuilt from the leftover points.
+
+    Returns:
+        tuple: (clusters, is_fast_path). N cluster ids as my_dbscan returns
+            them, the track-seeded clusters first, and a boolean mask of the
+            points grouped on the fast path.
+    """
+    num_points = spatial_points.shape[0]
+    clusters = np.zeros(num_points, dtype=int)
+    is_fast_path = np.zeros(num_points, dtype=bool)
+
+    num_seeded = 0
+    if len(gate_centres) > 0 and num_points > 0:
+        # One (gates x points) pass; frames have tens of tracks and hundreds of points.
+        dx = spatial_points[:, 0][np.newaxis, :] - gate_centres[:, 0][:, np.newaxis]
+        dy = spatial_points[:, 1][np.newaxis, :] - gate_centres[:, 1][:, np.newaxis]
+        distances = np.sqrt(dx**2 + dy**2)
+        in_gate = ((distances <= gate_radii[:, np.newaxis]) &
+                   (np.abs(velocities[np.newaxis, :] - gate_radial_speeds[:, np.newaxis]) <= gate_velocity) &
+                   (spatial_grid.point_cells >= 0)[np.newaxis, :])
+        distances[~in_gate] = np.inf
+        gated_points = np.flatnonzero(in_gate.any(axis=0))
+        nearest_gate = np.argmin(distances[:, gated_points], axis=0)
+
+        counts = np.bincount(nearest_gate, minlength=len(gate_centres))
+        seeded_gates = np.flatnonzero(counts >= min_pts)
+        num_seeded = seeded_gates.size
+        cluster_of_gate = np.zeros(len(gate_centres), dtype=int)
+        cluster_of_gate[seeded_gates] = np.arange(1, num_seeded + 1)
+        gate_clusters = cluster_of_gate[nearest_gate]
+        seeded = gate_clusters > 0
+        clusters[gated_points[seeded]] = gate_clusters[seeded]
+        is_fast_path[gated_points[seeded]] = True
+
+    residual = np.flatnonzero(~is_fast_path)
+    if residual.size >= min_pts:
+        residual_points = spatial_points[residual]
+        residual_grid.build(residual_points.T)
+        residual_clusters = my_dbscan(residual_points, velocities[residual], epsilon_pos, epsilon_vel,
+                                      min_pts, residual_grid)
+        clustered = residual_clusters > 0
+        clusters[residual[clustered]] = residual_clusters[clustered] + num_seeded
+
+    if config.COMPONENT_DEBUG_FLAGS.get('dbscan'):
+        logging.debug(f"[DBSCAN] Track-guided: {num_seeded} seeded clusters from {len(gate_centres)} gates, "
+                      f"fast path {np.count_nonzero(is_fast_path)} points, DBSCAN path {residual.size} points.")
+    return clusters, is_fast_path
@@ -105,6 +105,7 @@ def _convert_point_to_dict(point):
     snr = point.get('snr', np.nan)
     cluster_num = point.get('clusterNumber', -1)
     is_outlier = point.get('isOutlier', False)
+    is_prefiltered = point.get('isPrefiltered', False)
 
     return {
         "x": float(x),
@@ -112,7 +113,8 @@ def _convert_point_to_dict(point):
         "velocity": float(v),
         "snr": float(snr),
         "clusterNumber": int(cluster_num),
-        "isOutlier": bool(is_outlier)
+        "isOutlier": bool(is_outlier),
+        "isPrefiltered": bool(is_prefiltered) # Dropped by the pre-filter: isOutlier is not meaningful
     }
 
 def create_visualization_data(all_tracks, fhist, params=None):
@@ -205,6 +207,9 @@ def create_visualization_data(all_tracks, fhist, params=None):
                     is_point_cloud_non_empty = len(point_x_array) > 0
 
         if is_point_cloud_non_empty:
+            prefiltered_mask = point_cloud_data.get('isPrefiltered', getattr(frame, 'isPrefiltered', None))
+            if prefiltered_mask is not None and len(prefiltered_mask) != len(point_cloud_data['x']):
+                prefiltered_mask = None
             for i in range(len(point_cloud_data['x'])):
                 point = {
                     'x': point_cloud_data['x'][i],
@@ -212,7 +217,8 @@ def create_visualization_data(all_tracks, fhist, params=None):
                     'velocity': point_cloud_data['velocity'][i],
                     'snr': point_cloud_data['snr'][i],
                     'clusterNumber': point_cloud_data['clusterNumber'][i],
-                    'isOutlier': point_cloud_data['isOutlier'][i]
+                    'isOutlier': point_cloud_data['isOutlier'][i],
+                    'isPrefiltered': prefiltered_mask[i] if prefiltered_mask is not None else False
                 }
                 point_dict = _convert_point_to_dict(point)
                 if point_dict:
@@ -1,7 +1,7 @@
 # src/filters/imm_filter.py
 
 import numpy as np
-from .imm_models import cv_predict, ct_predict, ca_predict
+from .imm_models import cv_predict, ct_predict, ca_predict, cv_predict_batch, ct_predict_batch, ca_predict_batch
 
 def imm_predict(imm_state, imm_params, delta_t, ego_yaw_rate):
     """
@@ -82,12 +82,63 @@ def imm_predict(imm_state, imm_params, delta_t, ego_yaw_rate):
     return imm_state_pred
 
 
+def imm_predict_batch(model_states, model_covariances, model_probabilities, mu_is_column,
+                      imm_params, delta_t, ego_yaw_rate):
+    """
+    imm_predict for N tracks at once: mixing, model prediction and fusion are
+    array operations over the track axis.
+
+    Args:
+        model_states (np.ndarray): (N, 3, 7) per-model states.
+        model_covariances (np.ndarray): (N, 3, 7, 7) per-model covariances.
+        model_probabilities (np.ndarray): (N, 3) model probabilities.
+        mu_is_column (np.ndarray): N flags, True where imm_predict would see the
+            probabilities as a (3, 1) column. A (3,) vector broadcasts along the
+            other axis in the mixing step, and the batch reproduces that.
+        imm_params, delta_t, ego_yaw_rate: As for imm_predict.
+
+    Returns:
+        tuple: (model_states, model_covariances, model_probabilities, states,
+            covariances), predicted, with the fused (N, 7) states and (N, 7, 7)
+            covariances.
+    """
+    p_ij = imm_params['modelTransitionMatrix']
+
+    # --- 1. Interaction / Mixing Step ---
+    c_bar = model_probabilities @ p_ij
+    mu_mix = np.where(mu_is_column[:, np.newaxis, np.newaxis],
+                      model_probabilities[:, :, np.newaxis], model_probabilities[:, np.newaxis, :])
+    mu_ij = p_ij * mu_mix / c_bar[:, np.newaxis, :]
+
+    x_mixed = np.einsum('nij,nik->njk', mu_ij, model_states)
+    diff = model_states[:, :, np.newaxis, :] - x_mixed[:, np.newaxis, :, :]
+    spread = model_covariances[:, :, np.newaxis] + diff[..., :, np.newaxis] * diff[..., np.newaxis, :]
+    P_mixed = np.einsum('nij,nijkl->njkl', mu_ij, spread)
+
+    # --- 2. Model-Specific Prediction Step ---
+    x_pred = np.empty_like(x_mixed)
+    P_pred = np.empty_like(P_mixed)
+    x_pred[:, 0], P_pred[:, 0] = cv_predict_batch(x_mixed[:, 0], P_mixed[:, 0], imm_params['Q_cv'], delta_t, ego_yaw_rate)
+    x_pred[:, 1], P_pred[:, 1] = ct_predict_batch(x_mixed[:, 1], P_mixed[:, 1], imm_params['Q_ct'], delta_t)
+    x_pred[:, 2], P_pred[:, 2] = ca_predict_batch(x_mixed[:, 2], P_mixed[:, 2], imm_params['Q_ca'], delta_t)
+
+    # --- 3. Fuse Predicted States and Covariances ---
+    x_fused = np.einsum('nj,njk->nk', c_bar, x_pred)
+    diff = x_pred - x_fused[:, np.newaxis, :]
+    P_fused = np.einsum('nj,njkl->nkl', c_bar, P_pred + diff[..., :, np.newaxis] * diff[..., np.newaxis, :])
+
+    return x_pred, P_pred, c_bar, x_fused, P_fused
+
+
 def imm_correct(imm_state_pred, z_polar, R_polar):
     """
     Performs the correction/update step of the IMM filter.
     """
     N = 3
     imm_state_corr = imm_state_pred.copy()
+    # Correct new model dictionaries: a shallow copy would write the corrected
+    # models back into 'imm_state_pred'.
+    imm_state_corr['models'] = [dict(model) for model in imm_state_pred['models']]
     
     likelihoods = np.zeros(N)
     
@@ -120,7 +171,7 @@ def imm_correct(imm_state_pred, z_polar, R_polar):
         S_j = H @ P_pred_j @ H.T + R_polar
         S_j_inv = np.linalg.inv(S_j)
         
-        mahalanobis_sq = y_j.T @ S_j_inv @ y_j
+        mahalanobis_sq = (y_j.T @ S_j_inv @ y_j).item()
         likelihoods[j] = np.exp(-0.5 * mahalanobis_sq) / np.sqrt(np.linalg.det(2 * np.pi * S_j))
         
         # --- 3. Model-Specific State Correction (done inside loop) ---
@@ -148,4 +199,96 @@ def imm_correct(imm_state_pred, z_polar, R_polar):
     imm_state_corr['x'] = x_fused
     imm_state_corr['P'] = P_fused
 
-    return imm_state_corr
\ No newline at end of file
+    return imm_state_corr
+
+
+def polar_measurement_model(x):
+    """
+    The polar measurement [range, azimuth, radial speed] of N states and its
+    Jacobian, as imm_correct builds them. States within 1e-6 m of the sensor
+    get a zero measurement and Jacobian.
+
+    Args:
+        x (np.ndarray): (..., 7) states.
+
+    Returns:
+        tuple: (h_x, H) with shapes (..., 3) and (..., 3, 7).
+    """
+    px, py, vx, vy = x[..., 0], x[..., 1], x[..., 2], x[..., 3]
+    r = np.sqrt(px**2 + py**2)
+    valid = r >= 1e-6
+    r = np.where(valid, r, 1.0)
+    r_sq, r_cub = r**2, r**3
+    radial_speed = (px*vx + py*vy) / r
+
+    h_x = np.stack((r, np.arctan2(px, py), radial_speed), axis=-1)
+    H = np.zeros(x.shape[:-1] + (3, 7))
+    H[..., 0, 0] = px/r; H[..., 0, 1] = py/r
+    H[..., 1, 0] = py/r_sq; H[..., 1, 1] = -px/r_sq
+    H[..., 2, 0] = (vx/r) - (px*(px*vx + py*vy))/r_cub
+    H[..., 2, 1] = (vy/r) - (py*(px*vx + py*vy))/r_cub
+    H[..., 2, 2] = px/r; H[..., 2, 3] = py/r
+    h_x[~valid] = 0.0
+    H[~valid] = 0.0
+    return h_x, H
+
+
+def inv_det_3x3(S):
+    """Inverses and determinants of (..., 3, 3) matrices, in closed form (adjugate / det)."""
+    a, b, c = S[..., 0, 0], S[..., 0, 1], S[..., 0, 2]
+    d, e, f = S[..., 1, 0], S[..., 1, 1], S[..., 1, 2]
+    g, h, i = S[..., 2, 0], S[..., 2, 1], S[..., 2, 2]
+    cofactors = np.stack((
+        np.stack((e*i - f*h, c*h - b*i, b*f - c*e), axis=-1),
+        np.stack((f*g - d*i, a*i - c*g, c*d - a*f), axis=-1),
+        np.stack((d*h - e*g, b*g - a*h, a*e - b*d), axis=-1),
+    ), axis=-2)
+    det = a*cofactors[..., 0, 0] + b*cofactors[..., 1, 0] + c*cofactors[..., 2, 0]
+    return cofactors / det[..., np.newaxis, np.newaxis], det
+
+
+def imm_correct_batch(model_states, model_covariances, model_probabilities, z_polar, R_polar):
+    """
+    imm_correct for K (predicted state, measurement) pairs at once. The pairs
+    are independent: several may share a track's prediction, as JPDA corrects
+    one prediction with every gated measurement.
+
+    Args:
+        model_states (np.ndarray): (K, 3, 7) predicted per-model states.
+        model_covariances (np.ndarray): (K, 3, 7, 7) predicted per-model covariances.
+        model_probabilities (np.ndarray): (K, 3) predicted model probabilities.
+        z_polar (np.ndarray): (K, 3) measurements [range, azimuth, radial speed].
+        R_polar (np.ndarray): The 3x3 measurement noise.
+
+    Returns:
+        tuple: (model_states, model_covariances, model_probabilities, states,
+            covariances, likelihoods), corrected; 'likelihoods' is the (K, 3)
+            measurement likelihood under each model.
+    """
+    h_x, H = polar_measurement_model(model_states)
+    y = z_polar[:, np.newaxis, :] - h_x
+    y[..., 1] = (y[..., 1] + np.pi) % (2 * np.pi) - np.pi # Wrap angle to [-pi, pi]
+
+    PHt = model_covariances @ np.swapaxes(H, -1, -2)
+    S = H @ PHt + R_polar
+    S_inv, S_det = inv_det_3x3(S)
+    S_inv_y = np.einsum('kmij,kmj->kmi', S_inv, y)
+    mahalanobis_sq = np.einsum('kmi,kmi->km', y, S_inv_y)
+    likelihoods = np.exp(-0.5 * mahalanobis_sq) / np.sqrt((2 * np.pi)**3 * S_det)
+
+    # --- Model-Specific State Correction ---
+    K_gain = PHt @ S_inv
+    x_corr = model_states + np.einsum('kmij,kmj->kmi', K_gain, y)
+    P_corr = model_covariances - K_gain @ H @ model_covariances
+
+    # --- Update Model Probabilities ---
+    mu_new = likelihoods * model_probabilities
+    c_normal = np.sum(mu_new, axis=1, keepdims=True)
+    mu_new = np.where(c_normal > 1e-9, mu_new / np.where(c_normal > 1e-9, c_normal, 1.0), model_probabilities)
+
+    # --- State and Covariance Fusion ---
+    x_fused = np.einsum('km,kmi->ki', mu_new, x_corr)
+    diff = x_corr - x_fused[:, np.newaxis, :]
+    P_fused = np.einsum('km,kmij->kij', mu_new, P_corr + diff[..., :, np.newaxis] * diff[..., np.newaxis, :])
+
+    return x_corr, P_corr, mu_new, x_fused, P_fused, likelihoods
@@ -134,4 +134,74 @@ def ct_predict(x, P, Q_ct, delta_t):
     # --- Covariance Prediction ---
     P_pred = F @ P @ F.T + Q_ct
 
-    return x_pred, P_pred
\ No newline at end of file
+    return x_pred, P_pred
+
+# --- Batched predictions over N tracks: x is (N, 7), P is (N, 7, 7) ---
+
+def ca_predict_batch(x, P, Q_ca, delta_t):
+    """ca_predict for N tracks at once."""
+    F = np.eye(7)
+    F[0, 2] = delta_t
+    F[1, 3] = delta_t
+    F[0, 4] = 0.5 * delta_t**2
+    F[1, 5] = 0.5 * delta_t**2
+    F[2, 4] = delta_t
+    F[3, 5] = delta_t
+    return x @ F.T, F @ P @ F.T + Q_ca
+
+
+def cv_predict_batch(x, P, Q_cv, delta_t, ego_yaw_rate):
+    """cv_predict for N tracks at once, with the same ego rotation compensation."""
+    F = np.eye(7)
+    F[0, 2] = delta_t
+    F[1, 3] = delta_t
+    x_pred = x @ F.T
+
+    if abs(ego_yaw_rate) > 1e-4:
+        rotation_angle = -ego_yaw_rate * delta_t
+        cos_rot = np.cos(rotation_angle)
+        sin_rot = np.sin(rotation_angle)
+        R_mat = np.array([[cos_rot, -sin_rot],
+                          [sin_rot,  cos_rot]])
+        x_pred[:, 0:2] = x_pred[:, 0:2] @ R_mat.T
+        x_pred[:, 2:4] = x_pred[:, 2:4] @ R_mat.T
+
+    return x_pred, F @ P @ F.T + Q_cv
+
+
+def ct_predict_batch(x, P, Q_ct, delta_t):
+    """
+    ct_predict for N tracks at once. Tracks with |omega| < 0.05 use the
+    constant velocity fallback for both the state and the Jacobian.
+    """
+    px, py, vx, vy, omega = x[:, 0], x[:, 1], x[:, 2], x[:, 3], x[:, 6]
+    is_turning = np.abs(omega) >= 0.05
+    # The fallback rows never read the turn terms; any non-zero omega keeps them finite.
+    w = np.where(is_turning, omega, 1.0)
+    sin_wT = np.sin(w * delta_t)
+    cos_wT = np.cos(w * delta_t)
+
+    x_pred = x.copy()
+    x_pred[:, 0] = np.where(is_turning, px + (vx * sin_wT - vy * (1 - cos_wT)) / w, px + vx * delta_t)
+    x_pred[:, 1] = np.where(is_turning, py + (vx * (1 - cos_wT) + vy * sin_wT) / w, py + vy * delta_t)
+    x_pred[:, 2] = np.where(is_turning, vx * cos_wT - vy * sin_wT, vx)
+    x_pred[:, 3] = np.where(is_turning, vx * sin_wT + vy * cos_wT, vy)
+
+    # --- Jacobian (F) per track ---
+    F = np.tile(np.eye(7), (x.shape[0], 1, 1))
+    F[:, 0, 2] = np.where(is_turning, sin_wT / w, delta_t)
+    F[:, 1, 3] = np.where(is_turning, sin_wT / w, delta_t)
+    F[:, 1, 2] = np.where(is_turning, (1 - cos_wT) / w, 0.0)
+    F[:, 2, 2] = np.where(is_turning, cos_wT, 1.0)
+    F[:, 3, 2] = np.where(is_turning, sin_wT, 0.0)
+    F[:, 0, 3] = np.where(is_turning, -(1 - cos_wT) / w, 0.0)
+    F[:, 2, 3] = np.where(is_turning, -sin_wT, 0.0)
+    F[:, 3, 3] = np.where(is_turning, cos_wT, 1.0)
+    term1_px = -vx * sin_wT + vy * cos_wT
+    term1_py = vx * cos_wT + vy * sin_wT
+    F[:, 0, 6] = np.where(is_turning, (term1_px * w - (vx * sin_wT - vy * (1 - cos_wT))) / w**2, 0.0)
+    F[:, 1, 6] = np.where(is_turning, (term1_py * w - (vx * (1 - cos_wT) + vy * sin_wT)) / w**2, 0.0)
+    F[:, 2, 6] = np.where(is_turning, (-vx * sin_wT - vy * cos_wT) * delta_t, 0.0)
+    F[:, 3, 6] = np.where(is_turning, (vx * cos_wT - vy * sin_wT) * delta_t, 0.0)
+
+    return x_pred, F @ P @ np.swapaxes(F, 1, 2) + Q_ct
@@ -31,8 +31,14 @@ def define_parameters():
         'maxRadius': 80, # meters
         'maxRadialSpeedThreshold': 20 # m/s
     }
-    params['assignment_params'] = {'assignmentThreshold': 10.0} # Mahalanobis distance squared
-    params['jpda_params'] = {'PD': 0.9, 'lambda_c': 0.1, 'gating_chi2': 9.21}
+    params['assignment_params'] = {
+        'assignmentThreshold': 10.0, # Mahalanobis distance squared
+        'assignmentMethod': 'optimal' # 'optimal' (linear_sum_assignment) or 'greedy', for tentative updates and reassignment
+    }
+    params['jpda_params'] = {
+        'PD': 0.9, 'lambda_c': 0.1, 'gating_chi2': 9.21,
+        'maxHypothesesPerCluster': 1000 # Larger track/measurement clusters use a beam of this width
+    }
 
     # --- Track Lifecycle Parameters ---
     params['lifecycle_params'] = {
@@ -56,6 +62,11 @@ def define_parameters():
         'ransacInlierThreshold': 0.5, # m/s
         'ransacMinInlierRatio': 0.5,
         'ransacMaxIterations': 20,
+        'ransacSeed': 0, # Seed of the RANSAC sample generator, None for a random seed
+        'ransacAdaptive': False, # Opt-in CAN-seeded hypothesis and confidence-bound stop; changes the ego-motion output
+        'ransacConfidence': 0.99,
+        'ransacBatchSize': 10, # Hypotheses per batch in the adaptive mode
+        'ransacMaxTimeMs': None, # Opt-in sampling time cap; results then depend on CPU timing
         'iir_alpha': 0.4,
         'increasedMeasurementNoiseFactor': 10
     }
@@ -64,8 +75,35 @@ def define_parameters():
         'confirmation_samples': 3
     }
 
+    # --- Numeric Parameters ---
+    # Float type of the point-level stages (pre-filter, ego-motion, grid, DBSCAN).
+    # np.float32 is an opt-in that halves the memory traffic at the cost of rounded points.
+    params['compute_params'] = {'pointCloudDtype': np.float64}
+
+    # --- Point Cloud Pre-filter Parameters ---
+    # Applied before ego-motion estimation and clustering. Results are mapped
+    # back to all points of the frame; filtered points are never outliers or clustered.
+    # Opt-in: enabling it changes the ego-motion, clustering and track output.
+    params['prefilter_params'] = {
+        'enabled': False,
+        'cropToGrid': True,     # Drop points outside grid_config
+        'minSnr': None,         # dB, None disables
+        'maxAbsDoppler': None,  # m/s, None disables
+        'voxelSize': 0.0,       # meters, 0 disables voxel downsampling
+        'maxPoints': 1000       # 0 disables the cap
+    }
+
     # --- Clustering and Grid Parameters ---
     params['dbscan_params'] = {'epsilon_pos': 2.0, 'epsilon_vel': 2.0, 'min_pts': 3}
+    # Track-guided clustering: points in the predicted gate of a confirmed track
+    # are grouped directly and DBSCAN only runs on the leftover points.
+    params['track_guided_clustering_params'] = {
+        'enabled': False,
+        'gateSigmas': 3.0,      # Gate radius in position standard deviations
+        'minGateRadius': 1.0,   # meters
+        'maxGateRadius': 3.0,   # meters
+        'gateVelocity': 2.0     # m/s, radial speed difference to the track
+    }
     params['grid_config'] = {'X_RANGE': [-40, 40], 'Y_RANGE': [0, 80], 'NUM_COLS': 40, 'NUM_ROWS': 40}
     params['cluster_filter_params'] = {'min_outlierClusterRatio_thrs': 0.6}
     params['stationary_cluster_box'] = {'X_RANGE': [-3, 3], 'Y_RANGE': [0.5, 7.5]}
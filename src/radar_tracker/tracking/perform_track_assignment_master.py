@@ -1,13 +1,13 @@
 import numpy as np
 import logging
-from copy import deepcopy
 
 # MODIFICATION: Changed all imports to use a single dot (.) for correct relative path
-from .filters.imm_filter import imm_predict, imm_correct
+from .filters.imm_filter import imm_predict_batch, imm_correct
 from .track_management.jpda_assignment import jpda_assignment
 from .track_management.update_tentative import update_tentative_tracks
 from .track_management.reassign import reassign_lost_tracks
 from .track_management.assign import assign_new_tracks
+from .track_management.gating_engine import GatingEngine
 from .track_management.delete import delete_unassigned_tracks
 from .utils.categorize_ttc import categorize_ttc
 from .utils.calculate_ellipse_radii import calculate_ellipse_radii
@@ -15,10 +15,14 @@ from .utils.calculate_ellipse_radii import calculate_ellipse_radii
 
 def perform_track_assignment_master(
     current_frame_idx, detected_centroids, detected_cluster_info, all_tracks, 
-    next_track_id, delta_t, ego_yaw_rate, params
+    next_track_id, delta_t, ego_yaw_rate, params, gating_stats=None, jpda_stats=None
 ):
     """
     The main orchestrator for the track management process for a single frame.
+    'all_tracks' is the tracker's TrackTable; it is updated in place and returned.
+    If a 'gating_stats' dict is given, the frame's spatial pre-gate counts
+    ('candidatePairs', 'totalPairs') are written to it; a 'jpda_stats' dict
+    receives the JPDA cluster and hypothesis counts.
     """
     debug_mode = params.get('debug_mode', False)
     num_detections = detected_centroids.shape[0] if detected_centroids is not None else 0
@@ -27,26 +31,29 @@ def perform_track_assignment_master(
     if debug_mode:
         logging.info(f'\n\n--- MASTER FRAME {current_frame_idx} ---')
 
-    # --- 1. Separate tracks by state ---
-    confirmed_indices = [i for i, t in enumerate(all_tracks) if t.get('isConfirmed') and not t.get('isLost')]
-    tentative_indices = [i for i, t in enumerate(all_tracks) if not t.get('isConfirmed') and not t.get('isLost')]
-    lost_indices = [i for i, t in enumerate(all_tracks) if t.get('isLost')]
+    # --- 1. Separate tracks by state (index sets kept up to date by the TrackTable) ---
+    confirmed_indices = all_tracks.confirmed_indices
+    tentative_indices = all_tracks.tentative_indices
+    lost_indices = all_tracks.lost_indices
 
     if debug_mode:
         logging.info(f'[MASTER] Start: {num_detections} detections, {len(confirmed_indices)} confirmed, {len(tentative_indices)} tentative, {len(lost_indices)} lost tracks.')
 
-    # --- 2. Predict states for all active tracks ---
+    # --- 2. Predict states for all active tracks (one batched IMM step) ---
     active_indices = confirmed_indices + tentative_indices
-    predicted_states = {} # Store pre-update states for logging
+    prior_states = all_tracks.states.copy() # Pre-update states for logging
     if active_indices:
         if debug_mode:
             logging.info(f'\n[MASTER] -> Predicting states for {len(active_indices)} active tracks using IMM filter...')
-        for track_idx in active_indices:
-            # Store a deepcopy for logging later
-            predicted_states[track_idx] = deepcopy(all_tracks[track_idx]['immState'])
-            all_tracks[track_idx]['immState'] = imm_predict(
-                all_tracks[track_idx]['immState'], params['imm_params'], delta_t, ego_yaw_rate
-            )
+        rows = np.array(active_indices)
+        (all_tracks.model_states[rows], all_tracks.model_covariances[rows], all_tracks.model_probabilities[rows],
+         all_tracks.states[rows], all_tracks.covariances[rows]) = imm_predict_batch(
+            all_tracks.model_states[rows], all_tracks.model_covariances[rows], all_tracks.model_probabilities[rows],
+            all_tracks.mu_is_column[rows], params['imm_params'], delta_t, ego_yaw_rate
+        )
+
+    # One detection table and gating engine for JPDA, tentative updates and new tracks.
+    gating = GatingEngine(detected_centroids, detected_cluster_info, params['kf_measurement_noise'])
 
     # --- 3. Maintain Confirmed Tracks (JPDA) ---
     assigned_confirmed_flags = np.zeros(len(confirmed_indices), dtype=bool)
@@ -59,7 +66,8 @@ def perform_track_assignment_master(
             all_tracks, confirmed_indices, detected_centroids, detected_cluster_info,
             params['kf_measurement_noise'], params['jpda_params']['PD'], 
             params['jpda_params']['lambda_c'], params['jpda_params']['gating_chi2'],
-            params['gating_params']['positionGatingThreshold'], params
+            params['gating_params']['positionGatingThreshold'], params, gating=gating,
+            jpda_stats=jpda_stats
         )
         # --- END OF FIX ---
 
@@ -83,7 +91,6 @@ def perform_track_assignment_master(
                 if len(track['trajectory']) > params['lifecycle_params']['maxTrajectoryLength']:
                     track['trajectory'].pop(0)
 
-                predicted_state_for_log = predicted_states[track_idx]
                 current_distance = np.linalg.norm(corrected_state_comb[0:2])
                 if current_distance > 0:
                     radial_vel = (corrected_state_comb[0] * corrected_state_comb[2] + 
@@ -103,7 +110,7 @@ def perform_track_assignment_master(
 
                 log_entry = {
                     'frameIdx': current_frame_idx,
-                    'predictedPosition': predicted_state_for_log['x'][0:2].flatten(),
+                    'predictedPosition': prior_states[track_idx, 0:2],
                     'correctedPosition': corrected_state_comb[0:2].flatten(),
                     'modelProbabilities': track['immState']['modelProbabilities'].flatten(),
                     'ttc': ttc, 'ttcCategory': categorize_ttc(ttc, radial_vel if current_distance > 0 else 0, corrected_state_comb[0]),
@@ -122,7 +129,7 @@ def perform_track_assignment_master(
             current_frame_idx, detected_centroids, detected_cluster_info, all_tracks,
             tentative_indices, assigned_detections_flags, params['kf_measurement_noise'],
             params['assignment_params']['assignmentThreshold'],
-            params['lifecycle_params'], params['ttc_params'], params
+            params['lifecycle_params'], params['ttc_params'], params, gating=gating
         )
 
     # --- 5. Reassign Lost Tracks ---
@@ -133,7 +140,7 @@ def perform_track_assignment_master(
             current_frame_idx, detected_centroids, detected_cluster_info, all_tracks,
             assigned_detections_flags, params['imm_params'],
             params['reassignment_params'], params['ttc_params']['collisionRadius'],
-            params
+            params, gating=gating
         )
 
     # --- 6. Assign New Tracks ---
@@ -144,7 +151,7 @@ def perform_track_assignment_master(
             current_frame_idx, detected_centroids, detected_cluster_info, all_tracks,
             assigned_detections_flags, next_track_id, params['imm_params'], 
             params['gating_params'], params['ttc_params']['collisionRadius'],
-            params['lifecycle_params']['trackStationary'], params
+            params['lifecycle_params']['trackStationary'], params, gating=gating
         )
 
     # --- 7. Handle Missed Tracks ---
@@ -160,8 +167,12 @@ def perform_track_assignment_master(
             params['lifecycle_params'], params['ttc_params'], params
         )
 
+    if gating_stats is not None:
+        gating_stats['candidatePairs'] = gating.candidate_pairs
+        gating_stats['totalPairs'] = gating.total_pairs
+
     # --- 8. Final Count ---
-    num_confirmed_tracks = sum(1 for t in all_tracks if t.get('isConfirmed') and not t.get('isLost'))
+    num_confirmed_tracks = all_tracks.num_confirmed
     if debug_mode:
         logging.info(f'\n[MASTER] End: Final confirmed tracks: {num_confirmed_tracks}.')
         logging.info(f'--- END MASTER FRAME {current_frame_idx} ---')
@@ -2,19 +2,23 @@
 
 import numpy as np
 import logging
+from .gating_engine import GatingEngine
 from ..utils.categorize_ttc import categorize_ttc
 from ..utils.calculate_ellipse_radii import calculate_ellipse_radii
 
 def assign_new_tracks(
     current_frame_idx, detected_centroids, detected_cluster_info, all_tracks,
     assigned_detections_flags, next_track_id, imm_params, gating_params,
-    collision_radius, track_stationary, params
+    collision_radius, track_stationary, params, gating=None
 ):
     """
     Creates new tracks from unassigned detections using the IMM filter structure.
+    'gating' is the frame's GatingEngine (built from the detections if omitted).
     """
     debug_mode = params.get('debug_mode', False)
     unassigned_detections = np.where(~assigned_detections_flags)[0]
+    if gating is None:
+        gating = GatingEngine(detected_centroids, detected_cluster_info, params['kf_measurement_noise'])
 
     if debug_mode and unassigned_detections.size > 0:
         logging.info(f'[ASSIGN] Checking {unassigned_detections.size} unassigned detections for new tracks.')
@@ -22,8 +26,8 @@ def assign_new_tracks(
     for detection_idx in unassigned_detections:
         det_info = detected_cluster_info[detection_idx]
         det_x_rel, det_y_rel = detected_centroids[detection_idx]
-        det_radius_rel = np.sqrt(det_x_rel**2 + det_y_rel**2)
-        angle_det_rel_deg = np.rad2deg(np.arctan2(det_x_rel, det_y_rel))
+        det_radius_rel = gating.ranges[detection_idx]
+        angle_det_rel_deg = np.rad2deg(gating.azimuths[detection_idx])
 
         is_reliable = (gating_params['minAngle'] <= angle_det_rel_deg <= gating_params['maxAngle']) and \
                       (det_radius_rel < gating_params['maxRadius'])
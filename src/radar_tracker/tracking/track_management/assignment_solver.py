@@ -0,0 +1,106 @@
+# src/track_management/assignment_solver.py
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from ..algorithms.find_jpda_hypotheses import find_jpda_clusters
+
+ASSIGNMENT_METHODS = ('optimal', 'greedy')
+# Pruned problems with more rows or columns than this are split into connected
+# components. Below it, one linear_sum_assignment call on the pruned matrix is
+# faster than finding the components and solving each one from Python (measured
+# with assignment_benchmark.py, where the split only paid off above ~200 tracks).
+# Both give an assignment of the same size and total cost, because components share no feasible pair.
+DIRECT_SOLVE_SIZE = 256
+
+
+def greedy_assignment(cost_matrix):
+    """
+    Repeatedly assigns the cheapest remaining (detection, track) pair and
+    removes its row and column, until no finite cost is left.
+
+    Returns:
+        tuple: (detection_indices, track_indices) in the order assigned.
+    """
+    detection_indices, track_indices = [], []
+    temp_cost_matrix = cost_matrix.copy()
+    while np.any(np.isfinite(temp_cost_matrix)):
+        det_idx, track_idx = np.unravel_index(np.argmin(temp_cost_matrix), temp_cost_matrix.shape)
+        detection_indices.append(det_idx)
+        track_indices.append(track_idx)
+        temp_cost_matrix[det_idx, :] = np.inf
+        temp_cost_matrix[:, track_idx] = np.inf
+    return np.array(detection_indices, dtype=int), np.array(track_indices, dtype=int)
+
+
+def _solve_feasible(cost_matrix, feasible, det_indices, track_indices):
+    """
+    linear_sum_assignment on the rows 'det_indices' and columns
+    'track_indices'. Infeasible pairs get a cost above the sum of all
+    feasible ones, so the solution assigns as many feasible pairs as
+    possible and then minimizes their total cost.
+    """
+    sub_costs = cost_matrix[np.ix_(det_indices, track_indices)]
+    sub_feasible = feasible[np.ix_(det_indices, track_indices)]
+    infeasible_cost = np.sum(np.abs(sub_costs[sub_feasible])) + 1.0
+    det_idx, track_idx = linear_sum_assignment(np.where(sub_feasible, sub_costs, infeasible_cost))
+    kept = sub_feasible[det_idx, track_idx]
+    return det_indices[det_idx[kept]], track_indices[track_idx[kept]]
+
+
+def optimal_assignment(cost_matrix):
+    """
+    Solves the rectangular assignment problem on gated costs (np.inf marks
+    an infeasible pair) with scipy's linear_sum_assignment.
+
+    Pairs whose row and column have no other feasible pair are assigned
+    directly, and rows and columns without a feasible pair are pruned. Up to
+    DIRECT_SOLVE_SIZE remaining rows and columns, the pruned problem is solved
+    in a single call. Only larger problems are split into the connected
+    components of the feasible pairs and solved one component at a time, since
+    for small problems the split costs more than it saves.
+
+    Returns:
+        tuple: (detection_indices, track_indices), ordered by cost.
+    """
+    feasible = np.isfinite(cost_matrix)
+    is_isolated = feasible & (feasible.sum(axis=1) == 1)[:, np.newaxis] & (feasible.sum(axis=0) == 1)[np.newaxis, :]
+    isolated_dets, isolated_tracks = np.nonzero(is_isolated)
+    detection_parts, track_parts = [isolated_dets], [isolated_tracks]
+
+    contended = feasible & ~is_isolated
+    contended_dets = np.flatnonzero(contended.any(axis=1))
+    contended_tracks = np.flatnonzero(contended.any(axis=0))
+    if max(contended_dets.size, contended_tracks.size) > DIRECT_SOLVE_SIZE:
+        components = find_jpda_clusters(contended)
+    elif contended_dets.size:
+        components = [(contended_dets, contended_tracks)]
+    else:
+        components = []
+    for component_dets, component_tracks in components:
+        det_idx, track_idx = _solve_feasible(cost_matrix, contended, component_dets, component_tracks)
+        detection_parts.append(det_idx)
+        track_parts.append(track_idx)
+
+    detection_indices = np.concatenate(detection_parts).astype(int)
+    track_indices = np.concatenate(track_parts).astype(int)
+    order = np.argsort(cost_matrix[detection_indices, track_indices], kind='stable')
+    return detection_indices[order], track_indices[order]
+
+
+def solve_assignment(cost_matrix, method='optimal'):
+    """
+    Assigns detections (rows) to tracks (columns) of a gated cost matrix.
+
+    Args:
+        cost_matrix (np.ndarray): (detections x tracks) costs, np.inf where gated out.
+        method (str): 'optimal' (linear_sum_assignment on the pruned problem, see
+            optimal_assignment) or 'greedy' (cheapest pair first), kept for A/B comparison.
+
+    Returns:
+        tuple: (detection_indices, track_indices) of the assigned pairs.
+    """
+    if method == 'optimal':
+        return optimal_assignment(cost_matrix)
+    if method == 'greedy':
+        return greedy_assignment(cost_matrix)
+    raise ValueError(f"Unknown assignment method '{method}', expected one of {ASSIGNMENT_METHODS}")
@@ -0,0 +1,157 @@
+# src/track_management/gating_engine.py
+
+import numpy as np
+from ..filters.imm_filter import polar_measurement_model, inv_det_3x3
+from ..algorithms.my_dbscan import _ragged_ranges
+
+
+class GatingEngine:
+    """
+    Gates tracks against the detections of one frame.
+
+    The detection table (positions, polar measurements [range, azimuth,
+    radial speed]) is built once per frame and shared by JPDA, the tentative
+    track update and new track creation. gate() computes each track's
+    measurement Jacobian, innovation covariance and its inverse once, and
+    evaluates all (detection, track) pairs with array operations.
+
+    With a distance limit, a spatial pre-gate buckets the detections on a
+    uniform grid with cells of that size; each track then only meets the
+    detections of the 3x3 cells around it. 'candidate_pairs' and
+    'total_pairs' count the pairs that passed the pre-gate and the pairs a
+    full comparison would have made.
+    """
+    def __init__(self, detected_centroids, detected_cluster_info, R_polar):
+        if detected_centroids is None or len(detected_centroids) == 0:
+            self.positions = np.empty((0, 2))
+        else:
+            # Kept in the detections' dtype, so the measurements match a per-pair evaluation.
+            self.positions = np.asarray(detected_centroids)[:, 0:2]
+        self.num_detections = self.positions.shape[0]
+        x, y = self.positions[:, 0], self.positions[:, 1]
+        self.ranges = np.sqrt(x**2 + y**2)
+        self.azimuths = np.arctan2(x, y)
+        self.radial_speeds = np.array([info['radialSpeed'] for info in detected_cluster_info[:self.num_detections]],
+                                      dtype=float).reshape(self.num_detections)
+        self.z_polar = np.column_stack((self.ranges, self.azimuths, self.radial_speeds))
+        self.R_polar = R_polar
+        self.candidate_pairs = 0
+        self.total_pairs = 0
+
+    def find_candidate_pairs(self, track_positions, max_distance, detection_indices=None):
+        """
+        Finds the (detection, track) pairs within 'max_distance' of each other
+        with a uniform-grid pre-gate instead of comparing all pairs.
+
+        Args:
+            track_positions (np.ndarray): (T, 2) track positions.
+            max_distance (float): The gate radius in metres (also the cell size).
+            detection_indices (np.ndarray, optional): The detections to search, all by default.
+
+        Returns:
+            tuple: (pair_detections, pair_tracks, distances). Detection indices
+                refer to the whole frame; pairs are ordered by track, then detection.
+        """
+        if detection_indices is None:
+            detection_indices = np.arange(self.num_detections)
+        num_tracks = len(track_positions)
+        self.total_pairs += detection_indices.size * num_tracks
+        if detection_indices.size == 0 or num_tracks == 0:
+            return np.empty(0, dtype=int), np.empty(0, dtype=int), np.empty(0)
+
+        # Cells are numbered column by column, so the three cells of a column
+        # around a track are one run of keys in the sorted detections.
+        positions = self.positions[detection_indices]
+        origin = positions.min(axis=0)
+        det_cells = np.floor((positions - origin) / max_distance).astype(np.int64)
+        num_cols, num_rows = det_cells.max(axis=0) + 1
+        det_keys = det_cells[:, 0] * num_rows + det_cells[:, 1]
+        order = np.argsort(det_keys, kind='stable')
+        sorted_keys = det_keys[order]
+
+        track_cells = np.floor((track_positions - origin) / max_distance)
+        first_row = np.clip(track_cells[:, 1] - 1, 0, num_rows - 1)
+        last_row = np.clip(track_cells[:, 1] + 1, 0, num_rows - 1)
+        rows_overlap = (track_cells[:, 1] + 1 >= 0) & (track_cells[:, 1] - 1 <= num_rows - 1)
+        starts, ends = [], []
+        for col_offset in (-1, 0, 1):
+            cols = track_cells[:, 0] + col_offset
+            valid = rows_overlap & (cols >= 0) & (cols <= num_cols - 1)
+            col_base = np.where(valid, cols, 0) * num_rows
+            run_start = np.searchsorted(sorted_keys, col_base + first_row, side='left')
+            run_end = np.searchsorted(sorted_keys, col_base + last_row, side='right')
+            starts.append(np.where(valid, run_start, 0))
+            ends.append(np.where(valid, run_end, 0))
+        starts = np.stack(starts, axis=1).ravel()
+        ends = np.stack(ends, axis=1).ravel()
+
+        pair_tracks = np.repeat(np.repeat(np.arange(num_tracks), 3), ends - starts)
+        pair_detections = order[_ragged_ranges(starts, ends)]
+        dx = track_positions[pair_tracks, 0] - positions[pair_detections, 0]
+        dy = track_positions[pair_tracks, 1] - positions[pair_detections, 1]
+        distances = np.sqrt(dx**2 + dy**2)
+        in_gate = distances <= max_distance
+
+        pair_tracks, pair_detections, distances = pair_tracks[in_gate], pair_detections[in_gate], distances[in_gate]
+        by_track = np.lexsort((pair_detections, pair_tracks))
+        self.candidate_pairs += by_track.size
+        return detection_indices[pair_detections[by_track]], pair_tracks[by_track], distances[by_track]
+
+    def gate(self, states, covariances, detection_indices=None, max_distance=None):
+        """
+        Evaluates tracks against detections.
+
+        Args:
+            states (np.ndarray): (T, 7) fused track states.
+            covariances (np.ndarray): (T, 7, 7) fused track covariances.
+            detection_indices (np.ndarray, optional): The detections to gate
+                against, all by default.
+            max_distance (float, optional): A Euclidean gate in metres. Only
+                the pairs within it (found by find_candidate_pairs) are
+                evaluated; all others get an infinite distance.
+
+        Returns:
+            dict: (detections x tracks) matrices 'distance' (Euclidean, in
+                metres), 'mahalanobisSq' and 'likelihood' (the Gaussian
+                density of the innovation), and the (T,) mask 'isValid' of the
+                tracks away from the sensor origin. Pairs of invalid tracks
+                have an infinite Mahalanobis distance and zero likelihood.
+        """
+        if detection_indices is None:
+            detection_indices = np.arange(self.num_detections)
+        num_tracks = states.shape[0]
+        h_x, H = polar_measurement_model(states)
+        S = H @ covariances @ np.swapaxes(H, -1, -2) + self.R_polar
+        S_inv, S_det = inv_det_3x3(S)
+        is_valid = np.sqrt(states[:, 0]**2 + states[:, 1]**2) >= 1e-6
+
+        if max_distance is None:
+            pair_slots = np.arange(detection_indices.size * num_tracks)
+            pair_dets, pair_tracks = np.divmod(pair_slots, num_tracks)
+            dx = states[pair_tracks, 0] - self.positions[detection_indices[pair_dets], 0]
+            dy = states[pair_tracks, 1] - self.positions[detection_indices[pair_dets], 1]
+            pair_distances = np.sqrt(dx**2 + dy**2)
+            self.total_pairs += pair_slots.size
+            self.candidate_pairs += pair_slots.size
+        else:
+            # Candidate detections come back as frame indices; map them to rows of the result.
+            frame_dets, pair_tracks, pair_distances = self.find_candidate_pairs(
+                states[:, 0:2], max_distance, detection_indices)
+            row_of_detection = np.full(self.num_detections, -1)
+            row_of_detection[detection_indices] = np.arange(detection_indices.size)
+            pair_dets = row_of_detection[frame_dets]
+
+        y = self.z_polar[detection_indices[pair_dets]] - h_x[pair_tracks]
+        y[:, 1] = (y[:, 1] + np.pi) % (2 * np.pi) - np.pi
+        pair_mahalanobis_sq = np.einsum('pi,pij,pj->p', y, S_inv[pair_tracks], y)
+        pair_mahalanobis_sq[~is_valid[pair_tracks]] = np.inf
+        pair_likelihood = np.exp(-0.5 * pair_mahalanobis_sq) / np.sqrt((2 * np.pi)**3 * S_det[pair_tracks])
+
+        shape = (detection_indices.size, num_tracks)
+        distance = np.full(shape, np.inf)
+        mahalanobis_sq = np.full(shape, np.inf)
+        likelihood = np.zeros(shape)
+        distance[pair_dets, pair_tracks] = pair_distances
+        mahalanobis_sq[pair_dets, pair_tracks] = pair_mahalanobis_sq
+        likelihood[pair_dets, pair_tracks] = pair_likelihood
+        return {'distance': distance, 'mahalanobisSq': mahalanobis_sq, 'likelihood': likelihood, 'isValid': is_valid}
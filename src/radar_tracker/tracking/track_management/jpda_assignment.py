@@ -3,17 +3,21 @@
 import numpy as np
 import logging
 
-from ..algorithms.find_jpda_hypotheses import find_jpda_hypotheses
-from ..filters.imm_filter import imm_correct
+from ..algorithms.find_jpda_hypotheses import find_jpda_hypotheses, find_jpda_clusters, find_beam_jpda_hypotheses
+from ..filters.imm_filter import imm_correct_batch
+from .gating_engine import GatingEngine
 
 def jpda_assignment(
     all_tracks, active_track_indices, detected_centroids, detected_cluster_info,
     kf_measurement_noise, PD, lambda_c, gating_chi2, position_gating_threshold,
-    params
+    params, gating=None, jpda_stats=None
 ):
     """
     Performs JPDA for confirmed tracks. This version now returns the index of the
     most likely measurement for each track to facilitate history logging.
+    'gating' is the frame's GatingEngine (built from the detections if omitted).
+    If a 'jpda_stats' dict is given, the frame's cluster, hypothesis and
+    approximated-cluster counts are written to it.
     """
     debug_mode = params.get('debug_mode', False)
     debug_mode1 = params.get('debug_mode1', False)
@@ -29,145 +33,125 @@ def jpda_assignment(
     if num_active_tracks == 0:
         return all_tracks, np.array([]), np.array([]), np.array([]), most_likely_measurement_indices
 
-    miss_flags = np.ones(num_active_tracks, dtype=bool)
-
-    # --- Step 1: Gating (Unchanged) ---
-    validation_matrix = np.zeros((num_detections, num_active_tracks), dtype=bool)
-    likelihoods = np.zeros((num_detections, num_active_tracks))
-    
-    for t, track_idx in enumerate(active_track_indices):
-        track = all_tracks[track_idx]
-        x_pred_comb = track['immState']['x']
-        P_pred_comb = track['immState']['P']
-        pred_x, pred_y = x_pred_comb[0, 0], x_pred_comb[1, 0]
-
-        for d in range(num_detections):
-            det_x, det_y = detected_centroids[d, 0], detected_centroids[d, 1]
-            euc_dist = np.sqrt((pred_x - det_x)**2 + (pred_y - det_y)**2)
-            if euc_dist > position_gating_threshold:
-                continue
-
-            z = np.array([np.sqrt(det_x**2 + det_y**2), np.arctan2(det_x, det_y), 
-                          detected_cluster_info[d]['radialSpeed']]).reshape(3, 1)
-            r_pred = np.sqrt(pred_x**2 + pred_y**2)
-            if r_pred < 1e-6: continue
-            h_x = np.array([r_pred, np.arctan2(pred_x, pred_y), 
-                            (pred_x * x_pred_comb[2,0] + pred_y * x_pred_comb[3,0]) / r_pred]).reshape(3,1)
-            y = z - h_x
-            y[1] = (y[1] + np.pi) % (2 * np.pi) - np.pi
-            px, py, vx, vy = pred_x, pred_y, x_pred_comb[2,0], x_pred_comb[3,0]
-            r, r_sq, r_cub = r_pred, r_pred**2, r_pred**3
-            H = np.zeros((3, 7))
-            H[0, 0] = px/r; H[0, 1] = py/r
-            H[1, 0] = py/r_sq; H[1, 1] = -px/r_sq
-            H[2, 0] = (vx/r)-(px*(px*vx+py*vy))/r_cub; H[2, 1] = (vy/r)-(py*(px*vx+py*vy))/r_cub
-            H[2, 2] = px/r; H[2, 3] = py/r
-            S = H @ P_pred_comb @ H.T + kf_measurement_noise
-            try:
-                S_inv = np.linalg.inv(S)
-                mahalanobis_dist_sq = y.T @ S_inv @ y
-            except np.linalg.LinAlgError:
-                continue
-            if mahalanobis_dist_sq <= gating_chi2:
-                validation_matrix[d, t] = True
-                likelihoods[d, t] = np.exp(-0.5 * mahalanobis_dist_sq) / np.sqrt(np.linalg.det(2 * np.pi * S))
-
-    # --- Steps 2, 3, 4: Hypothesis Generation & Probability Calculation (Unchanged) ---
-    hypotheses = find_jpda_hypotheses(validation_matrix, params)
-    if not hypotheses:
-        beta_placeholder = np.zeros((num_detections + 1, num_active_tracks))
-        return all_tracks, miss_flags, validation_matrix, beta_placeholder, most_likely_measurement_indices
-
-    hypothesis_probs = np.zeros(len(hypotheses))
-    for h_idx, hypo in enumerate(hypotheses):
-        prob = 1.0
-        for t_idx, meas_idx in enumerate(hypo):
-            if meas_idx > 0:
-                prob *= PD * likelihoods[meas_idx - 1, t_idx]
-            else:
-                prob *= (1 - PD)
-        unassigned_meas = set(range(1, num_detections + 1)) - set(m for m in hypo if m > 0)
-        prob *= (lambda_c ** len(unassigned_meas))
-        hypothesis_probs[h_idx] = prob
-    total_prob = np.sum(hypothesis_probs)
-    hypothesis_probs = hypothesis_probs / total_prob if total_prob > 0 else np.ones(len(hypotheses)) / len(hypotheses)
+    # --- Step 1: Gating (spatially pre-gated pairs, all at once) ---
+    if gating is None:
+        gating = GatingEngine(detected_centroids, detected_cluster_info, kf_measurement_noise)
+    rows = np.asarray(active_track_indices)
+    gate = gating.gate(all_tracks.states[rows], all_tracks.covariances[rows], max_distance=position_gating_threshold)
+    validation_matrix = (gate['distance'] <= position_gating_threshold) & (gate['mahalanobisSq'] <= gating_chi2)
+    likelihoods = np.where(validation_matrix, gate['likelihood'], 0.0)
+
+    # --- Steps 2, 3, 4: Hypothesis Generation & Probability Calculation, per cluster ---
+    # Tracks that share no measurement are independent, so the joint hypotheses
+    # of each cluster are enumerated and normalized on their own. Clusters with
+    # more than 'maxHypothesesPerCluster' hypotheses use a beam of that width.
+    max_hypotheses = params['jpda_params'].get('maxHypothesesPerCluster')
     beta = np.zeros((num_detections + 1, num_active_tracks))
-    for h_idx, hypo in enumerate(hypotheses):
-        for t_idx, meas_idx in enumerate(hypo):
-            beta[meas_idx, t_idx] += hypothesis_probs[h_idx]
+    beta[0, :] = 1.0 # Tracks outside every cluster can only miss.
+    clusters = find_jpda_clusters(validation_matrix)
+    num_hypotheses, num_approximated = 0, 0
+    for cluster_meas, cluster_tracks in clusters:
+        cluster_validation = validation_matrix[np.ix_(cluster_meas, cluster_tracks)]
+        cluster_likelihoods = likelihoods[np.ix_(cluster_meas, cluster_tracks)]
+        hypotheses = find_jpda_hypotheses(cluster_validation, params, max_hypotheses=max_hypotheses)
+        if hypotheses is None:
+            num_approximated += 1
+            hypotheses = find_beam_jpda_hypotheses(cluster_validation, cluster_likelihoods, PD, lambda_c,
+                                                   max_hypotheses)
+        num_hypotheses += len(hypotheses)
+
+        # Each (hypothesis, track) entry gathers its factor: PD times the
+        # likelihood of the assigned measurement, or 1 - PD for a miss (row 0).
+        # Measurements outside the cluster are clutter in every hypothesis and cancel out.
+        assign_factors = np.vstack((np.full((1, len(cluster_tracks)), 1 - PD), PD * cluster_likelihoods))
+        factors = assign_factors[hypotheses, np.arange(len(cluster_tracks))]
+        num_unassigned = len(cluster_meas) - np.count_nonzero(hypotheses, axis=1)
+        hypothesis_probs = np.prod(factors, axis=1) * lambda_c ** num_unassigned
+        total_prob = np.sum(hypothesis_probs)
+        hypothesis_probs = hypothesis_probs / total_prob if total_prob > 0 else np.full(len(hypotheses), 1.0 / len(hypotheses))
+
+        beta[0, cluster_tracks] = 0.0
+        beta_rows = np.concatenate(([0], cluster_meas + 1))[hypotheses]
+        beta_cols = np.broadcast_to(cluster_tracks, hypotheses.shape)
+        np.add.at(beta, (beta_rows, beta_cols), np.broadcast_to(hypothesis_probs[:, np.newaxis], hypotheses.shape))
+
+    if jpda_stats is not None:
+        jpda_stats['clusters'] = len(clusters)
+        jpda_stats['hypotheses'] = num_hypotheses
+        jpda_stats['approximatedClusters'] = num_approximated
+    if debug_mode and num_approximated:
+        logging.info(f'[JPDA] {num_approximated} of {len(clusters)} clusters exceeded {max_hypotheses} hypotheses; used the beam approximation.')
 
     # --- Step 5: Probabilistic IMM State Update ---
-    for t_idx, track_idx in enumerate(active_track_indices):
-        track = all_tracks[track_idx]
-        imm_state_pred = track['immState']
-        
-        beta_i0 = beta[0, t_idx]
-
-        hypo_states = {0: imm_state_pred}
-        
-        for d in range(num_detections):
-            if validation_matrix[d, t_idx] and beta[d + 1, t_idx] > 1e-9:
-                det_x, det_y = detected_centroids[d, 0], detected_centroids[d, 1]
-                z_polar = np.array([np.sqrt(det_x**2+det_y**2), np.arctan2(det_x, det_y), 
-                                    detected_cluster_info[d]['radialSpeed']]).reshape(3, 1)
-                hypo_states[d + 1] = imm_correct(imm_state_pred, z_polar, kf_measurement_noise)
-
-        x_final = np.zeros((7, 1))
-        mu_final = np.zeros((3, 1))
-        P_final = np.zeros((7, 7))
-
-        for d, state in hypo_states.items():
-            if state is not None:
-                prob = beta[d, t_idx]
-                x_final += prob * state['x'].reshape(7, 1)
-                mu_final += prob * state['modelProbabilities'].reshape(3, 1)
-        
-        for d, state in hypo_states.items():
-            if state is not None:
-                diff = state['x'].reshape(7, 1) - x_final
-                P_final += beta[d, t_idx] * (state['P'] + diff @ diff.T)
-
-        all_tracks[track_idx]['immState']['x'] = x_final
-        all_tracks[track_idx]['immState']['P'] = P_final
-        all_tracks[track_idx]['immState']['modelProbabilities'] = mu_final
-
-        for m in range(3):
-            x_m_final = np.zeros((7, 1))
-            P_m_final = np.zeros((7, 7))
-            
-            for d, state in hypo_states.items():
-                if state is not None:
-                    x_m_final += beta[d, t_idx] * state['models'][m]['x'].reshape(7, 1)
-            
-            for d, state in hypo_states.items():
-                if state is not None:
-                    diff_m = state['models'][m]['x'].reshape(7, 1) - x_m_final
-                    P_m_final += beta[d, t_idx] * (state['models'][m]['P'] + diff_m @ diff_m.T)
-
-            all_tracks[track_idx]['immState']['models'][m]['x'] = x_m_final
-            all_tracks[track_idx]['immState']['models'][m]['P'] = P_m_final
-        
-        miss_prob_threshold = 0.75
-        max_assoc_prob = np.max(beta[1:, t_idx]) if num_detections > 0 else 0
-        miss_flags[t_idx] = not (beta_i0 < miss_prob_threshold and max_assoc_prob > 0.1)
-
-        # --- THIS IS THE FIX ---
-        if not miss_flags[t_idx] and num_detections > 0:
-            most_likely_meas_idx = np.argmax(beta[1:, t_idx])
-            most_likely_measurement_indices[t_idx] = most_likely_meas_idx
-            
-            det_info = detected_cluster_info[most_likely_meas_idx]
-            detection_is_stationary = not det_info.get('isOutlierCluster', True)
-            if detection_is_stationary:
-                track['stationaryCount'] += 1
-            else:
-                track['stationaryCount'] -= 1
-        # --- END OF FIX ---
-        
-        if debug_mode:
-            logging.info(f'  [JPDA-DEBUG] Track {t_idx} (ID {track["id"]}) Miss Flag Check:')
-            logging.info(f'    - Beta_i0 (Miss Prob): {beta_i0:.4f}')
-            logging.info(f'    - Max Assoc Prob:      {max_assoc_prob:.4f}')
+    # Every gated (track, detection) pair with a non-negligible association
+    # probability is corrected from the track's prediction in one batch.
+    pair_tracks, pair_dets = np.nonzero((validation_matrix & (beta[1:] > 1e-9)).T)
+    if pair_tracks.size:
+        pair_rows = rows[pair_tracks]
+        x_models, P_models, mu_corr, x_corr, P_corr, _ = imm_correct_batch(
+            all_tracks.model_states[pair_rows], all_tracks.model_covariances[pair_rows],
+            all_tracks.model_probabilities[pair_rows], gating.z_polar[pair_dets], kf_measurement_noise
+        )
+    else:
+        x_models, P_models = np.empty((0, 3, 7)), np.empty((0, 3, 7, 7))
+        mu_corr, x_corr, P_corr = np.empty((0, 3)), np.empty((0, 7)), np.empty((0, 7, 7))
+
+    # Mixture reduction: every track's prediction (its miss hypothesis) and
+    # corrected pairs are weighted by beta, miss first, then by detection.
+    comp_tracks = np.concatenate((np.arange(num_active_tracks), pair_tracks))
+    order = np.argsort(comp_tracks, kind='stable')
+    comp_tracks = comp_tracks[order]
+    comp_weights = np.concatenate((beta[0], beta[pair_dets + 1, pair_tracks]))[order]
+    comp_x = np.concatenate((all_tracks.states[rows], x_corr))[order]
+    comp_P = np.concatenate((all_tracks.covariances[rows], P_corr))[order]
+    comp_mu = np.concatenate((all_tracks.model_probabilities[rows], mu_corr))[order]
+    comp_x_models = np.concatenate((all_tracks.model_states[rows], x_models))[order]
+    comp_P_models = np.concatenate((all_tracks.model_covariances[rows], P_models))[order]
+
+    x_final = np.zeros((num_active_tracks, 7))
+    mu_final = np.zeros((num_active_tracks, 3))
+    x_m_final = np.zeros((num_active_tracks, 3, 7))
+    np.add.at(x_final, comp_tracks, comp_weights[:, np.newaxis] * comp_x)
+    np.add.at(mu_final, comp_tracks, comp_weights[:, np.newaxis] * comp_mu)
+    np.add.at(x_m_final, comp_tracks, comp_weights[:, np.newaxis, np.newaxis] * comp_x_models)
+
+    diff = comp_x - x_final[comp_tracks]
+    diff_m = comp_x_models - x_m_final[comp_tracks]
+    P_final = np.zeros((num_active_tracks, 7, 7))
+    P_m_final = np.zeros((num_active_tracks, 3, 7, 7))
+    np.add.at(P_final, comp_tracks,
+              comp_weights[:, np.newaxis, np.newaxis] * (comp_P + np.einsum('ki,kj->kij', diff, diff)))
+    np.add.at(P_m_final, comp_tracks,
+              comp_weights[:, np.newaxis, np.newaxis, np.newaxis] * (comp_P_models + np.einsum('kmi,kmj->kmij', diff_m, diff_m)))
+
+    all_tracks.states[rows] = x_final
+    all_tracks.covariances[rows] = P_final
+    all_tracks.model_probabilities[rows] = mu_final
+    all_tracks.mu_is_column[rows] = True
+    all_tracks.model_states[rows] = x_m_final
+    all_tracks.model_covariances[rows] = P_m_final
+
+    miss_prob_threshold = 0.75
+    max_assoc_probs = np.max(beta[1:], axis=0) if num_detections > 0 else np.zeros(num_active_tracks)
+    miss_flags = ~((beta[0] < miss_prob_threshold) & (max_assoc_probs > 0.1))
+
+    for t_idx in np.flatnonzero(~miss_flags):
+        most_likely_meas_idx = np.argmax(beta[1:, t_idx])
+        most_likely_measurement_indices[t_idx] = most_likely_meas_idx
+
+        track = all_tracks[active_track_indices[t_idx]]
+        det_info = detected_cluster_info[most_likely_meas_idx]
+        detection_is_stationary = not det_info.get('isOutlierCluster', True)
+        if detection_is_stationary:
+            track['stationaryCount'] += 1
+        else:
+            track['stationaryCount'] -= 1
+
+    if debug_mode:
+        for t_idx, track_idx in enumerate(active_track_indices):
+            logging.info(f'  [JPDA-DEBUG] Track {t_idx} (ID {all_tracks[track_idx]["id"]}) Miss Flag Check:')
+            logging.info(f'    - Beta_i0 (Miss Prob): {beta[0, t_idx]:.4f}')
+            logging.info(f'    - Max Assoc Prob:      {max_assoc_probs[t_idx]:.4f}')
             logging.info(f'    - Is Miss?             {miss_flags[t_idx]}')
-        
-    return all_tracks, miss_flags, validation_matrix, beta, most_likely_measurement_indices
\ No newline at end of file
+
+    return all_tracks, miss_flags, validation_matrix, beta, most_likely_measurement_indices
@@ -2,53 +2,47 @@
 
 import numpy as np
 import logging
+from .gating_engine import GatingEngine
+from .assignment_solver import solve_assignment
 from ..utils.categorize_ttc import categorize_ttc
 
 def reassign_lost_tracks(
     current_frame_idx, detected_centroids, detected_cluster_info, all_tracks,
     assigned_detections_flags, imm_params, reassignment_params, collision_radius,
-    params
+    params, gating=None
 ):
     """
     Reassigns lost tracks to unassigned detections by re-initializing them
-    with a fresh IMM state.
+    with a fresh IMM state. Candidate pairs come from the spatial pre-gate of
+    'gating', the frame's GatingEngine (built from the detections if omitted),
+    and are assigned by solve_assignment on their distances.
     """
     debug_mode = params.get('debug_mode', False)
-    lost_track_indices = [i for i, tr in enumerate(all_tracks) if tr.get('isLost')]
+    lost_track_indices = np.array(all_tracks.lost_indices, dtype=int)
     unassigned_detections_indices = np.where(~assigned_detections_flags)[0]
 
-    eligible_lost_track_indices = [
-        idx for idx in lost_track_indices 
-        if (current_frame_idx - all_tracks[idx].get('lastSeenFrame', -1)) <= reassignment_params['maxFramesLostForReassignment']
-    ]
+    is_recent = (current_frame_idx - all_tracks.last_seen_frames[lost_track_indices]) <= reassignment_params['maxFramesLostForReassignment']
+    eligible_lost_track_indices = lost_track_indices[is_recent].tolist()
 
     if not unassigned_detections_indices.size or not eligible_lost_track_indices:
         return all_tracks, assigned_detections_flags
 
+    if gating is None:
+        gating = GatingEngine(detected_centroids, detected_cluster_info, params['kf_measurement_noise'])
     num_dets = len(unassigned_detections_indices)
     num_tracks = len(eligible_lost_track_indices)
     cost_matrix = np.full((num_dets, num_tracks), np.inf)
+    pair_dets, pair_tracks, distances = gating.find_candidate_pairs(
+        all_tracks.last_positions[eligible_lost_track_indices],
+        reassignment_params['reassignmentDistanceThreshold'], unassigned_detections_indices
+    )
+    cost_matrix[np.searchsorted(unassigned_detections_indices, pair_dets), pair_tracks] = distances
 
-    for i, det_idx in enumerate(unassigned_detections_indices):
-        det_pos = detected_centroids[det_idx]
-        for j, track_idx in enumerate(eligible_lost_track_indices):
-            track = all_tracks[track_idx]
-            dist = np.linalg.norm(det_pos - track['lastKnownPosition'])
-            if dist <= reassignment_params['reassignmentDistanceThreshold']:
-                cost_matrix[i, j] = dist
+    det_list_indices, track_list_indices = solve_assignment(
+        cost_matrix, params['assignment_params'].get('assignmentMethod', 'optimal'))
+    reassignments = [(eligible_lost_track_indices[track_list_idx], unassigned_detections_indices[det_list_idx])
+                     for det_list_idx, track_list_idx in zip(det_list_indices, track_list_indices)]
 
-    reassignments = []
-    temp_cost_matrix = cost_matrix.copy()
-    while np.any(np.isfinite(temp_cost_matrix)):
-        min_val = np.min(temp_cost_matrix)
-        if np.isinf(min_val): break
-        det_list_idx, track_list_idx = np.unravel_index(np.argmin(temp_cost_matrix), temp_cost_matrix.shape)
-        original_detection_idx = unassigned_detections_indices[det_list_idx]
-        original_lost_track_idx = eligible_lost_track_indices[track_list_idx]
-        reassignments.append((original_lost_track_idx, original_detection_idx))
-        temp_cost_matrix[det_list_idx, :] = np.inf
-        temp_cost_matrix[:, track_list_idx] = np.inf
-    
     if debug_mode and reassignments:
         logging.info(f'[REASSIGN] Made {len(reassignments)} reassignments.')
 
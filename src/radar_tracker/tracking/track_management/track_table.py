@@ -0,0 +1,363 @@
+# src/track_management/track_table.py
+
+from collections.abc import MutableMapping
+import numpy as np
+
+NUM_MODELS = 3
+STATE_DIM = 7
+
+# Integer and float per-track fields stored in one array each.
+_INT_FIELDS = ('id', 'age', 'hits', 'misses', 'lastSeenFrame', 'stationaryCount')
+_FLOAT_FIELDS = ('ttc',)
+_FLAG_FIELDS = ('isConfirmed', 'isLost')
+# Python objects that the lifecycle code appends to in place.
+_OBJECT_FIELDS = ('trajectory', 'ttcCategory', 'detectionHistory', 'historyLog')
+# The key order of a track dictionary as assign_new_tracks creates it.
+_TRACK_KEYS = ('id', 'immState', 'lastKnownPosition', 'age', 'hits', 'misses', 'trajectory',
+               'isLost', 'isConfirmed', 'ttc', 'ttcCategory', 'detectionHistory', 'lastSeenFrame',
+               'stationaryCount', 'historyLog')
+_IMM_KEYS = ('modelProbabilities', 'models', 'x', 'P')
+
+
+class TrackTable:
+    """
+    Stores all tracks as a struct of arrays.
+
+    Per-track state lives in contiguous arrays indexed by the track's row:
+    ids, counters, status flags, the last known position, the TTC, and the
+    IMM state, with the per-model states and covariances as (N, 3, 7) and
+    (N, 3, 7, 7) arrays next to the fused state, covariance and model
+    probabilities. Rows are appended and never removed, like the list of
+    track dictionaries this replaces, so a track's row is its index.
+
+    The confirmed, tentative and lost index sets are updated whenever a
+    status flag changes, so splitting the tracks by status does not scan them.
+
+    Indexing or iterating yields TrackView objects that behave like the old
+    track dictionaries, so the lifecycle, export and history code keeps
+    working on 'track[key]'. Array values read through a view are copies;
+    writes go to the table. to_dicts() returns plain dictionaries.
+    """
+    def __init__(self, initial_capacity=64):
+        self._size = 0
+        self._capacity = 0
+        self._confirmed, self._tentative, self._lost = set(), set(), set()
+        self._objects = []
+        self._resize(max(initial_capacity, 1))
+
+    def _resize(self, capacity):
+        def grow(array, shape, dtype):
+            new_array = np.zeros((capacity,) + shape, dtype=dtype)
+            if array is not None:
+                new_array[:self._size] = array[:self._size]
+            return new_array
+        previous = self.__dict__ if self._capacity else {}
+        for name in _INT_FIELDS:
+            setattr(self, '_' + name, grow(previous.get('_' + name), (), np.int64))
+        self._ttc = grow(previous.get('_ttc'), (), float)
+        self._isConfirmed = grow(previous.get('_isConfirmed'), (), bool)
+        self._isLost = grow(previous.get('_isLost'), (), bool)
+        self._last_position = grow(previous.get('_last_position'), (2,), float)
+        self._model_states = grow(previous.get('_model_states'), (NUM_MODELS, STATE_DIM), float)
+        self._model_covariances = grow(previous.get('_model_covariances'), (NUM_MODELS, STATE_DIM, STATE_DIM), float)
+        self._states = grow(previous.get('_states'), (STATE_DIM,), float)
+        self._covariances = grow(previous.get('_covariances'), (STATE_DIM, STATE_DIM), float)
+        self._model_probabilities = grow(previous.get('_model_probabilities'), (NUM_MODELS,), float)
+        # Model probabilities are (3,) until the first correction and (3, 1) after it;
+        # the IMM mixing step depends on that shape, so it is kept per track.
+        self._mu_is_column = grow(previous.get('_mu_is_column'), (), bool)
+        self._capacity = capacity
+
+    # --- Container interface (as the list of track dictionaries) ---
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, row):
+        if row < 0:
+            row += self._size
+        if not 0 <= row < self._size:
+            raise IndexError(f"track row {row} out of range")
+        return TrackView(self, row)
+
+    def __iter__(self):
+        return (TrackView(self, row) for row in range(self._size))
+
+    def append(self, track):
+        """Adds a track given as a dictionary (as assign_new_tracks builds it)."""
+        if self._size == self._capacity:
+            self._resize(2 * self._capacity)
+        row = self._size
+        self._size += 1
+        self._objects.append({'trajectory': [], 'ttcCategory': None, 'detectionHistory': [], 'historyLog': []})
+        self._isConfirmed[row] = False
+        self._isLost[row] = False
+        self._tentative.add(row)
+        view = TrackView(self, row)
+        for key, value in track.items():
+            view[key] = value
+        return view
+
+    # --- Status index sets ---
+    @property
+    def confirmed_indices(self):
+        """Rows of the confirmed tracks that are not lost, ascending."""
+        return sorted(self._confirmed)
+
+    @property
+    def tentative_indices(self):
+        """Rows of the tracks that are neither confirmed nor lost, ascending."""
+        return sorted(self._tentative)
+
+    @property
+    def lost_indices(self):
+        """Rows of the lost tracks, ascending."""
+        return sorted(self._lost)
+
+    @property
+    def num_confirmed(self):
+        return len(self._confirmed)
+
+    def _set_flag(self, row, name, value):
+        getattr(self, '_' + name)[row] = bool(value)
+        for index_set in (self._confirmed, self._tentative, self._lost):
+            index_set.discard(row)
+        if self._isLost[row]:
+            self._lost.add(row)
+        elif self._isConfirmed[row]:
+            self._confirmed.add(row)
+        else:
+            self._tentative.add(row)
+
+    # --- Array access for batched stages ---
+    @property
+    def ids(self):
+        return self._id[:self._size]
+
+    @property
+    def last_seen_frames(self):
+        return self._lastSeenFrame[:self._size]
+
+    @property
+    def last_positions(self):
+        return self._last_position[:self._size]
+
+    @property
+    def states(self):
+        """Fused IMM states, (N, 7)."""
+        return self._states[:self._size]
+
+    @property
+    def covariances(self):
+        """Fused IMM covariances, (N, 7, 7)."""
+        return self._covariances[:self._size]
+
+    @property
+    def model_states(self):
+        """Per-model IMM states, (N, 3, 7)."""
+        return self._model_states[:self._size]
+
+    @property
+    def model_covariances(self):
+        """Per-model IMM covariances, (N, 3, 7, 7)."""
+        return self._model_covariances[:self._size]
+
+    @property
+    def model_probabilities(self):
+        """IMM model probabilities, (N, 3)."""
+        return self._model_probabilities[:self._size]
+
+    @property
+    def mu_is_column(self):
+        """Flags of the tracks whose model probabilities are (3, 1) columns, (N,)."""
+        return self._mu_is_column[:self._size]
+
+    # --- IMM state ---
+    def get_imm_state(self, row):
+        """The IMM state of a track as a plain dictionary of array copies."""
+        mu = self._model_probabilities[row].copy()
+        return {
+            'modelProbabilities': mu.reshape(NUM_MODELS, 1) if self._mu_is_column[row] else mu,
+            'models': [{'x': self._model_states[row, m].reshape(STATE_DIM, 1).copy(),
+                        'P': self._model_covariances[row, m].copy()} for m in range(NUM_MODELS)],
+            'x': self._states[row].reshape(STATE_DIM, 1).copy(),
+            'P': self._covariances[row].copy(),
+        }
+
+    def set_imm_state(self, row, imm_state):
+        """Stores an IMM state dictionary (as imm_predict/imm_correct return it)."""
+        # Read all values before writing, as 'imm_state' may hold views of this row.
+        models = [(np.asarray(model['x']).reshape(STATE_DIM), np.asarray(model['P']))
+                  for model in imm_state['models']]
+        x, P = np.asarray(imm_state['x']).reshape(STATE_DIM), np.asarray(imm_state['P'])
+        mu = np.asarray(imm_state['modelProbabilities'])
+        for m, (model_x, model_P) in enumerate(models):
+            self._model_states[row, m] = model_x
+            self._model_covariances[row, m] = model_P
+        self._states[row] = x
+        self._covariances[row] = P
+        self._set_model_probabilities(row, mu)
+
+    def _set_model_probabilities(self, row, mu):
+        self._model_probabilities[row] = np.ravel(mu)
+        self._mu_is_column[row] = np.ndim(mu) == 2
+
+    # --- Export ---
+    def to_dicts(self):
+        """All tracks as plain dictionaries, for export and history code."""
+        return [view.to_dict() for view in self]
+
+
+class TrackView(MutableMapping):
+    """A dictionary-like view of one row of a TrackTable."""
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    @property
+    def row(self):
+        return self._row
+
+    def __getitem__(self, key):
+        table, row = self._table, self._row
+        if key in _INT_FIELDS:
+            return int(getattr(table, '_' + key)[row])
+        if key in _FLAG_FIELDS:
+            return bool(getattr(table, '_' + key)[row])
+        if key == 'ttc':
+            return float(table._ttc[row])
+        if key == 'lastKnownPosition':
+            return table._last_position[row].copy()
+        if key == 'immState':
+            return ImmStateView(table, row)
+        return table._objects[row][key]
+
+    def __setitem__(self, key, value):
+        table, row = self._table, self._row
+        if key in _INT_FIELDS or key in _FLOAT_FIELDS:
+            getattr(table, '_' + key)[row] = np.asarray(value).item()
+        elif key in _FLAG_FIELDS:
+            table._set_flag(row, key, value)
+        elif key == 'lastKnownPosition':
+            table._last_position[row] = np.ravel(value)
+        elif key == 'immState':
+            table.set_imm_state(row, value)
+        else:
+            table._objects[row][key] = value
+
+    def __delitem__(self, key):
+        if key in _OBJECT_FIELDS or key not in self._table._objects[self._row]:
+            raise KeyError(f"track field '{key}' cannot be removed")
+        del self._table._objects[self._row][key]
+
+    def __iter__(self):
+        yield from _TRACK_KEYS
+        yield from (key for key in self._table._objects[self._row] if key not in _OBJECT_FIELDS)
+
+    def __len__(self):
+        return len(_TRACK_KEYS) + sum(1 for key in self._table._objects[self._row] if key not in _OBJECT_FIELDS)
+
+    def to_dict(self):
+        track = {key: self[key] for key in self}
+        track['immState'] = self._table.get_imm_state(self._row)
+        return track
+
+    def __repr__(self):
+        return f"TrackView(row={self._row}, id={self['id']})"
+
+
+class ImmStateView(MutableMapping):
+    """
+    A dictionary-like view of a track's IMM state. 'x', 'P' and
+    'modelProbabilities' read as copies; 'models' reads as a list of per-model
+    views whose 'x'/'P' writes go to the table. copy() and deepcopy() return
+    plain dictionaries, as they did for the dictionary state.
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        self._table = table
+        self._row = row
+
+    def __getitem__(self, key):
+        table, row = self._table, self._row
+        if key == 'x':
+            return table._states[row].reshape(STATE_DIM, 1).copy()
+        if key == 'P':
+            return table._covariances[row].copy()
+        if key == 'modelProbabilities':
+            mu = table._model_probabilities[row].copy()
+            return mu.reshape(NUM_MODELS, 1) if table._mu_is_column[row] else mu
+        if key == 'models':
+            return [ModelStateView(table, row, m) for m in range(NUM_MODELS)]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        table, row = self._table, self._row
+        if key == 'x':
+            table._states[row] = np.asarray(value).reshape(STATE_DIM)
+        elif key == 'P':
+            table._covariances[row] = value
+        elif key == 'modelProbabilities':
+            table._set_model_probabilities(row, value)
+        elif key == 'models':
+            for m, model in enumerate(value):
+                model_x, model_P = np.asarray(model['x']).reshape(STATE_DIM), np.asarray(model['P'])
+                table._model_states[row, m] = model_x
+                table._model_covariances[row, m] = model_P
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise KeyError(f"IMM state field '{key}' cannot be removed")
+
+    def __iter__(self):
+        return iter(_IMM_KEYS)
+
+    def __len__(self):
+        return len(_IMM_KEYS)
+
+    def copy(self):
+        """A shallow copy: a plain dictionary whose 'models' still write to the table."""
+        return {key: self[key] for key in _IMM_KEYS}
+
+    def __deepcopy__(self, memo):
+        return self._table.get_imm_state(self._row)
+
+
+class ModelStateView(MutableMapping):
+    """A dictionary-like view of one IMM model's 'x' (7, 1) and 'P' (7, 7)."""
+    __slots__ = ('_table', '_row', '_model')
+
+    def __init__(self, table, row, model):
+        self._table = table
+        self._row = row
+        self._model = model
+
+    def __getitem__(self, key):
+        if key == 'x':
+            return self._table._model_states[self._row, self._model].reshape(STATE_DIM, 1).copy()
+        if key == 'P':
+            return self._table._model_covariances[self._row, self._model].copy()
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'x':
+            self._table._model_states[self._row, self._model] = np.asarray(value).reshape(STATE_DIM)
+        elif key == 'P':
+            self._table._model_covariances[self._row, self._model] = value
+        else:
+            raise KeyError(key)
+
+    def __delitem__(self, key):
+        raise KeyError(f"model state field '{key}' cannot be removed")
+
+    def __iter__(self):
+        return iter(('x', 'P'))
+
+    def __len__(self):
+        return 2
+
+    def __deepcopy__(self, memo):
+        return {'x': self['x'], 'P': self['P']}
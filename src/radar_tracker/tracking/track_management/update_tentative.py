@@ -2,19 +2,22 @@
 
 import numpy as np
 import logging
-from copy import deepcopy
-from ..filters.imm_filter import imm_correct
+from ..filters.imm_filter import imm_correct_batch
+from .gating_engine import GatingEngine
+from .assignment_solver import solve_assignment
 from ..utils.categorize_ttc import categorize_ttc
 from ..utils.calculate_ellipse_radii import calculate_ellipse_radii
 
 def update_tentative_tracks(
     current_frame_idx, detected_centroids, detected_cluster_info, all_tracks,
     tentative_track_indices, assigned_detections_flags, kf_measurement_noise,
-    assignment_threshold, lifecycle_params, ttc_params, params
+    assignment_threshold, lifecycle_params, ttc_params, params, gating=None
 ):
     """
-    Updates tentative tracks using greedy assignment, M-out-of-N confirmation logic,
+    Updates tentative tracks using gated assignment (optimal or greedy, per
+    'assignmentMethod' in params['assignment_params']), M-out-of-N confirmation logic,
     and now performs detailed history logging for each update.
+    'gating' is the frame's GatingEngine (built from the detections if omitted).
     """
     debug_mode = params.get('debug_mode', False)
     confirmation_m = lifecycle_params['confirmation_M']
@@ -31,68 +34,44 @@ def update_tentative_tracks(
             logging.info('[TENTATIVE] Exiting: No available detections for tentative tracks.')
         return all_tracks, assigned_detections_flags, assigned_tentative_tracks_flags
 
-    # --- Cost Matrix and Greedy Assignment (Logic Unchanged) ---
-    num_dets = len(unassigned_detections_indices)
-    cost_matrix = np.full((num_dets, num_tentative_tracks), np.inf)
+    # --- Cost Matrix (Mahalanobis distances of all pairs) and Assignment ---
+    if gating is None:
+        gating = GatingEngine(detected_centroids, detected_cluster_info, kf_measurement_noise)
+    rows = np.asarray(tentative_track_indices)
+    cost_matrix = gating.gate(all_tracks.states[rows], all_tracks.covariances[rows],
+                              unassigned_detections_indices)['mahalanobisSq']
+    cost_matrix[cost_matrix > assignment_threshold**2] = np.inf
 
-    for j, track_idx in enumerate(tentative_track_indices):
-        track = all_tracks[track_idx]
-        x_pred, P_pred = track['immState']['x'], track['immState']['P']
-        px, py, vx, vy = x_pred[0:4].flatten()
-        r = np.linalg.norm([px, py])
-        if r < 1e-6: continue
-        
-        h_x = np.array([r, np.arctan2(px, py), (px*vx + py*vy)/r]).reshape(3,1)
-        r_sq, r_cub = r**2, r**3
-        H = np.zeros((3, 7))
-        H[0, 0]=px/r; H[0, 1]=py/r
-        H[1, 0]=py/r_sq; H[1, 1]=-px/r_sq
-        H[2, 0]=(vx/r)-(px*(px*vx+py*vy))/r_cub; H[2, 1]=(vy/r)-(py*(px*vx+py*vy))/r_cub
-        H[2, 2]=px/r; H[2, 3]=py/r
-        
-        S = H @ P_pred @ H.T + kf_measurement_noise
-        
-        for i, det_idx in enumerate(unassigned_detections_indices):
-            det_pos = detected_centroids[det_idx]
-            z = np.array([np.linalg.norm(det_pos), np.arctan2(det_pos[0], det_pos[1]), 
-                          detected_cluster_info[det_idx]['radialSpeed']]).reshape(3, 1)
-            y = z - h_x
-            y[1] = (y[1] + np.pi) % (2 * np.pi) - np.pi
-            try:
-                cost = y.T @ np.linalg.inv(S) @ y
-                if cost <= assignment_threshold**2:
-                    cost_matrix[i, j] = cost
-            except np.linalg.LinAlgError:
-                continue
-    
-    assignments = []
-    temp_cost_matrix = cost_matrix.copy()
-    while np.any(np.isfinite(temp_cost_matrix)):
-        min_val = np.min(temp_cost_matrix)
-        if np.isinf(min_val): break
-        det_list_idx, track_list_idx = np.unravel_index(np.argmin(temp_cost_matrix), temp_cost_matrix.shape)
-        original_detection_idx = unassigned_detections_indices[det_list_idx]
-        original_track_idx = tentative_track_indices[track_list_idx]
-        assignments.append((original_track_idx, original_detection_idx, track_list_idx))
-        temp_cost_matrix[det_list_idx, :] = np.inf
-        temp_cost_matrix[:, track_list_idx] = np.inf
+    det_list_indices, track_list_indices = solve_assignment(
+        cost_matrix, params['assignment_params'].get('assignmentMethod', 'optimal'))
+    assignments = [(tentative_track_indices[track_list_idx], unassigned_detections_indices[det_list_idx], track_list_idx)
+                   for det_list_idx, track_list_idx in zip(det_list_indices, track_list_indices)]
 
     if debug_mode and assignments:
         logging.info(f'[TENTATIVE] Found {len(assignments)} valid assignments.')
     
+    # --- Correct all assigned tracks in one batch ---
+    if assignments:
+        assigned_rows = np.array([track_idx for track_idx, _, _ in assignments])
+        det_indices = np.array([detection_idx for _, detection_idx, _ in assignments])
+        predicted_states = all_tracks.states[assigned_rows].copy() # Pre-update states for logging
+        (all_tracks.model_states[assigned_rows], all_tracks.model_covariances[assigned_rows], all_tracks.model_probabilities[assigned_rows],
+         all_tracks.states[assigned_rows], all_tracks.covariances[assigned_rows], _) = imm_correct_batch(
+            all_tracks.model_states[assigned_rows], all_tracks.model_covariances[assigned_rows], all_tracks.model_probabilities[assigned_rows],
+            gating.z_polar[det_indices], kf_measurement_noise
+        )
+        all_tracks.mu_is_column[assigned_rows] = True # imm_correct returns (3, 1) probabilities
+
     # --- Update Assigned Tracks ---
-    for track_idx, detection_idx, track_list_idx in assignments:
+    for assignment_idx, (track_idx, detection_idx, track_list_idx) in enumerate(assignments):
         track = all_tracks[track_idx]
         det_pos = detected_centroids[detection_idx]
         det_info = detected_cluster_info[detection_idx]
         assigned_tentative_tracks_flags[track_list_idx] = True
         assigned_detections_flags[detection_idx] = True
 
-        predicted_state_for_log = deepcopy(track['immState'])
+        predicted_state_for_log = predicted_states[assignment_idx]
 
-        measurement_z = np.array([np.linalg.norm(det_pos), np.arctan2(det_pos[0], det_pos[1]), det_info['radialSpeed']]).reshape(3, 1)
-        track['immState'] = imm_correct(track['immState'], measurement_z, kf_measurement_noise)
-        
         track['detectionHistory'].append(True)
         if len(track['detectionHistory']) > confirmation_n:
             track['detectionHistory'].pop(0)
@@ -138,8 +117,8 @@ def update_tentative_tracks(
 
         log_entry = {
             'frameIdx': current_frame_idx,
-            'predictedPosition': predicted_state_for_log['x'][0:2].flatten(),
-            'predictedVelocity': predicted_state_for_log['x'][2:4].flatten(),
+            'predictedPosition': predicted_state_for_log[0:2],
+            'predictedVelocity': predicted_state_for_log[2:4],
             'correctedPosition': corrected_state_comb[0:2].flatten(),
             'correctedVelocity': corrected_state_comb[2:4].flatten(),
             'modelProbabilities': track['immState']['modelProbabilities'].flatten(),
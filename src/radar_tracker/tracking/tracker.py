@@ -11,17 +11,34 @@ from .algorithms.estimate_ego_motion import estimate_ego_motion
 from .algorithms.classify_vehicle_motion import classify_vehicle_motion
 from .algorithms.detect_side_barrier import detect_side_barrier
 from .algorithms.my_dbscan import my_dbscan
+from .algorithms.track_guided_clustering import predict_track_gates, track_guided_dbscan
 from .algorithms.detect_and_filter_reflections import detect_and_filter_reflections # <--- ADDED
-from .utils.slot_points_to_grid import slot_points_to_grid
+from .algorithms.prefilter_point_cloud import prefilter_point_cloud
+from .utils.slot_points_to_grid import SpatialGrid
+from .utils.compute_cluster_features import compute_cluster_features
+from .track_management.track_table import TrackTable
+
+def _in_box(x, y, box):
+    """Element-wise test whether (x, y) lies inside a {'X_RANGE', 'Y_RANGE'} box (edges included)."""
+    return (box['X_RANGE'][0] <= x) & (x <= box['X_RANGE'][1]) & (box['Y_RANGE'][0] <= y) & (y <= box['Y_RANGE'][1])
 
 class RadarTracker:
     def __init__(self, params):
         """Initializes the tracker's state."""
         self.params = params
-        self.all_tracks = []
+        self.all_tracks = TrackTable()
         self.next_track_id = 1
         self.frame_idx = 0
         self.last_timestamp_ms = 0.0
+        self.spatial_grid = SpatialGrid(self.params['grid_config'])
+        self.residual_grid = SpatialGrid(self.params['grid_config'])
+        self.clustering_stats = {'fastPathPoints': 0, 'dbscanPoints': 0, 'trackSeededClusters': 0}
+        self.ransac_stats = {'frames': 0, 'evaluations': 0, 'maxEvaluations': 0, 'seedAccepted': 0, 'timedOut': 0}
+        self.gating_stats = {'frames': 0, 'candidatePairs': 0, 'totalPairs': 0, 'maxCandidatePairs': 0}
+        self.jpda_stats = {'frames': 0, 'clusters': 0, 'hypotheses': 0, 'maxHypotheses': 0, 'approximatedFrames': 0}
+        # Seeded from the parameters so that replays of the same capture give the same tracks.
+        self.ransac_rng = np.random.default_rng(self.params['ego_motion_params'].get('ransacSeed'))
+        self.point_dtype = np.dtype(self.params.get('compute_params', {}).get('pointCloudDtype', np.float64))
 
         # Initialize filter states
         self.ego_kf_state = {
@@ -84,7 +101,32 @@ class RadarTracker:
         
         cartesian_pos_data = current_frame.posLocal
         point_cloud = current_frame.pointCloud
-        num_points = cartesian_pos_data.shape[1]
+        if point_cloud.dtype != self.point_dtype:
+            # Frames that were not adapted in the compute dtype (e.g. from a .mat file).
+            # Only the working copies are cast; the history frame keeps its points.
+            point_cloud = point_cloud.astype(self.point_dtype)
+            cartesian_pos_data = cartesian_pos_data.astype(self.point_dtype)
+        total_points = cartesian_pos_data.shape[1]
+
+        # --- Point Cloud Pre-filter ---
+        # The stages below run on the kept points only. 'kept_indices' maps them
+        # back to the frame's points for isOutlier, dbscanClusters and grid_map.
+        prefilter_params = self.params.get('prefilter_params', {})
+        if prefilter_params.get('enabled', False) and total_points > 0:
+            kept_indices = prefilter_point_cloud(point_cloud, prefilter_params, self.params['grid_config'])
+        else:
+            kept_indices = np.arange(total_points)
+        is_prefiltered = kept_indices.size < total_points
+        # Dropped points keep isOutlier False; this mask tells exporters they were never classified.
+        current_frame.isPrefiltered = np.ones(total_points, dtype=bool)
+        current_frame.isPrefiltered[kept_indices] = False
+        if is_prefiltered:
+            cartesian_pos_data = cartesian_pos_data[:, kept_indices]
+            point_cloud = point_cloud[:, kept_indices]
+        num_points = kept_indices.size
+        is_outlier = np.zeros(num_points, dtype=bool)
+        if config.COMPONENT_DEBUG_FLAGS.get('tracker_core'):
+            logger.debug(f"[TRACKER_CORE] Pre-filter kept {num_points} of {total_points} points.")
 
         # --- Pre-processing Block (Motion Classification, Ego-Motion, Barriers) ---
         current_time_s = current_frame.timestamp / 1000.0
@@ -98,21 +140,32 @@ class RadarTracker:
         if config.COMPONENT_DEBUG_FLAGS.get('tracker_core'):
             logger.debug(f"[TRACKER_CORE] Motion State: {motion_state}")
 
+        ransac_frame_stats = {}
         (self.ego_kf_state, self.filtered_vx_ego_iir, self.filtered_vy_ego_iir,
          ransac_vx, ransac_vy, _, ax_dynamics, outlier_indices) = estimate_ego_motion(
              cartesian_pos_data.T, point_cloud[3, :] if num_points > 0 else np.array([]),
              can_speed, can_torque, can_gear, can_grade, imu_ax, imu_ay, imu_omega,
              np.deg2rad(can_grade), 0.0, self.ego_kf_state,
              self.filtered_vx_ego_iir, self.filtered_vy_ego_iir, delta_t,
-             self.params['vehicle_params'], self.params['ego_motion_params'], self.original_ego_kf_r
+             self.params['vehicle_params'], self.params['ego_motion_params'], self.original_ego_kf_r,
+             rng=self.ransac_rng, ransac_stats=ransac_frame_stats
          )
+        if ransac_frame_stats:
+            current_frame.ransacIterations = ransac_frame_stats['evaluations']
+            self.ransac_stats['frames'] += 1
+            self.ransac_stats['evaluations'] += ransac_frame_stats['evaluations']
+            self.ransac_stats['maxEvaluations'] = max(self.ransac_stats['maxEvaluations'], ransac_frame_stats['evaluations'])
+            self.ransac_stats['seedAccepted'] += ransac_frame_stats['seedAccepted']
+            self.ransac_stats['timedOut'] += ransac_frame_stats['timedOut']
         
         # --- THIS IS THE FIX (PART 2) ---
         # Save the calculated acceleration back to the frame for logging.
         current_frame.estimatedAcceleration_mps2 = ax_dynamics
         # --- END OF FIX (PART 2) ---
 
-        if outlier_indices.size > 0: current_frame.isOutlier[outlier_indices] = True
+        if outlier_indices.size > 0:
+            is_outlier[outlier_indices] = True
+            current_frame.isOutlier[kept_indices[outlier_indices]] = True
         # The egoVx value is now populated from the CAN signal in the data_adapter.
         # The ego-motion estimator uses the CAN speed as a primary input, but we
         # preserve the original CAN value in the final history. We only take the
@@ -145,81 +198,78 @@ class RadarTracker:
         if config.COMPONENT_DEBUG_FLAGS.get('tracker_core'):
             logger.debug(f"[TRACKER_CORE] Number of points for clustering: {num_points}")
         if num_points >= self.params['dbscan_params']['min_pts']:
-            grid_map, point_to_grid_idx = slot_points_to_grid(cartesian_pos_data, self.params['grid_config'])
-            current_frame.grid_map = grid_map
+            # The grid's buffers are reused every frame; the history keeps a snapshot.
+            spatial_grid = self.spatial_grid.build(cartesian_pos_data)
+            current_frame.grid_map = spatial_grid.snapshot(kept_indices if is_prefiltered else None)
             
-            dbscan_clusters = my_dbscan(cartesian_pos_data.T, point_cloud[3, :],
-                                         self.params['dbscan_params']['epsilon_pos'], 
-                                         self.params['dbscan_params']['epsilon_vel'], 
-                                         self.params['dbscan_params']['min_pts'], 
-                                         grid_map, point_to_grid_idx)
-            current_frame.dbscanClusters = dbscan_clusters
-            unique_ids = np.unique(dbscan_clusters)
-            unique_ids = unique_ids[unique_ids > 0]
+            dbscan_params = self.params['dbscan_params']
+            guided_params = self.params.get('track_guided_clustering_params', {})
+            if guided_params.get('enabled', False):
+                gate_centres, gate_radii, gate_radial_speeds = predict_track_gates(self.all_tracks, delta_t, guided_params)
+                dbscan_clusters, is_fast_path = track_guided_dbscan(
+                    cartesian_pos_data.T, point_cloud[3, :], gate_centres, gate_radii, gate_radial_speeds,
+                    guided_params['gateVelocity'], dbscan_params['epsilon_pos'], dbscan_params['epsilon_vel'],
+                    dbscan_params['min_pts'], spatial_grid, self.residual_grid
+                )
+                num_fast_path = int(np.count_nonzero(is_fast_path))
+                self.clustering_stats['trackSeededClusters'] += int(np.unique(dbscan_clusters[is_fast_path]).size)
+            else:
+                dbscan_clusters = my_dbscan(cartesian_pos_data.T, point_cloud[3, :],
+                                             dbscan_params['epsilon_pos'],
+                                             dbscan_params['epsilon_vel'],
+                                             dbscan_params['min_pts'],
+                                             spatial_grid)
+                num_fast_path = 0
+            self.clustering_stats['fastPathPoints'] += num_fast_path
+            self.clustering_stats['dbscanPoints'] += num_points - num_fast_path
+            if is_prefiltered:
+                current_frame.dbscanClusters = np.zeros(total_points, dtype=dbscan_clusters.dtype)
+                current_frame.dbscanClusters[kept_indices] = dbscan_clusters
+            else:
+                current_frame.dbscanClusters = dbscan_clusters
+
+            # --- Cluster Feature Table (one sorted pass over all clustered points) ---
+            cluster_table, _, _ = compute_cluster_features(dbscan_clusters, cartesian_pos_data, point_cloud, is_outlier)
+            num_clusters = cluster_table['clusterID'].size
             if config.COMPONENT_DEBUG_FLAGS.get('tracker_core'):
-                logger.debug(f"[TRACKER_CORE] DBSCAN found {len(unique_ids)} unique clusters.")
-
-            if unique_ids.size > 0:
-                # --- Refactored Cluster Processing (Restored Two-Loop Structure) ---
-
-                # --- Loop 1: Aggregate all cluster data first ---
-                all_cluster_info = []
-                for cid in unique_ids:
-                    cluster_indices = np.where(dbscan_clusters == cid)[0]
-                    centroid = np.mean(cartesian_pos_data[:, cluster_indices], axis=1)
-                    mean_radial_speed = np.mean(point_cloud[3, cluster_indices])
-                    all_cluster_info.append({
-                        'X': centroid[0], 'Y': centroid[1], 'radialSpeed': mean_radial_speed,
-                        'originalClusterID': cid
-                    })
+                logger.debug(f"[TRACKER_CORE] DBSCAN found {num_clusters} unique clusters.")
 
+            if num_clusters > 0:
                 # --- Reflection Filtering (operates on all clusters) ---
                 cluster_ids_to_remove = detect_and_filter_reflections(
-                    grid_map, all_cluster_info, dbscan_clusters, point_cloud,
+                    spatial_grid, cluster_table, dbscan_clusters,
                     self.params['reflection_detection_params']['speed_similarity_threshold_mps']
                 )
 
-                # --- Loop 2: Filter and select final clusters ---
-                temp_centroids, temp_cluster_info = [], []
-                stationary_speed_threshold = self.params['ego_motion_params']['stationarySpeedThreshold']
-
-                for info in all_cluster_info:
-                    if info['originalClusterID'] in cluster_ids_to_remove:
-                        continue
-
-                    cluster_indices = np.where(dbscan_clusters == info['originalClusterID'])[0]
-                    centroid = np.array([info['X'], info['Y']])
-                    
-                    if is_vehicle_moving:
-                        outlier_ratio = np.sum(current_frame.isOutlier[cluster_indices]) / len(cluster_indices)
-                        is_moving_cluster = outlier_ratio > self.params['cluster_filter_params']['min_outlierClusterRatio_thrs']
-                    else:
-                        is_moving_cluster = abs(info['radialSpeed']) > stationary_speed_threshold
-
-                    if dynamic_box is not None:
-                        is_in_dynamic_box = (dynamic_box['X_RANGE'][0] <= centroid[0] <= dynamic_box['X_RANGE'][1]) and \
-                                            (dynamic_box['Y_RANGE'][0] <= centroid[1] <= dynamic_box['Y_RANGE'][1])
-                        if not is_moving_cluster and is_in_dynamic_box:
-                            continue 
-                    
-                    is_in_static_box = (static_box['X_RANGE'][0] <= centroid[0] <= static_box['X_RANGE'][1]) and \
-                                       (static_box['Y_RANGE'][0] <= centroid[1] <= static_box['Y_RANGE'][1])
-                    
-                    is_stationary_in_box_flag = (not is_moving_cluster) and is_in_static_box
-                    
-                    azimuth_rad = np.arctan2(centroid[0], centroid[1])
-                    temp_centroids.append(centroid)
-                    temp_cluster_info.append({
-                        'X': centroid[0], 'Y': centroid[1], 'radialSpeed': info['radialSpeed'],
-                        'vx': info['radialSpeed'] * np.sin(azimuth_rad), 
-                        'vy': info['radialSpeed'] * np.cos(azimuth_rad),
-                        'isOutlierCluster': is_moving_cluster,
-                        'isStationary_inBox': is_stationary_in_box_flag
-                    })
-
-                if temp_centroids:
-                    detected_centroids = np.array(temp_centroids)
-                    detected_cluster_info = temp_cluster_info
+                # --- Filter and select final clusters ---
+                centroid_x, centroid_y = cluster_table['X'], cluster_table['Y']
+                keep = ~np.isin(cluster_table['clusterID'], cluster_ids_to_remove)
+
+                if is_vehicle_moving:
+                    is_moving_cluster = cluster_table['outlierRatio'] > self.params['cluster_filter_params']['min_outlierClusterRatio_thrs']
+                else:
+                    is_moving_cluster = np.abs(cluster_table['radialSpeed']) > self.params['ego_motion_params']['stationarySpeedThreshold']
+
+                if dynamic_box is not None:
+                    is_in_dynamic_box = _in_box(centroid_x, centroid_y, dynamic_box)
+                    keep &= is_moving_cluster | ~is_in_dynamic_box
+
+                is_stationary_in_box = ~is_moving_cluster & _in_box(centroid_x, centroid_y, static_box)
+                azimuth_rad = np.arctan2(centroid_x, centroid_y)
+                vx = cluster_table['radialSpeed'] * np.sin(azimuth_rad)
+                vy = cluster_table['radialSpeed'] * np.cos(azimuth_rad)
+
+                kept = np.flatnonzero(keep)
+                if kept.size > 0:
+                    detected_centroids = np.column_stack((centroid_x[kept], centroid_y[kept]))
+                    detected_cluster_info = [{
+                        'X': centroid_x[i], 'Y': centroid_y[i], 'radialSpeed': cluster_table['radialSpeed'][i],
+                        'vx': vx[i], 'vy': vy[i],
+                        'isOutlierCluster': bool(is_moving_cluster[i]),
+                        'isStationary_inBox': bool(is_stationary_in_box[i]),
+                        'numPoints': int(cluster_table['numPoints'][i]),
+                        'meanSnr': cluster_table['meanSnr'][i]
+                    } for i in kept]
 
 
         current_frame.detectedClusterInfo = np.array(detected_cluster_info, dtype=object) if detected_cluster_info else np.array([])
@@ -227,12 +277,62 @@ class RadarTracker:
         # --- Perform Tracking ---
         if config.COMPONENT_DEBUG_FLAGS.get('tracker_core'):
             logger.debug(f"[TRACKER_CORE] Performing track assignment. Detected centroids: {len(detected_centroids)}, Existing tracks: {len(self.all_tracks)}")
+        gating_frame_stats = {'candidatePairs': 0, 'totalPairs': 0}
+        jpda_frame_stats = {'clusters': 0, 'hypotheses': 0, 'approximatedClusters': 0}
         self.all_tracks, self.next_track_id, _, _ = perform_track_assignment_master(
             self.frame_idx, detected_centroids, detected_cluster_info,
-            self.all_tracks, self.next_track_id, delta_t, imu_omega, self.params
+            self.all_tracks, self.next_track_id, delta_t, imu_omega, self.params,
+            gating_stats=gating_frame_stats, jpda_stats=jpda_frame_stats
         )
+        current_frame.gatingCandidatePairs = gating_frame_stats['candidatePairs']
+        self.gating_stats['frames'] += 1
+        self.gating_stats['candidatePairs'] += gating_frame_stats['candidatePairs']
+        self.gating_stats['totalPairs'] += gating_frame_stats['totalPairs']
+        self.gating_stats['maxCandidatePairs'] = max(self.gating_stats['maxCandidatePairs'], gating_frame_stats['candidatePairs'])
+        current_frame.jpdaHypotheses = jpda_frame_stats['hypotheses']
+        current_frame.jpdaApproximatedClusters = jpda_frame_stats['approximatedClusters']
+        self.jpda_stats['frames'] += 1
+        self.jpda_stats['clusters'] += jpda_frame_stats['clusters']
+        self.jpda_stats['hypotheses'] += jpda_frame_stats['hypotheses']
+        self.jpda_stats['maxHypotheses'] = max(self.jpda_stats['maxHypotheses'], jpda_frame_stats['hypotheses'])
+        self.jpda_stats['approximatedFrames'] += jpda_frame_stats['approximatedClusters'] > 0
+        if jpda_frame_stats['approximatedClusters']:
+            logger.warning(f"[TRACKER_CORE] Frame {self.frame_idx}: {jpda_frame_stats['approximatedClusters']} JPDA cluster(s) "
+                           f"exceeded {self.params['jpda_params'].get('maxHypothesesPerCluster')} hypotheses; beam approximation used.")
         if config.COMPONENT_DEBUG_FLAGS.get('tracker_core'):
             logger.debug(f"[TRACKER_CORE] Track assignment complete. Total tracks: {len(self.all_tracks)}")
 
         self.frame_idx += 1
-        return self.all_tracks, current_frame
\ No newline at end of file
+        return self.all_tracks, current_frame
+
+    def clustering_summary(self):
+        """One-line totals of the points clustered on the track-guided fast path and by full DBSCAN."""
+        stats = self.clustering_stats
+        total = stats['fastPathPoints'] + stats['dbscanPoints']
+        fast_share = 100.0 * stats['fastPathPoints'] / total if total else 0.0
+        return (f"Clustering: fast path {stats['fastPathPoints']} pts ({fast_share:.0f}%), "
+                f"DBSCAN {stats['dbscanPoints']} pts, seeded clusters {stats['trackSeededClusters']}")
+
+    def ransac_summary(self):
+        """One-line totals of the RANSAC hypotheses scored per frame."""
+        stats = self.ransac_stats
+        mean_evaluations = stats['evaluations'] / stats['frames'] if stats['frames'] else 0.0
+        return (f"RANSAC: {stats['frames']} frames, {mean_evaluations:.1f} hypotheses/frame (max {stats['maxEvaluations']}), "
+                f"seed accepted {stats['seedAccepted']}, timed out {stats['timedOut']}")
+
+    def gating_summary(self):
+        """One-line totals of the (detection, track) pairs left by the spatial pre-gate."""
+        stats = self.gating_stats
+        mean_pairs = stats['candidatePairs'] / stats['frames'] if stats['frames'] else 0.0
+        kept_share = 100.0 * stats['candidatePairs'] / stats['totalPairs'] if stats['totalPairs'] else 0.0
+        return (f"Gating: {mean_pairs:.1f} candidate pairs/frame (max {stats['maxCandidatePairs']}), "
+                f"{kept_share:.0f}% of {stats['totalPairs']} pairs")
+
+    def jpda_summary(self):
+        """One-line totals of the JPDA clusters and hypotheses per frame."""
+        stats = self.jpda_stats
+        frames = stats['frames']
+        mean_clusters = stats['clusters'] / frames if frames else 0.0
+        mean_hypotheses = stats['hypotheses'] / frames if frames else 0.0
+        return (f"JPDA: {mean_clusters:.1f} clusters/frame, {mean_hypotheses:.1f} hypotheses/frame (max {stats['maxHypotheses']}), "
+                f"approximated in {stats['approximatedFrames']} frames")
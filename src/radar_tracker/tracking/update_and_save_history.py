@@ -6,6 +6,8 @@ from ..console_logger import logger
 import scipy.io as sio
 import config
 from .export_to_json import create_visualization_data
+from .utils.slot_points_to_grid import SpatialGrid
+from .track_management.track_table import TrackTable
 
 class NumpyEncoder(json.JSONEncoder):
     """ Custom encoder for numpy data types """
@@ -40,7 +42,7 @@ def _convert_to_matlab_struct(py_list, struct_name=''):
         'timestamp', 'pointCloud', 'posLocal', 'grid_map', 'point_to_grid_idx',
         'motionState', 'egoVx', 'egoVy', 'egoInlierRatio', 'correctedEgoSpeed_mps',
         'estimatedAcceleration_mps2', 'iirFilteredVx_ransac', 'iirFilteredVy_ransac',
-        'dynamicStationaryBox', 'filtered_barrier_x', 'isOutlier', 'dbscanClusters',
+        'dynamicStationaryBox', 'filtered_barrier_x', 'isOutlier', 'isPrefiltered', 'dbscanClusters',
         'cluster_grid_map', 'detectedClusterInfo'
     ]
     
@@ -75,6 +77,10 @@ def _convert_to_matlab_struct(py_list, struct_name=''):
             if value is None:
                 value = np.nan
             
+            # Grids are kept in CSR form per frame; export the legacy list-of-lists.
+            if isinstance(value, SpatialGrid):
+                value = value.grid_map
+
             # --- THIS IS THE FIX ---
             # If the value is a custom object (like the barrier struct),
             # convert it to a dictionary before processing.
@@ -124,6 +130,8 @@ def update_and_save_history(all_tracks, fhist, json_filename="track_history.json
     try:
         logger.info("Converting Python data to MATLAB-compatible structs...")
         
+        if isinstance(all_tracks, TrackTable):
+            all_tracks = all_tracks.to_dicts()
         allTracks_mat = _convert_to_matlab_struct(all_tracks, struct_name='allTracks')
         fHist_mat = _convert_to_matlab_struct(fhist, struct_name='fHist')
 
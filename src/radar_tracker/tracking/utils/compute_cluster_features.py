@@ -0,0 +1,57 @@
+# src/utils/compute_cluster_features.py
+
+import numpy as np
+
+def compute_cluster_features(dbscan_clusters, cartesian_pos_data, point_cloud, is_outlier):
+    """
+    Aggregates the points of every cluster in a single sorted pass.
+
+    Args:
+        dbscan_clusters (np.ndarray): N cluster labels; labels <= 0 are noise.
+        cartesian_pos_data (np.ndarray): A 2xN array of Cartesian points.
+        point_cloud (np.ndarray): A 5xN array of [range, x, y, doppler, snr].
+        is_outlier (np.ndarray): N booleans from the ego-motion estimation.
+
+    Returns:
+        dict: A feature table of equal-length arrays, one entry per cluster in
+            ascending 'clusterID' order: 'clusterID', 'numPoints', 'X', 'Y',
+            'radialSpeed', 'outlierRatio', 'meanSnr', 'minX', 'maxX', 'minY', 'maxY'.
+        np.ndarray: The point indices sorted by cluster (noise excluded).
+        np.ndarray: The start of each cluster's run in the sorted indices.
+    """
+    dbscan_clusters = np.asarray(dbscan_clusters)
+    clustered = np.flatnonzero(dbscan_clusters > 0)
+    sorted_indices = clustered[np.argsort(dbscan_clusters[clustered], kind='stable')]
+    sorted_labels = dbscan_clusters[sorted_indices]
+
+    if sorted_indices.size == 0:
+        empty = np.empty(0)
+        table = {name: empty for name in ('X', 'Y', 'radialSpeed', 'outlierRatio', 'meanSnr',
+                                          'minX', 'maxX', 'minY', 'maxY')}
+        table['clusterID'] = np.empty(0, dtype=dbscan_clusters.dtype)
+        table['numPoints'] = np.empty(0, dtype=np.intp)
+        return table, sorted_indices, np.empty(0, dtype=np.intp)
+
+    starts = np.flatnonzero(np.r_[True, sorted_labels[1:] != sorted_labels[:-1]])
+    counts = np.diff(np.r_[starts, sorted_labels.size])
+
+    x = cartesian_pos_data[0, sorted_indices]
+    y = cartesian_pos_data[1, sorted_indices]
+    # Accumulate in float64 so float32 point clouds do not lose precision in large clusters.
+    def mean(values):
+        return np.add.reduceat(values.astype(np.float64, copy=False), starts) / counts
+
+    table = {
+        'clusterID': sorted_labels[starts],
+        'numPoints': counts,
+        'X': mean(x),
+        'Y': mean(y),
+        'radialSpeed': mean(point_cloud[3, sorted_indices]),
+        'outlierRatio': np.add.reduceat(np.asarray(is_outlier, dtype=np.intp)[sorted_indices], starts) / counts,
+        'meanSnr': mean(point_cloud[4, sorted_indices]),
+        'minX': np.minimum.reduceat(x, starts),
+        'maxX': np.maximum.reduceat(x, starts),
+        'minY': np.minimum.reduceat(y, starts),
+        'maxY': np.maximum.reduceat(y, starts),
+    }
+    return table, sorted_indices, starts
@@ -2,6 +2,123 @@
 
 import numpy as np
 
+class SpatialGrid:
+    """
+    Assigns radar points to a fixed-size grid in CSR form.
+
+    The point indices are stored sorted by cell (row-major, original order
+    inside a cell) with one offset per cell, so the points of a cell, of a run
+    of neighbouring cells in a row, or of a whole row are O(1) slices. The
+    buffers are allocated once and reused by every build(); the slices returned
+    by cell()/cells()/row() are only valid until the next build(). Use
+    snapshot() to keep a frame's grid.
+
+    'grid_map' rebuilds the legacy list-of-lists view for export.
+    """
+    def __init__(self, grid_config, initial_capacity=256):
+        self.x_range = grid_config['X_RANGE']
+        self.y_range = grid_config['Y_RANGE']
+        self.num_rows = grid_config['NUM_ROWS']
+        self.num_cols = grid_config['NUM_COLS']
+        self.cell_width = (self.x_range[1] - self.x_range[0]) / self.num_cols
+        self.cell_height = (self.y_range[1] - self.y_range[0]) / self.num_rows
+
+        self.num_points = 0
+        self.offsets = np.zeros(self.num_rows * self.num_cols + 1, dtype=np.intp)
+        self._point_indices = np.empty(initial_capacity, dtype=np.intp)
+        self._point_cells = np.empty(initial_capacity, dtype=np.intp)
+
+    def build(self, cartesian_pos_data):
+        """
+        Slots the points of a 2xN array into the grid. Points outside the grid
+        (half-open X_RANGE/Y_RANGE) are left out.
+
+        Returns:
+            SpatialGrid: self, for chaining.
+        """
+        num_points = cartesian_pos_data.shape[1]
+        if num_points > self._point_cells.size:
+            capacity = max(num_points, 2 * self._point_cells.size)
+            self._point_indices = np.empty(capacity, dtype=np.intp)
+            self._point_cells = np.empty(capacity, dtype=np.intp)
+        self.num_points = num_points
+
+        x, y = cartesian_pos_data[0], cartesian_pos_data[1]
+        inside = (x >= self.x_range[0]) & (x < self.x_range[1]) & (y >= self.y_range[0]) & (y < self.y_range[1])
+        cols = np.minimum(((x - self.x_range[0]) / self.cell_width).astype(np.intp), self.num_cols - 1)
+        rows = np.minimum(((y - self.y_range[0]) / self.cell_height).astype(np.intp), self.num_rows - 1)
+
+        point_cells = self._point_cells[:num_points]
+        np.multiply(rows, self.num_cols, out=point_cells)
+        point_cells += cols
+        point_cells[~inside] = -1
+
+        inside_indices = np.flatnonzero(inside)
+        inside_cells = point_cells[inside_indices]
+        order = np.argsort(inside_cells, kind='stable')
+        self._point_indices[:inside_indices.size] = inside_indices[order]
+        counts = np.bincount(inside_cells, minlength=self.offsets.size - 1)
+        np.cumsum(counts, out=self.offsets[1:])
+        return self
+
+    # --- Queries ---
+    @property
+    def point_indices(self):
+        """All slotted point indices, sorted by cell."""
+        return self._point_indices[:self.offsets[-1]]
+
+    @property
+    def point_cells(self):
+        """The row-major cell id of every point (-1 outside the grid)."""
+        return self._point_cells[:self.num_points]
+
+    @property
+    def point_to_grid_idx(self):
+        """An Nx2 array of each point's 1-based [row, col] (0 outside the grid), as slot_points_to_grid returns."""
+        point_cells = self.point_cells
+        inside = point_cells >= 0
+        point_to_grid_idx = np.zeros((self.num_points, 2), dtype=int)
+        point_to_grid_idx[inside, 0] = point_cells[inside] // self.num_cols + 1
+        point_to_grid_idx[inside, 1] = point_cells[inside] % self.num_cols + 1
+        return point_to_grid_idx
+
+    def cell(self, row, col):
+        """The point indices in one cell."""
+        return self.cells(row, col, col)
+
+    def cells(self, row, first_col, last_col):
+        """The point indices in the cells first_col..last_col (inclusive, clipped to the grid) of one row."""
+        base = row * self.num_cols
+        first_col, last_col = max(first_col, 0), min(last_col, self.num_cols - 1)
+        return self._point_indices[self.offsets[base + first_col]:self.offsets[base + last_col + 1]]
+
+    def row(self, row):
+        """The point indices in one grid row."""
+        return self.cells(row, 0, self.num_cols - 1)
+
+    # --- History / Export ---
+    def snapshot(self, index_map=None):
+        """
+        Returns a copy that owns its buffers. If 'index_map' is given, point
+        indices are mapped through it (e.g. back to the unfiltered frame).
+        """
+        snapshot = SpatialGrid.__new__(SpatialGrid)
+        snapshot.__dict__.update(self.__dict__)
+        point_indices = self.point_indices
+        snapshot._point_indices = index_map[point_indices] if index_map is not None else point_indices.copy()
+        snapshot._point_cells = self.point_cells.copy()
+        snapshot.offsets = self.offsets.copy()
+        return snapshot
+
+    @property
+    def grid_map(self):
+        """The legacy view: a NUM_ROWS x NUM_COLS list of lists of point indices."""
+        point_indices = self.point_indices.tolist()
+        offsets = self.offsets.tolist()
+        return [[point_indices[offsets[base + col]:offsets[base + col + 1]] for col in range(self.num_cols)]
+                for base in range(0, self.num_rows * self.num_cols, self.num_cols)]
+
+
 def slot_points_to_grid(cartesian_pos_data, grid_config):
     """
     Assigns radar points to a fixed-size grid.
@@ -19,36 +136,10 @@ def slot_points_to_grid(cartesian_pos_data, grid_config):
             - grid_map (list of lists of lists): A 2D list where each cell
               contains a list of point indices.
             - point_to_grid_idx (np.ndarray): An Nx2 array mapping each point
-              index to its [row, col].
+              index to its [row, col] (1-based to match MATLAB; 0 outside the grid).
+
+    The tracker uses SpatialGrid directly; this wrapper keeps the legacy interface.
     """
-    num_points = cartesian_pos_data.shape[1]
-    
-    grid_cell_width = (grid_config['X_RANGE'][1] - grid_config['X_RANGE'][0]) / grid_config['NUM_COLS']
-    grid_cell_height = (grid_config['Y_RANGE'][1] - grid_config['Y_RANGE'][0]) / grid_config['NUM_ROWS']
-
-    # Initialize a 2D list of lists to act as the grid map
-    grid_map = [[[] for _ in range(grid_config['NUM_COLS'])] for _ in range(grid_config['NUM_ROWS'])]
-    
-    # Initialize the mapping array with zeros
-    point_to_grid_idx = np.zeros((num_points, 2), dtype=int)
-
-    for point_idx in range(num_points):
-        point_x = cartesian_pos_data[0, point_idx]
-        point_y = cartesian_pos_data[1, point_idx]
-
-        is_in_x_range = grid_config['X_RANGE'][0] <= point_x < grid_config['X_RANGE'][1]
-        is_in_y_range = grid_config['Y_RANGE'][0] <= point_y < grid_config['Y_RANGE'][1]
-
-        if is_in_x_range and is_in_y_range:
-            # Calculate column and row index (0-indexed in Python)
-            col_idx = int((point_x - grid_config['X_RANGE'][0]) / grid_cell_width)
-            row_idx = int((point_y - grid_config['Y_RANGE'][0]) / grid_cell_height)
-            
-            # Append the point's original index (0-indexed) to the correct cell
-            grid_map[row_idx][col_idx].append(point_idx)
-            
-            # Store the mapping (using 1-based indexing to match MATLAB for now)
-            # Note: We can change this to 0-based later if we prefer.
-            point_to_grid_idx[point_idx, :] = [row_idx + 1, col_idx + 1]
-            
-    return grid_map, point_to_grid_idx
\ No newline at end of file
+    spatial_grid = SpatialGrid(grid_config, initial_capacity=max(cartesian_pos_data.shape[1], 1))
+    spatial_grid.build(cartesian_pos_data)
+    return spatial_grid.grid_map, spatial_grid.point_to_grid_idx
@@ -0,0 +1,80 @@
+import unittest
+import os
+import sys
+
+# Add project root to path to allow for absolute imports from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.radar_tracker.console_logger import logger as radar_logger
+from src.radar_tracker.hardware.read_and_parse_frame import FrameData
+from src.radar_tracker.frame_pacing import FrameSequenceMonitor, CatchUpPolicy
+
+# Suppress console logger output during tests
+radar_logger.propagate = False
+radar_logger.handlers = []
+
+
+def make_frame(frame_number, uart_overflow=0, proc_overflow=0, host_timestamp=None):
+    frame_data = FrameData()
+    frame_data.header = {'frameNumber': frame_number, 'uartOverflow': uart_overflow, 'procOverflow': proc_overflow}
+    frame_data.host_timestamp = host_timestamp
+    return frame_data
+
+
+class TestFrameSequenceMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.monitor = FrameSequenceMonitor(frame_period_ms=50.0)
+
+    def test_timestamps_follow_the_frame_counter(self):
+        timestamps = [self.monitor.update(make_frame(n)) for n in (100, 101, 104, 105)]
+        self.assertEqual(timestamps, [50.0, 100.0, 250.0, 300.0])
+        self.assertEqual(self.monitor.frames_dropped, 2)
+        self.assertEqual(self.monitor.frames_received, 4)
+
+    def test_counter_reset_continues_the_time_base(self):
+        self.monitor.update(make_frame(10))
+        self.monitor.update(make_frame(11))
+        self.assertEqual(self.monitor.update(make_frame(1)), 150.0)
+        self.assertEqual(self.monitor.update(make_frame(2)), 200.0)
+        self.assertEqual(self.monitor.sequence_resets, 1)
+        self.assertEqual(self.monitor.frames_dropped, 0)
+
+    def test_overflow_flags_and_stale_frames_are_counted(self):
+        self.monitor.update(make_frame(1, uart_overflow=1, host_timestamp=10.0), now=10.02)
+        self.monitor.update(make_frame(2, proc_overflow=3, host_timestamp=10.05), now=10.30)
+        self.assertEqual(self.monitor.uart_overflow_frames, 1)
+        self.assertEqual(self.monitor.proc_overflow_frames, 1)
+        self.assertEqual(self.monitor.stale_frames, 1)
+        self.assertAlmostEqual(self.monitor.last_latency_ms, 250.0)
+
+
+class TestCatchUpPolicy(unittest.TestCase):
+
+    def run_policy(self, policy, backlog):
+        catch_up = CatchUpPolicy(policy, every_k=3)
+        return catch_up, [catch_up.should_process(waiting) for waiting in backlog]
+
+    def test_all_processes_every_frame(self):
+        catch_up, decisions = self.run_policy('all', [3, 2, 1, 0])
+        self.assertEqual(decisions, [True] * 4)
+        self.assertEqual(catch_up.frames_processed_behind, 3)
+
+    def test_latest_drains_to_the_newest_frame(self):
+        catch_up, decisions = self.run_policy('latest', [3, 2, 1, 0, 0])
+        self.assertEqual(decisions, [False, False, False, True, True])
+        self.assertEqual(catch_up.frames_skipped, 3)
+        self.assertEqual(catch_up.frames_processed, 2)
+
+    def test_every_k_thins_frames_while_behind(self):
+        catch_up, decisions = self.run_policy('every_k', [6, 5, 4, 3, 2, 1, 0, 2, 1])
+        self.assertEqual(decisions, [True, False, False, True, False, False, True, True, False])
+        self.assertEqual(catch_up.frames_skipped, 5)
+
+    def test_unknown_policy_is_rejected(self):
+        with self.assertRaises(ValueError):
+            CatchUpPolicy('newest')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+import os
+import sys
+import json
+import math
+import time
+import shutil
+import tempfile
+import multiprocessing
+import numpy as np
+
+# Add project root to path to allow for absolute imports from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.radar_tracker.console_logger import logger as radar_logger
+from src.radar_tracker.hardware.read_and_parse_frame import FrameData
+from src.radar_tracker.multi_radar import TrackOutputMerger, make_sensor_output, run_multi_radar
+
+# Suppress console logger output during tests
+radar_logger.propagate = False
+radar_logger.handlers = []
+
+
+def make_track(track_id, x, y, vx, vy, confirmed=True, lost=False):
+    state = np.zeros((7, 1))
+    state[0:4, 0] = [x, y, vx, vy]
+    return {'id': track_id, 'immState': {'x': state}, 'isConfirmed': confirmed, 'isLost': lost, 'ttc': np.inf}
+
+
+def output(sensor, timestamp, frame_number=0, tracks=()):
+    return {'sensor': sensor, 'frameNumber': frame_number, 'timestamp': timestamp, 'tracks': list(tracks)}
+
+
+def fake_pipeline_process(sensor, output_dir, stop_event, shared_live_can_data, can_logger_ready, result_queue):
+    """Stands in for radar_pipeline_process: publishes empty frames until stopped, or fails at once."""
+    if sensor.get('fail'):
+        # What RadarWorker.run() does when the sensor cannot be configured.
+        stop_event.set()
+    frame_number = 0
+    while not stop_event.is_set():
+        frame_number += 1
+        result_queue.put(output(sensor['name'], time.time(), frame_number))
+        time.sleep(0.01)
+    result_queue.put({'sensor': sensor['name'], 'finished': True})
+
+
+def set_event_after(event, delay_s):
+    time.sleep(delay_s)
+    event.set()
+
+
+class TestSensorOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.frame_data = FrameData()
+        self.frame_data.header = {'frameNumber': 42}
+        self.frame_data.host_timestamp = 100.0
+
+    def test_only_confirmed_live_tracks_are_published(self):
+        tracks = [make_track(1, 0.0, 10.0, 0.0, 1.0), make_track(2, 0.0, 5.0, 0.0, 0.0, confirmed=False),
+                  make_track(3, 0.0, 5.0, 0.0, 0.0, lost=True)]
+        result = make_sensor_output({'name': 'front'}, self.frame_data, tracks)
+        self.assertEqual(result['frameNumber'], 42)
+        self.assertEqual(result['timestamp'], 100.0)
+        self.assertEqual([t['id'] for t in result['tracks']], [1])
+        self.assertIsNone(result['tracks'][0]['ttc'])
+
+    def test_tracks_are_transformed_by_the_mounting_pose(self):
+        # A left-facing corner radar: its boresight is the vehicle's +y axis, its right is the vehicle's +x axis.
+        sensor = {'name': 'left', 'mount': {'x': 2.0, 'y': 1.0, 'yaw_deg': 90.0}}
+        track = make_sensor_output(sensor, self.frame_data, [make_track(7, 1.0, 10.0, 0.5, -2.0)])['tracks'][0]
+        self.assertAlmostEqual(track['x'], 3.0)
+        self.assertAlmostEqual(track['y'], 11.0)
+        self.assertAlmostEqual(track['vx'], 0.5)
+        self.assertAlmostEqual(track['vy'], -2.0)
+
+    def test_forward_radar_maps_right_to_negative_y(self):
+        sensor = {'name': 'front', 'mount': {'x': 3.8, 'y': 0.0, 'yaw_deg': 0.0}}
+        track = make_sensor_output(sensor, self.frame_data, [make_track(1, 1.5, 20.0, 0.0, 0.0)])['tracks'][0]
+        self.assertAlmostEqual(track['x'], 23.8)
+        self.assertAlmostEqual(track['y'], -1.5)
+
+
+class TestTrackOutputMerger(unittest.TestCase):
+
+    def setUp(self):
+        self.merger = TrackOutputMerger(['front', 'left'], period_s=0.05, max_latency_s=0.2, stale_s=0.2)
+
+    def test_tick_waits_for_all_sensors(self):
+        self.merger.add(output('front', 10.01, 1))
+        self.assertEqual(self.merger.pop_ready(now=10.02), [])
+
+        self.merger.add(output('left', 10.06, 5))
+        self.merger.add(output('front', 10.07, 2))
+        merged = self.merger.pop_ready(now=10.07)
+        self.assertEqual([round(m['timestamp'], 2) for m in merged], [10.05])
+        self.assertEqual(merged[0]['sensors']['front']['frameNumber'], 1)
+        self.assertNotIn('left', merged[0]['sensors'])
+
+    def test_late_sensor_does_not_block_ticks(self):
+        self.merger.add(output('front', 10.01, 1))
+        merged = self.merger.pop_ready(now=10.31)
+        self.assertEqual(len(merged), 2)
+        self.assertEqual(set(merged[0]['sensors']), {'front'})
+
+    def test_tracks_are_extrapolated_to_the_tick(self):
+        self.merger.add(output('front', 10.01, 1, [{'id': 1, 'x': 10.0, 'y': 0.0, 'vx': -10.0, 'vy': 1.0, 'ttc': None}]))
+        self.merger.add(output('front', 10.09, 2))
+        self.merger.add(output('left', 10.06, 1))
+        merged = self.merger.pop_ready(now=10.09)[0]
+        track = merged['sensors']['front']['tracks'][0]
+        self.assertAlmostEqual(merged['sensors']['front']['age_ms'], 40.0)
+        self.assertAlmostEqual(track['x'], 9.6)
+        self.assertAlmostEqual(track['y'], 0.04)
+
+    def test_stale_outputs_are_left_out(self):
+        self.merger.add(output('front', 10.01, 1))
+        self.merger.add(output('left', 10.01, 1))
+        self.merger.add(output('left', 10.50, 2))
+        merged = self.merger.pop_ready(now=10.50)
+        self.assertIn('front', merged[0]['sensors'])
+        self.assertEqual(merged[-1]['sensors'], {})
+
+    def test_finished_sensors_stop_holding_back_and_flush_terminates(self):
+        self.merger.add(output('front', 10.01, 1))
+        self.merger.add(output('front', 10.11, 3))
+        self.merger.add({'sensor': 'left', 'finished': True})
+        self.assertEqual(len(self.merger.pop_ready(now=10.11)), 2)
+        self.merger.add({'sensor': 'front', 'finished': True})
+        remaining = self.merger.flush()
+        self.assertTrue(math.isclose(remaining[-1]['timestamp'], 10.3, abs_tol=1e-6))
+
+
+
+class TestRunMultiRadar(unittest.TestCase):
+
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.shutdown_flag = multiprocessing.Event()
+
+    def tearDown(self):
+        self.shutdown_flag.set()
+        shutil.rmtree(self.output_dir)
+
+    def test_failed_sensor_does_not_stop_the_others(self):
+        sensors = [{'name': 'front'}, {'name': 'front_left', 'fail': True}, {'name': 'front_right'}]
+        # A process rather than a thread, so the sensor processes are not forked from a multi-threaded parent.
+        stopper = multiprocessing.Process(target=set_event_after, args=(self.shutdown_flag, 1.0))
+        stopper.start()
+        start = time.time()
+        run_multi_radar(self.output_dir, self.shutdown_flag, sensors=sensors, pipeline_target=fake_pipeline_process)
+        stopper.join()
+        self.assertGreaterEqual(time.time() - start, 1.0)
+
+        with open(os.path.join(self.output_dir, "merged_tracks.jsonl")) as f:
+            records = [json.loads(line) for line in f]
+        reported = set().union(*(record['sensors'] for record in records[-5:]))
+        self.assertEqual(reported, {'front', 'front_right'})
+        self.assertGreater(records[-1]['timestamp'] - records[0]['timestamp'], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
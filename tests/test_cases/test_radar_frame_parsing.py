@@ -0,0 +1,484 @@
+import unittest
+import os
+import sys
+import time
+import struct
+import shutil
+import tempfile
+import numpy as np
+
+# Add project root to path to allow for absolute imports from src
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '../..')))
+
+from src.radar_tracker.console_logger import logger as radar_logger
+from src.radar_tracker.hardware.hw_comms_utils import SYNC_PATTERN
+from src.radar_tracker.hardware.frame_reader import FrameReader
+from src.radar_tracker.hardware import read_and_parse_frame as rpf
+from src.radar_tracker.hardware import parsing_utils
+from src.radar_tracker.hardware.parsing_utils import RadarParams
+from src.radar_tracker.hardware.shared_frame_ring import SharedFrameRing
+from src.radar_tracker.radar_ingest import frame_data_from_ring
+from src.radar_tracker.data_adapter import adapt_frame_data_to_fhist
+from src.radar_tracker.raw_logger import RawFrameRecorder, RawCaptureReader, index_path_for
+
+# Suppress console logger output during tests
+radar_logger.propagate = False
+radar_logger.handlers = []
+
+FRAME_HEADER_LENGTH = 40
+
+
+def build_frame(frame_number, points, xyz_unit=0.01, doppler_unit=0.1, snr_unit=0.5, targets=None):
+    """
+    Builds a raw radar frame (header + TLVs) in the sensor's UART format.
+    'points' is a list of (x, y, z, doppler, snr, noise) raw integer tuples.
+    """
+    tlvs = []
+    point_payload = struct.pack('<4f2H', xyz_unit, doppler_unit, snr_unit, 1.0, len(points), 0)
+    point_payload += b''.join(struct.pack('<4h2B', *p) for p in points)
+    tlvs.append(struct.pack('<2I', rpf.MMWDEMO_OUTPUT_EXT_MSG_DETECTED_POINTS, len(point_payload)) + point_payload)
+
+    stats_payload = struct.pack('<2I', 1200, 300) + struct.pack('<4H', 1, 2, 3, 4) + struct.pack('<4h', 40, 41, 42, 43)
+    tlvs.append(struct.pack('<2I', rpf.MMWDEMO_OUTPUT_EXT_MSG_STATS, len(stats_payload)) + stats_payload)
+
+    if targets:
+        target_payload = b''
+        for tid, state, ec, g, conf in targets:
+            target_payload += struct.pack('<I6f9f2f', tid, *state, *ec, g, conf)
+        tlvs.append(struct.pack('<2I', rpf.MMWDEMO_OUTPUT_EXT_MSG_TARGET_LIST_2D_BSD, len(target_payload)) + target_payload)
+
+    payload = b''.join(tlvs)
+    packet_length = FRAME_HEADER_LENGTH + len(payload)
+    header = SYNC_PATTERN + struct.pack('<8I', 1, packet_length, 6843, frame_number, 0, len(points), len(tlvs), 0)
+    return header + payload
+
+
+class FakeSerial:
+    """A minimal stand-in for serial.Serial that serves a fixed byte stream."""
+    def __init__(self, data, chunk_size=None):
+        self.data = bytes(data)
+        self.pos = 0
+        self.chunk_size = chunk_size
+        self.read_calls = 0
+
+    @property
+    def in_waiting(self):
+        remaining = len(self.data) - self.pos
+        return min(remaining, self.chunk_size) if self.chunk_size else remaining
+
+    def readinto(self, buffer):
+        self.read_calls += 1
+        count = min(len(buffer), len(self.data) - self.pos)
+        if self.chunk_size:
+            count = min(count, self.chunk_size)
+        buffer[:count] = self.data[self.pos:self.pos + count]
+        self.pos += count
+        return count
+
+    def read(self, size=1):
+        self.read_calls += 1
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += len(chunk)
+        return chunk
+
+
+class TestFrameReader(unittest.TestCase):
+
+    def setUp(self):
+        self.points = [(100, 2000, 0, -30, 20, 5), (-250, 1500, 10, 12, 40, 6), (0, 500, 0, 0, 8, 1)]
+        self.frame1 = build_frame(1, self.points)
+        self.frame2 = build_frame(2, self.points[:1])
+
+    def test_frames_are_returned_intact_after_garbage(self):
+        garbage = b'\x00\x11\x02\x01\x04\x22' * 5
+        port = FakeSerial(garbage + self.frame1 + self.frame2)
+        reader = FrameReader(port, FRAME_HEADER_LENGTH)
+
+        first = reader.read_frame()
+        self.assertEqual(bytes(first), self.frame1)
+        self.assertEqual(reader.last_skipped, len(garbage))
+
+        second = reader.read_frame()
+        self.assertEqual(bytes(second), self.frame2)
+        self.assertEqual(reader.last_skipped, 0)
+        self.assertEqual(reader.bytes_skipped, len(garbage))
+        self.assertEqual(reader.frames_read, 2)
+
+        self.assertIsNone(reader.read_frame())
+
+    def test_frames_split_across_small_reads(self):
+        port = FakeSerial(self.frame1 + self.frame2, chunk_size=7)
+        reader = FrameReader(port, FRAME_HEADER_LENGTH, buffer_size=256)
+        self.assertEqual(bytes(reader.read_frame()), self.frame1)
+        self.assertEqual(bytes(reader.read_frame()), self.frame2)
+
+    def test_bulk_reads_use_few_syscalls(self):
+        garbage = bytes(range(9, 200)) * 4
+        port = FakeSerial(garbage + self.frame1)
+        reader = FrameReader(port, FRAME_HEADER_LENGTH)
+        self.assertEqual(bytes(reader.read_frame()), self.frame1)
+        self.assertLessEqual(port.read_calls, 2)
+
+    def test_invalid_packet_length_is_resynced(self):
+        bogus_header = SYNC_PATTERN + struct.pack('<8I', 1, 8, 0, 0, 0, 0, 0, 0)
+        port = FakeSerial(bogus_header + self.frame1)
+        reader = FrameReader(port, FRAME_HEADER_LENGTH)
+        self.assertEqual(bytes(reader.read_frame()), self.frame1)
+        self.assertEqual(reader.last_skipped, len(bogus_header))
+
+    def test_has_buffered_frame_needs_the_whole_packet(self):
+        reader = FrameReader(FakeSerial(self.frame1 + self.frame2), FRAME_HEADER_LENGTH)
+        reader.read_frame()
+        self.assertTrue(reader.has_buffered_frame())
+        reader.read_frame()
+        self.assertFalse(reader.has_buffered_frame())
+
+        # Only the sync word of the next frame is buffered and the rest of its header waits in the driver.
+        port = FakeSerial(self.frame1 + self.frame2[:FRAME_HEADER_LENGTH], chunk_size=len(self.frame1) + len(SYNC_PATTERN))
+        reader = FrameReader(port, FRAME_HEADER_LENGTH)
+        self.assertEqual(bytes(reader.read_frame()), self.frame1)
+        self.assertEqual(reader.buffered_bytes, len(SYNC_PATTERN))
+        self.assertFalse(reader.has_buffered_frame())
+
+    def test_read_and_parse_frame_matches_legacy_path(self):
+        params = RadarParams()
+        garbage = b'\x07\x08' * 3
+        legacy = rpf.read_and_parse_frame(FakeSerial(garbage + self.frame1), params)
+        port = FakeSerial(garbage + self.frame1)
+        buffered = rpf.read_and_parse_frame(port, params, FrameReader(port, FRAME_HEADER_LENGTH))
+
+        self.assertEqual(legacy.header, buffered.header)
+        self.assertEqual(buffered.num_points, len(self.points))
+        np.testing.assert_allclose(legacy.point_cloud, buffered.point_cloud)
+        self.assertEqual(legacy.stats_info, buffered.stats_info)
+
+
+class TestTlvDecoding(unittest.TestCase):
+
+    def test_structures_are_compiled_once(self):
+        first = parsing_utils.compile_struct(rpf.FRAME_HEADER_STRUCT)
+        second = parsing_utils.compile_struct(rpf.FRAME_HEADER_STRUCT)
+        self.assertIs(first[0], second[0])
+        self.assertEqual(parsing_utils.get_byte_length_from_struct(rpf.FRAME_HEADER_STRUCT), FRAME_HEADER_LENGTH)
+        self.assertEqual(rpf.POINT_DTYPE.itemsize, parsing_utils.get_byte_length_from_struct(rpf.POINT_STRUCT_CARTESIAN))
+        self.assertEqual(rpf.TARGET_DTYPE.itemsize, 72)
+
+    def test_read_to_struct_rejects_wrong_length(self):
+        self.assertIsNone(parsing_utils.read_to_struct(b'\x00' * 7, rpf.TLV_HEADER_STRUCT))
+        self.assertEqual(parsing_utils.read_to_struct(struct.pack('<2I', 301, 16), rpf.TLV_HEADER_STRUCT),
+                         {'type': 301, 'length': 16})
+
+    def test_target_list_is_decoded_per_field(self):
+        targets = []
+        for tid in range(5):
+            state = [tid + 0.5, 10.0 - tid, 1.25, -0.5, 0.0, 0.125 * tid]
+            ec = [float(tid * 9 + k) for k in range(9)]
+            targets.append((tid + 100, state, ec, 2.5, 0.75))
+        frame = build_frame(3, [(10, 20, 0, 1, 2, 3)], targets=targets)
+
+        frame_data = rpf.parse_frame(memoryview(bytearray(frame)), RadarParams())
+        target_list = frame_data.target_list
+        self.assertEqual(frame_data.num_targets, len(targets))
+        np.testing.assert_array_equal(target_list['TID'], [t[0] for t in targets])
+        np.testing.assert_allclose(target_list['S'], np.array([t[1] for t in targets], dtype='f4').T)
+        np.testing.assert_allclose(target_list['EC'], np.array([t[2] for t in targets], dtype='f4').T)
+        np.testing.assert_allclose(target_list['G'], [2.5] * len(targets))
+        np.testing.assert_allclose(target_list['Conf'], [0.75] * len(targets))
+        np.testing.assert_allclose(target_list['tPos'], target_list['S'][0:2])
+        self.assertEqual(target_list['S'].shape, (6, len(targets)))
+        self.assertEqual(frame_data.stats_info['temperature'], {'rx': 40, 'tx': 41, 'pm': 42, 'dig': 43})
+
+    def test_unknown_tlv_types_are_skipped(self):
+        frame = bytearray(build_frame(4, [(10, 20, 0, 1, 2, 3)]))
+        # Retag the stats TLV (the second one) with an unknown type.
+        stats_offset = FRAME_HEADER_LENGTH + 8 + 20 + 12
+        struct.pack_into('<I', frame, stats_offset, 9999)
+        frame_data = rpf.parse_frame(frame, RadarParams())
+        self.assertEqual(frame_data.num_points, 1)
+        self.assertEqual(frame_data.stats_info, {})
+
+
+class TestPointCloud(unittest.TestCase):
+
+    def setUp(self):
+        self.points = [(100, 2000, 30, -30, 20, 5), (-250, 1500, 10, 12, 40, 6)]
+        self.frame_data = rpf.parse_frame(build_frame(1, self.points), RadarParams())
+
+    def test_points_are_kept_raw_until_used(self):
+        points = self.frame_data.points
+        self.assertEqual(len(points), 2)
+        self.assertEqual(points.nbytes, 2 * rpf.POINT_DTYPE.itemsize)
+
+        x = np.array([p[0] for p in self.points]) * np.float64(np.float32(0.01))
+        np.testing.assert_array_equal(points.column('x'), x)
+        self.assertEqual(points.column('snr', np.float32).dtype, np.float32)
+
+    def test_point_cloud_matches_stacked_layout(self):
+        unit = np.float64(np.float32(0.01))
+        raw = np.array(self.points, dtype=float)
+        x, y, z = raw[:, 0] * unit, raw[:, 1] * unit, raw[:, 2] * unit
+        expected = np.vstack((np.sqrt(x**2 + y**2 + z**2), x, y,
+                              raw[:, 3] * np.float64(np.float32(0.1)), raw[:, 4] * 0.5))
+        np.testing.assert_array_equal(self.frame_data.point_cloud, expected)
+        self.assertIs(self.frame_data.point_cloud, self.frame_data.point_cloud)
+        np.testing.assert_allclose(self.frame_data.points.as_array(np.float32), expected, rtol=1e-6)
+
+    def test_adapter_builds_points_in_the_compute_dtype(self):
+        fhist_frame = adapt_frame_data_to_fhist(self.frame_data, 50.0, dtype=np.float32)
+        self.assertEqual(fhist_frame.pointCloud.dtype, np.float32)
+        self.assertEqual(fhist_frame.pointCloud.shape, (5, 2))
+        self.assertTrue(np.shares_memory(fhist_frame.posLocal, fhist_frame.pointCloud))
+
+    def test_assigned_arrays_are_wrapped(self):
+        frame_data = rpf.FrameData()
+        self.assertEqual(frame_data.point_cloud.size, 0)
+        array = np.arange(10.0).reshape(5, 2)
+        frame_data.point_cloud = array
+        self.assertIs(frame_data.point_cloud, array)
+        np.testing.assert_array_equal(frame_data.points.column('doppler', np.float32), [6.0, 7.0])
+
+
+class TestSharedFrameRing(unittest.TestCase):
+
+    def setUp(self):
+        self.ring = SharedFrameRing.create(num_slots=2, max_points=4)
+        points = [(100, 2000, 0, -30, 20, 5), (-250, 1500, 10, 12, 40, 6)]
+        port = FakeSerial(build_frame(7, points) + build_frame(8, points[:1]) + build_frame(9, points))
+        reader = FrameReader(port, FRAME_HEADER_LENGTH)
+        params = RadarParams()
+        self.frames = [rpf.read_and_parse_frame(port, params, reader) for _ in range(3)]
+
+    def tearDown(self):
+        self.ring.close()
+
+    def test_frames_round_trip_in_order(self):
+        self.assertTrue(self.ring.put(self.frames[0], 100.0))
+        self.assertTrue(self.ring.put(self.frames[1], 100.05))
+        self.assertEqual(self.ring.depth, 2)
+
+        for expected, timestamp in zip(self.frames[:2], (100.0, 100.05)):
+            frame_data = frame_data_from_ring(self.ring, timeout=0.1)
+            self.assertEqual(frame_data.header['frameNumber'], expected.header['frameNumber'])
+            self.assertEqual(frame_data.num_points, expected.num_points)
+            np.testing.assert_allclose(frame_data.point_cloud, expected.point_cloud)
+            self.assertEqual(frame_data.host_timestamp, timestamp)
+
+        self.assertEqual(self.ring.depth, 0)
+        self.assertIsNone(frame_data_from_ring(self.ring, timeout=0.01))
+
+    def test_full_ring_drops_new_frames(self):
+        self.assertTrue(self.ring.put(self.frames[0], 1.0))
+        self.assertTrue(self.ring.put(self.frames[1], 2.0))
+        self.assertFalse(self.ring.put(self.frames[2], 3.0))
+        self.assertEqual(self.ring.dropped, 1)
+
+        self.assertEqual(frame_data_from_ring(self.ring, timeout=0.1).header['frameNumber'], 7)
+        self.assertTrue(self.ring.put(self.frames[2], 3.0))
+        self.assertEqual(frame_data_from_ring(self.ring, timeout=0.1).header['frameNumber'], 8)
+        self.assertEqual(frame_data_from_ring(self.ring, timeout=0.1).header['frameNumber'], 9)
+
+    def test_attached_ring_sees_published_frames(self):
+        consumer = SharedFrameRing.attach(self.ring.spec())
+        try:
+            self.ring.put(self.frames[2], 5.0)
+            self.assertEqual(consumer.depth, 1)
+            header, point_cloud, host_timestamp = consumer.get(timeout=0.1)
+            self.assertEqual(header['frameNumber'], 9)
+            np.testing.assert_allclose(point_cloud, self.frames[2].point_cloud)
+            self.assertEqual(self.ring.depth, 0)
+        finally:
+            consumer.close()
+
+
+class TestRawFrameRecorder(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.capture_path = os.path.join(self.temp_dir, 'radar_raw.bin')
+        points = [(100, 2000, 0, -30, 20, 5), (-250, 1500, 10, 12, 40, 6)]
+        targets = [(1, [1.0, 2.0, 0.5, 0.0, 0.0, 0.0], [0.0] * 9, 1.0, 0.9)]
+        self.frames = [build_frame(11, points), build_frame(12, points[:1], targets=targets), build_frame(13, [])]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _record(self, stream, frame_reader=True):
+        port = FakeSerial(stream)
+        reader = FrameReader(port, FRAME_HEADER_LENGTH) if frame_reader else None
+        recorder = RawFrameRecorder(self.capture_path)
+        parsed = []
+        try:
+            while True:
+                frame_data = rpf.read_and_parse_frame(port, RadarParams(), reader, recorder)
+                if frame_data is None:
+                    break
+                parsed.append(frame_data)
+        finally:
+            recorder.close()
+        return parsed
+
+    def test_capture_holds_exact_frame_bytes(self):
+        self._record(b'\x05\x06\x07' + b''.join(self.frames))
+        with open(self.capture_path, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(self.frames))
+
+        with RawCaptureReader(self.capture_path) as reader:
+            self.assertEqual(len(reader), 3)
+            np.testing.assert_array_equal(reader.index['frameNumber'], [11, 12, 13])
+            np.testing.assert_array_equal(reader.index['length'], [len(f) for f in self.frames])
+            self.assertEqual(reader.read_frame_bytes(1), self.frames[1])
+            self.assertEqual(reader.read_frame_bytes(0), self.frames[0])
+
+    def test_legacy_reader_records_the_same_bytes(self):
+        self._record(b''.join(self.frames), frame_reader=False)
+        with open(self.capture_path, 'rb') as f:
+            self.assertEqual(f.read(), b''.join(self.frames))
+
+    def test_recorded_frames_reparse_identically(self):
+        live = self._record(b''.join(self.frames))
+        with RawCaptureReader(self.capture_path) as reader:
+            replayed = list(reader.iter_frames(RadarParams()))
+        self.assertEqual(len(replayed), len(live))
+        for original, frame_data in zip(live, replayed):
+            self.assertEqual(original.header, frame_data.header)
+            np.testing.assert_allclose(original.point_cloud, frame_data.point_cloud)
+            self.assertEqual(original.num_targets, frame_data.num_targets)
+            self.assertIsNotNone(frame_data.host_timestamp)
+
+    def test_truncated_tail_is_ignored(self):
+        self._record(b''.join(self.frames))
+        with open(self.capture_path, 'r+b') as f:
+            f.truncate(len(self.frames[0]) + len(self.frames[1]) - 4)
+        with RawCaptureReader(self.capture_path) as reader:
+            self.assertEqual(len(reader), 1)
+        self.assertTrue(os.path.exists(index_path_for(self.capture_path)))
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "The radar replayer needs a Linux pseudo-terminal.")
+class TestPtyRadarReplayer(unittest.TestCase):
+
+    def setUp(self):
+        from src.radar_tracker.hardware.pty_replayer import PtyRadarReplayer
+        self.temp_dir = tempfile.mkdtemp()
+        capture_path = os.path.join(self.temp_dir, 'radar_raw.bin')
+        self.frames = [build_frame(n, [(n, 1000, 0, 0, 10, 1)]) for n in range(1, 6)]
+        recorder = RawFrameRecorder(capture_path)
+        for frame in self.frames:
+            recorder.record(frame, 0.0)
+        recorder.close()
+        self.replayer = PtyRadarReplayer(capture_path, frame_period_s=0.05, speedup=0).start()
+        self.port = None
+
+    def tearDown(self):
+        if self.port:
+            self.port.close()
+        self.replayer.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def test_cli_is_acknowledged_and_frames_are_streamed(self):
+        from src.radar_tracker.hardware.hw_comms_utils import configure_control_port
+        self.port = configure_control_port(self.replayer.port_path, 115200)
+        self.assertIsNotNone(self.port)
+
+        for command in ('sensorStop', 'frameCfg 256 0 10000 1 50 1', 'sensorStart'):
+            self.port.write((command + '\n').encode())
+            self.assertIn(b'Done', self.port.read_until(b'mmwDemo:/>'))
+        self.assertEqual(self.replayer.commands, ['sensorStop', 'frameCfg 256 0 10000 1 50 1', 'sensorStart'])
+
+        reader = FrameReader(self.port, FRAME_HEADER_LENGTH)
+        for frame in self.frames:
+            self.assertEqual(bytes(reader.read_frame()), frame)
+        self.assertTrue(self.replayer.finished.wait(timeout=2.0))
+        self.assertEqual(self.replayer.frames_sent, len(self.frames))
+
+
+
+@unittest.skipUnless(sys.platform.startswith('linux'), "The radar replayer needs a Linux pseudo-terminal.")
+class TestSensorConfiguration(unittest.TestCase):
+
+    CFG_LINES = ['sensorStop', 'channelCfg 15 5 0', 'frameCfg 256 0 10000 1 50 1', 'sensorStart']
+
+    def setUp(self):
+        from src.radar_tracker.hardware.pty_replayer import PtyRadarReplayer
+        self.temp_dir = tempfile.mkdtemp()
+        capture_path = os.path.join(self.temp_dir, 'radar_raw.bin')
+        recorder = RawFrameRecorder(capture_path)
+        recorder.record(build_frame(1, [(1, 1000, 0, 0, 10, 1)]), 0.0)
+        recorder.close()
+        self.config_file = os.path.join(self.temp_dir, 'test.cfg')
+        with open(self.config_file, 'w') as f:
+            f.write('% test profile\n' + '\n'.join(self.CFG_LINES) + '\n')
+        self.replayer = PtyRadarReplayer(capture_path, frame_period_s=0.05, loop=True).start()
+        self.ports = []
+
+    def tearDown(self):
+        for port in self.ports:
+            port.close()
+        self.replayer.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def _configure(self, skip_if_configured):
+        from src.radar_tracker.hardware import hw_comms_utils
+        params, port = hw_comms_utils.configure_sensor(
+            self.replayer.port_path, self.config_file, 115200, skip_if_configured=skip_if_configured
+        )
+        self.assertIsNotNone(port)
+        self.ports.append(port)
+        return params, port
+
+    def test_commands_advance_on_acknowledgement(self):
+        start = time.monotonic()
+        params, _ = self._configure(skip_if_configured=False)
+        self.assertLess(time.monotonic() - start, 0.1 * len(self.CFG_LINES))
+        self.assertEqual(self.replayer.commands, self.CFG_LINES)
+        self.assertEqual(params.frameCfg.framePeriodicity, 50.0)
+
+    def test_streaming_sensor_is_not_reconfigured(self):
+        from src.radar_tracker.hardware import hw_comms_utils
+        _, port = self._configure(skip_if_configured=True)
+        self.assertTrue(os.path.exists(hw_comms_utils.config_state_path(self.config_file, self.replayer.port_path)))
+        self.assertTrue(self.replayer.streaming.wait(timeout=2.0))
+        port.close()
+
+        self._configure(skip_if_configured=True)
+        self.assertEqual(self.replayer.commands, self.CFG_LINES)
+
+    def test_changed_cfg_is_reapplied(self):
+        from unittest import mock
+        from src.radar_tracker.hardware import hw_comms_utils
+        _, port = self._configure(skip_if_configured=True)
+        self.assertTrue(self.replayer.streaming.wait(timeout=2.0))
+        port.close()
+        with open(self.config_file, 'a') as f:
+            f.write('lowPower 0 0\n')
+
+        with mock.patch.object(hw_comms_utils, 'send_cli_command', return_value=('done', 'Done')) as send:
+            self._configure(skip_if_configured=True)
+        self.assertEqual(send.call_count, len(self.CFG_LINES) + 1)
+
+    def test_sensors_sharing_a_cfg_keep_separate_state(self):
+        from src.radar_tracker.hardware import hw_comms_utils
+        from src.radar_tracker.hardware.pty_replayer import PtyRadarReplayer
+        second = PtyRadarReplayer(os.path.join(self.temp_dir, 'radar_raw.bin'), frame_period_s=0.05, loop=True).start()
+        self.addCleanup(second.stop)
+        replayers = [self.replayer, second]
+        state_paths = [hw_comms_utils.config_state_path(self.config_file, r.port_path) for r in replayers]
+        self.assertNotEqual(state_paths[0], state_paths[1])
+
+        for replayer in replayers:
+            _, port = hw_comms_utils.configure_sensor(replayer.port_path, self.config_file, 115200, skip_if_configured=True)
+            self.ports.append(port)
+            self.assertTrue(replayer.streaming.wait(timeout=2.0))
+        self.assertTrue(all(os.path.exists(path) for path in state_paths))
+        for port in self.ports:
+            port.close()
+        self.ports = []
+
+        # Both sensors take the fast path: neither receives the commands again.
+        for replayer in replayers:
+            _, port = hw_comms_utils.configure_sensor(replayer.port_path, self.config_file, 115200, skip_if_configured=True)
+            self.ports.append(port)
+            self.assertEqual(replayer.commands, self.CFG_LINES)
+
+if __name__ == '__main__':
+    unittest.main()